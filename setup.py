@@ -109,6 +109,12 @@ class TestWithPytest(setuptools.Command):
         pyargs += ['tests/py_fuse_git_bare_fs_repo_class.py']
         pyargs += ['tests/py_fuse_git_bare_fs_repotools_dulwich.py']
         pyargs += ['tests/py_fuse_git_bare_fs_repotools_git.py']
+        pyargs += ['tests/py_fuse_git_bare_fs_repotools_native.py']
+        pyargs += ['tests/py_fuse_git_bare_fs_ref_resolver.py']
+        pyargs += ['tests/py_fuse_git_bare_fs_blob_stream.py']
+        pyargs += ['tests/py_fuse_git_bare_fs_simple_file_cache.py']
+        pyargs += ['tests/py_fuse_git_bare_fs_disk_blob_cache.py']
+        pyargs += ['tests/py_fuse_git_bare_fs_simple_file_handler.py']
         if self.src == 'installed':
             pyargs += ['tests/script_fuse_git_bare_fs_repo.py']
             pyargs += ['tests/script_fuse_git_bare_fs_tree.py']
@@ -309,22 +315,28 @@ class CheckModulesModulefinder(setuptools.Command):
 
 # necessary modules
 REQUIRED_MODULES = ['argparse',
+                    'atexit',
+                    'collections',
+                    'contextlib',
                     'errno',
                     'fuse',
                     'fusepy',
                     'grp',
                     'hashlib',
                     'logging',
+                    'mmap',
                     'os',
                     'os.path',
                     'pwd',
                     're',
                     'setuptools',
+                    'struct',
                     'subprocess',
                     'sys',
                     'threading',
                     'time',
-                    'warnings']
+                    'warnings',
+                    'zlib']
 # optional modules for python3 setup.py check_modules
 REQUIRED_MODULES += ['importlib']
 # optional modules for python3 setup.py check_modules_modulefinder
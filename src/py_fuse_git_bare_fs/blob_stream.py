@@ -0,0 +1,331 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Streaming (ranged) reading of blobs directly from the object files of a
+git repository.
+
+Loose objects and not deltified objects in packs are zlib streams, which
+can be decompressed incrementally. Therefore a part of a large blob can be
+read without holding the complete blob in memory. Deltified objects can
+not be streamed; for these open_blob_stream returns None.
+
+A stream can be wrapped by ReadAheadStream, which reads the next part of
+the blob in the background, while the reader processes sequential reads.
+
+The objects are found by the object stores of
+:mod:`py_fuse_git_bare_fs.native_object_store`.
+"""
+
+import threading
+import zlib
+
+from .native_object_store import OBJ_BLOB, native_object_store_registry
+
+
+class BlobStream():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    A blob as a zlib stream in a file, which is decompressed incrementally.
+
+    Only a window of at most chunk_size decompressed bytes is kept.
+    Sequential reads continue the decompression; a read before the window
+    restarts the decompression from the beginning.
+
+    Example:
+
+      from py_fuse_git_bare_fs.blob_stream import open_blob_stream
+      stream = open_blob_stream(
+          '.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
+      if stream is not None:
+          print(stream.read(0, 10))
+          stream.close()
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, path, start, size, loose, chunk_size=1048576):
+        """
+        :param path: path to the file with the zlib stream
+        :param start: offset of the zlib stream in the file
+        :param size: size of the blob (if loose is False)
+        :param loose: True for a loose object (with header 'blob [size]\\0')
+        :param chunk_size: maximal size of the window of decompressed data
+        """
+        # pylint: disable=too-many-arguments
+        self.path = path
+        self.start = start
+        self.size = size
+        self.loose = loose
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.restarts = 0
+        self.fd = open(path, 'rb')  # pylint: disable=consider-using-with
+        self._restart()
+
+    def _restart(self):
+        """
+        starts the decompression from the beginning
+        """
+        self.fd.seek(self.start)
+        self.decompressor = zlib.decompressobj()
+        self.window = b''
+        self.window_start = 0
+        self.window_end = 0
+        if self.loose:
+            # read the header 'blob [size]\0'
+            header = b''
+            while b'\0' not in header:
+                data = self._decompress(64)
+                if not data:
+                    raise ValueError(f'corrupt loose object {self.path}')
+                header += data
+            header, self.window = header.split(b'\0', 1)
+            obj_type, size = header.split(b' ')
+            if obj_type != b'blob':
+                raise ValueError(f'{self.path} is not a blob')
+            self.size = int(size)
+            self.window_end = len(self.window)
+
+    def _decompress(self, max_length):
+        """
+        :return: at most max_length decompressed bytes (b'' at the end)
+        """
+        data = b''
+        while not data:
+            if self.decompressor.unconsumed_tail:
+                compressed = self.decompressor.unconsumed_tail
+            elif self.decompressor.eof:
+                break
+            else:
+                compressed = self.fd.read(65536)
+                if not compressed:
+                    break
+            data = self.decompressor.decompress(compressed, max_length)
+        return data
+
+    def read(self, offset, size):
+        """
+        :param offset: offset from where to read
+        :param size: size to read or None to read up to the end
+        :return: the read part of the blob as bytes
+        """
+        if size is None:
+            size = self.size - offset
+        end = min(offset + size, self.size)
+        parts = []
+        with self.lock:
+            if offset < self.window_start:
+                self.restarts += 1
+                self._restart()
+            pos = offset
+            while pos < end:
+                if pos < self.window_end:
+                    stop = min(end, self.window_end)
+                    parts.append(self.window[pos - self.window_start:
+                                             stop - self.window_start])
+                    pos = stop
+                else:
+                    data = self._decompress(self.chunk_size)
+                    if not data:
+                        break
+                    self.window = data
+                    self.window_start = self.window_end
+                    self.window_end += len(data)
+        return b''.join(parts)
+
+    def close(self):
+        """
+        closes the file
+        """
+        with self.lock:
+            self.fd.close()
+
+
+class ReadAheadStream():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    A stream (e. g. an instance of BlobStream), which is read ahead for
+    sequential reads.
+
+    A read starting at the end of the previous read is sequential. After
+    a sequential read, the window after the read data is read by a
+    background thread, so the decompression runs while the reader
+    processes the data and the next read finds its data in memory. The
+    window starts with min_window bytes and is doubled by every
+    sequential read up to max_window bytes (like the read-ahead of the
+    page cache of Linux). A read at another offset resets the window and
+    discards the data read ahead.
+
+    Only one background thread per stream runs at a time. A read of data
+    already read ahead does not wait for it; otherwise the read waits,
+    since the stream can only be read by one thread at a time.
+
+    Example:
+
+      from py_fuse_git_bare_fs.blob_stream import \\
+          open_blob_stream, ReadAheadStream
+      stream = open_blob_stream(
+          '.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
+      if stream is not None:
+          stream = ReadAheadStream(stream)
+          print(stream.read(0, 10))
+          print(stream.read(10, 10))
+          stream.close()
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, stream, min_window=131072, max_window=4194304):
+        """
+        :param stream: stream with the methods read(offset, size) and
+                       close() and the attribute size
+        :param min_window: size of the first window read ahead
+        :param max_window: maximal size of the window read ahead
+        """
+        self.stream = stream
+        self.size = stream.size
+        self.min_window = min(min_window, max_window)
+        self.max_window = max_window
+        self.window = self.min_window
+        # serializes the reads
+        self.lock = threading.Lock()
+        # protects buffer, buffer_start and next_offset, which are used
+        # by the background thread, too
+        self.buffer_lock = threading.Lock()
+        # offset of the next sequential read
+        self.next_offset = 0
+        # data read ahead from buffer_start
+        self.buffer = b''
+        self.buffer_start = 0
+        self.thread = None
+        # number of reads served from the data read ahead
+        self.hits = 0
+
+    def _read_ahead(self, start, size):
+        """
+        reads size bytes from start (the end of self.buffer) in the
+        background and drops the data already read from self.buffer
+        """
+        try:
+            data = self.stream.read(start, size)
+        except (OSError, ValueError, zlib.error):
+            return  # the reader reads the data itself and gets the error
+        with self.buffer_lock:
+            self.buffer = \
+                self.buffer[self.next_offset - self.buffer_start:] + data
+            self.buffer_start = self.next_offset
+
+    def _wait(self):
+        """
+        self.lock has to be locked
+
+        waits for the background thread
+        """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _from_buffer(self, offset, end):
+        """
+        :return: the first part of the data from offset to end, which is
+                 read ahead (b'' if offset is not read ahead)
+        """
+        with self.buffer_lock:
+            if self.buffer_start <= offset < \
+                    self.buffer_start + len(self.buffer):
+                return self.buffer[offset - self.buffer_start:
+                                   end - self.buffer_start]
+        return b''
+
+    def read(self, offset, size):
+        """
+        :param offset: offset from where to read
+        :param size: size to read or None to read up to the end
+        :return: the read part of the blob as bytes
+        """
+        if size is None:
+            size = self.size - offset
+        end = min(offset + size, self.size)
+        with self.lock:
+            data = self._from_buffer(offset, end)
+            if offset + len(data) < end:
+                # the data is read by the background thread or the stream
+                # is needed
+                self._wait()
+                data = self._from_buffer(offset, end)
+            if data:
+                self.hits += 1
+            if offset + len(data) < end:
+                data += self.stream.read(offset + len(data),
+                                         end - offset - len(data))
+            if offset != self.next_offset:
+                self._wait()
+                with self.buffer_lock:
+                    self.next_offset = offset + len(data)
+                    self.buffer = b''
+                    self.buffer_start = self.next_offset
+                self.window = self.min_window
+                return data
+            self.window = min(2 * self.window, self.max_window)
+            if (self.thread is not None) and self.thread.is_alive():
+                with self.buffer_lock:
+                    self.next_offset = offset + len(data)
+                return data
+            self._wait()
+            with self.buffer_lock:
+                self.next_offset = offset + len(data)
+                if self.next_offset >= self.buffer_start + len(self.buffer):
+                    # all data read ahead is read
+                    self.buffer = b''
+                    self.buffer_start = self.next_offset
+                start = self.buffer_start + len(self.buffer)
+            ahead = min(self.next_offset + self.window, self.size) - start
+            if (ahead >= self.window // 2) or (
+                    (ahead > 0) and (start + ahead == self.size)):
+                self.thread = threading.Thread(
+                    target=self._read_ahead, args=(start, ahead),
+                    name='read_ahead', daemon=True)
+                self.thread.start()
+        return data
+
+    def close(self):
+        """
+        waits for the background thread and closes the stream
+        """
+        with self.lock:
+            self._wait()
+            self.buffer = b''
+        self.stream.close()
+
+
+def open_blob_stream(src_dir, blob_hash, chunk_size=1048576):
+    """
+    :param src_dir: path to the git repository as str
+    :param blob_hash: hash of the blob as bytes
+    :param chunk_size: maximal size of the window of decompressed data
+    :return: an instance of BlobStream or None, if the blob can not be
+             streamed (e. g. a deltified object or not found)
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    try:
+        store = native_object_store_registry.get(src_dir)
+    except FileNotFoundError:
+        return None
+    location = store.locate(bytes.fromhex(blob_hash.decode()))
+    if location is None:
+        return None
+    if location[0] == 'loose':
+        return BlobStream(location[1], 0, None, True, chunk_size=chunk_size)
+    pack, offset = location[1:]
+    obj_type, size, data_offset, _ = pack.read_header(offset)
+    if obj_type != OBJ_BLOB:  # e. g. OBJ_OFS_DELTA or OBJ_REF_DELTA
+        return None
+    return BlobStream(pack.path, data_offset, size, False,
+                      chunk_size=chunk_size)
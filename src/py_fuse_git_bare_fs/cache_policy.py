@@ -0,0 +1,244 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Eviction policies for caches with a budget of bytes (e. g.
+:class:`py_fuse_git_bare_fs.simple_file_cache.SimpleFileCache`).
+
+A policy only knows the keys and the sizes of the cached entries; the
+cache stores the values. All operations need O(1) time. A policy is not
+thread safe; the cache has to serialize the calls.
+
+The cache calls:
+
+  * hit(key) for every access of a cached entry,
+  * insert(key, size) for every new entry,
+  * evict() to get the key of the entry to remove next,
+  * victim() to get the key evict() would return without removing it
+    (used for the admission of new entries),
+  * remove(key) for every entry removed by other reasons.
+
+Available policies (see CACHE_POLICIES):
+
+  * 'lru': least recently used
+  * 'arc': adaptive replacement cache (Megiddo and Modha: "ARC: A
+    Self-Tuning, Low Overhead Replacement Cache", FAST 2003), adapted to
+    entries of different sizes; files read only once do not displace
+    files read repeatedly
+"""
+
+import collections
+
+
+class LRUPolicy():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    The least recently used entry is evicted first.
+
+    Example:
+
+      from py_fuse_git_bare_fs.cache_policy import LRUPolicy
+      policy = LRUPolicy(1024)
+      policy.insert(b'a', 10)
+      policy.hit(b'a')
+      key = policy.evict()
+    """
+
+    def __init__(self, max_bytes):
+        """
+        :param max_bytes: maximal sum of the sizes of the entries
+        """
+        self.max_bytes = max_bytes
+        # key -> size, the least recently used first
+        self.entries = collections.OrderedDict()
+
+    def hit(self, key):
+        """
+        :param key: key of an accessed entry
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+
+    def insert(self, key, size):
+        """
+        :param key: key of a new entry
+        :param size: size of the new entry in bytes
+        """
+        self.entries[key] = size
+        self.entries.move_to_end(key)
+
+    def evict(self):
+        """
+        :return: key of the entry to remove or None, if there is no entry
+        """
+        if not self.entries:
+            return None
+        key, _ = self.entries.popitem(last=False)
+        return key
+
+    def victim(self):
+        """
+        :return: key of the entry to remove next or None, if there is no
+                 entry
+        """
+        return next(iter(self.entries), None)
+
+    def remove(self, key):
+        """
+        :param key: key of a removed entry
+        """
+        self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        removes all entries
+        """
+        self.entries.clear()
+
+
+class ARCPolicy():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Adaptive replacement cache: entries used once (t1) and entries used
+    at least twice (t2) are kept in separate LRU lists. The keys of
+    entries evicted recently are remembered (ghost lists b1 and b2). A
+    new entry found in a ghost list adapts the target size of t1 (in
+    bytes), so the cache adapts itself to recency or frequency.
+
+    Example:
+
+      from py_fuse_git_bare_fs.cache_policy import ARCPolicy
+      policy = ARCPolicy(1024)
+      policy.insert(b'a', 10)
+      policy.hit(b'a')
+      key = policy.evict()
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, max_bytes):
+        """
+        :param max_bytes: maximal sum of the sizes of the entries
+        """
+        self.max_bytes = max_bytes
+        # target size of t1 in bytes
+        self.target = 0
+        # key -> size, the least recently used first
+        self.t1 = collections.OrderedDict()
+        self.t2 = collections.OrderedDict()
+        self.b1 = collections.OrderedDict()
+        self.b2 = collections.OrderedDict()
+        # sum of the sizes of the lists
+        self.t1_bytes = 0
+        self.t2_bytes = 0
+        self.b1_bytes = 0
+        self.b2_bytes = 0
+        self._last_inserted = None
+
+    def hit(self, key):
+        """
+        :param key: key of an accessed entry
+        """
+        if key in self.t1:
+            size = self.t1.pop(key)
+            self.t1_bytes -= size
+            self.t2[key] = size
+            self.t2_bytes += size
+        elif key in self.t2:
+            self.t2.move_to_end(key)
+
+    def insert(self, key, size):
+        """
+        :param key: key of a new entry
+        :param size: size of the new entry in bytes
+        """
+        self.remove(key)
+        if key in self.b1:  # recently evicted from t1: increase t1
+            delta = size * max(1, self.b2_bytes // max(1, self.b1_bytes))
+            self.target = min(self.max_bytes, self.target + delta)
+            self.b1_bytes -= self.b1.pop(key)
+            self.t2[key] = size
+            self.t2_bytes += size
+        elif key in self.b2:  # recently evicted from t2: decrease t1
+            delta = size * max(1, self.b1_bytes // max(1, self.b2_bytes))
+            self.target = max(0, self.target - delta)
+            self.b2_bytes -= self.b2.pop(key)
+            self.t2[key] = size
+            self.t2_bytes += size
+        else:
+            self.t1[key] = size
+            self.t1_bytes += size
+        self._last_inserted = key
+        # the ghost lists remember at most max_bytes each
+        while self.b1 and self.b1_bytes > self.max_bytes:
+            self.b1_bytes -= self.b1.popitem(last=False)[1]
+        while self.b2 and self.b2_bytes > self.max_bytes:
+            self.b2_bytes -= self.b2.popitem(last=False)[1]
+
+    def _use_t1(self):
+        """
+        :return: True, if the next entry to remove is taken from t1
+        """
+        use_t1 = bool(self.t1) and (
+            (self.t1_bytes > self.target) or (not self.t2))
+        if use_t1 and self.t2 and \
+                next(iter(self.t1)) == self._last_inserted:
+            use_t1 = False  # do not evict the new entry itself
+        return use_t1
+
+    def evict(self):
+        """
+        :return: key of the entry to remove or None, if there is no entry
+        """
+        if self._use_t1():
+            key, size = self.t1.popitem(last=False)
+            self.t1_bytes -= size
+            self.b1[key] = size
+            self.b1_bytes += size
+        elif self.t2:
+            key, size = self.t2.popitem(last=False)
+            self.t2_bytes -= size
+            self.b2[key] = size
+            self.b2_bytes += size
+        else:
+            return None
+        return key
+
+    def victim(self):
+        """
+        :return: key of the entry to remove next or None, if there is no
+                 entry
+        """
+        if self._use_t1():
+            return next(iter(self.t1))
+        return next(iter(self.t2), None)
+
+    def remove(self, key):
+        """
+        :param key: key of a removed entry
+        """
+        if key in self.t1:
+            self.t1_bytes -= self.t1.pop(key)
+        elif key in self.t2:
+            self.t2_bytes -= self.t2.pop(key)
+
+    def clear(self):
+        """
+        removes all entries
+        """
+        for entries in [self.t1, self.t2, self.b1, self.b2]:
+            entries.clear()
+        self.t1_bytes = 0
+        self.t2_bytes = 0
+        self.b1_bytes = 0
+        self.b2_bytes = 0
+        self.target = 0
+        self._last_inserted = None
+
+
+CACHE_POLICIES = {'lru': LRUPolicy, 'arc': ARCPolicy}
@@ -0,0 +1,387 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Persistent cache of the content of blobs in a directory (second tier
+below :class:`py_fuse_git_bare_fs.simple_file_cache.SimpleFileCache`).
+
+The content of a blob is stored in the file objects/[2 hex]/[38 hex]
+named by its hash. Since blobs are immutable, a stored file never has to
+be invalidated; the cache survives restarts and can be shared by all
+mount processes of a host (e. g. on a local NVMe disk).
+
+A file is written to tmp/ and renamed afterwards (after fsync), so a
+file in objects/ is always complete. Temporary files left by crashed
+processes are removed on startup. The stored files are read by
+os.pread, so only the requested part is read.
+
+At most max_size bytes are stored. The least recently used files are
+removed first; the modification time of a file is updated when it is
+read (at most once a minute), so it gives the order for all processes.
+The files stored by other processes are found by reading the directory
+again every rescan_interval seconds; in between, all processes together
+can exceed max_size by the files stored in this time.
+
+In a directory in /dev/shm (see :func:`shared_cache_path`), the files
+are held in memory shared by all mount processes of a host; a blob used
+by many mounts (e. g. one mount per user) is then stored only once.
+The content is served as stored, so every process able to write to the
+directory can change the files seen by all mounts. Therefore a shared
+cache is private (see the parameter private of DiskBlobCache): all mounts
+sharing it have to run as the same user.
+"""
+
+import collections
+import os
+import stat
+import subprocess
+import threading
+import time
+
+
+def shared_cache_path(name):
+    """
+    :param name: name of the shared cache
+    :return: path of the directory of the shared cache in memory
+
+    Example:
+
+      from py_fuse_git_bare_fs.disk_blob_cache import \
+          DiskBlobCache, shared_cache_path
+      cache = DiskBlobCache(shared_cache_path('www'), fsync=False,
+                            private=True)
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    if (not name) or (os.sep in name) or (name in ['.', '..']):
+        raise ValueError(f'invalid name of a shared cache: "{name}"')
+    return os.path.join('/dev/shm', 'fuse_git_bare_fs_' + name)
+
+
+def _make_private_dir(path):
+    """
+    :param path: directory to create (mode 0o700) or to check
+
+    PermissionError is raised, if path is a symbolic link, no directory,
+    owned by another user or writable by the group or others.
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    os.makedirs(path, mode=stat.S_IRWXU, exist_ok=True)
+    path_stat = os.lstat(path)
+    if not stat.S_ISDIR(path_stat.st_mode):
+        raise PermissionError(f'"{path}" is not a directory')
+    if path_stat.st_uid != os.getuid():
+        raise PermissionError(f'"{path}" is owned by another user')
+    if path_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f'"{path}" is writable by other users')
+
+
+class DiskBlobCache():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Example:
+
+      from py_fuse_git_bare_fs.disk_blob_cache import DiskBlobCache
+      cache = DiskBlobCache('/tmp/blob_cache', max_size=1073741824)
+      cache.store(b'2e65efe2a145dda7ee51d1741299f848e5bf752e', b'data')
+      cache.read(b'2e65efe2a145dda7ee51d1741299f848e5bf752e', 2, 1)
+    """
+    # pylint: disable=too-many-instance-attributes
+    # time in seconds after which the modification time of a read file
+    # is updated
+    touch_interval = 60
+
+    def __init__(self, path, max_size=10737418240, fsync=True,
+                 rescan_interval=60, private=False, fill_workers=2,
+                 max_fill_queue=256):
+        """
+        :param path: directory of the cache (created if necessary)
+        :param max_size: maximal sum of the sizes of the stored files
+        :param fsync: if True, a file is written to disk before it is
+                      renamed (crash safe)
+        :param rescan_interval: time in seconds after which the directory
+                                is read again to find the files stored
+                                by other processes
+        :param private: if True, the directory is created only accessible
+                        by the user (mode 0o700); an existing directory is
+                        rejected by PermissionError, if it is a symbolic
+                        link, owned by another user or writable by others
+        :param fill_workers: maximal number of threads storing blobs for
+                             fill_async
+        :param max_fill_queue: maximal number of blobs waiting for these
+                               threads; further blobs are not stored
+        """
+        # pylint: disable=too-many-arguments
+        self.path = path
+        self.max_size = max_size
+        self.fsync = fsync
+        self.rescan_interval = rescan_interval
+        self.scanned = None
+        self.objects_dir = os.path.join(path, 'objects')
+        self.tmp_dir = os.path.join(path, 'tmp')
+        if private:
+            _make_private_dir(path)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        # blob_hash -> size, the least recently used first
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        # hashes of the blobs queued or written by fill_async
+        self.filling = set()
+        # (repopath, blob_hash) waiting for a thread of fill_async
+        self.fill_queue = collections.deque()
+        self.fill_workers = fill_workers
+        self.max_fill_queue = max_fill_queue
+        self.fill_threads = 0
+        self.hits = 0
+        self.misses = 0
+        self._recover()
+
+    def _object_path(self, blob_hash):
+        """
+        :param blob_hash: hash of the blob as bytes
+        """
+        name = blob_hash.decode()
+        return os.path.join(self.objects_dir, name[:2], name[2:])
+
+    def _recover(self):
+        """
+        removes temporary files of crashed processes and reads the index
+        """
+        for name in os.listdir(self.tmp_dir):
+            # name: [pid].[thread id].[hash]
+            try:
+                pid = int(name.split('.', 1)[0])
+                os.kill(pid, 0)
+            except (ValueError, ProcessLookupError):
+                try:
+                    os.remove(os.path.join(self.tmp_dir, name))
+                except FileNotFoundError:
+                    pass  # removed by another process
+            except PermissionError:
+                pass  # process of another user is running
+        self._scan()
+
+    def _scan(self):
+        """
+        reads the index from the directory (files of all processes)
+        """
+        scanned = time.time()
+        found = []
+        for dirname in os.listdir(self.objects_dir):
+            dirpath = os.path.join(self.objects_dir, dirname)
+            try:
+                names = os.listdir(dirpath)
+            except (FileNotFoundError, NotADirectoryError):
+                continue  # removed by another process
+            for name in names:
+                try:
+                    file_stat = os.stat(os.path.join(dirpath, name))
+                except FileNotFoundError:
+                    continue  # removed by another process
+                found.append(
+                    (file_stat.st_mtime, (dirname + name).encode(),
+                     file_stat.st_size))
+        found.sort()
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            for _, blob_hash, size in found:
+                self.entries[blob_hash] = size
+                self.size += size
+            self._evict()
+            self.scanned = scanned
+
+    def _evict(self):
+        """
+        removes the least recently used files (self.lock is held)
+        """
+        while self.size > self.max_size and self.entries:
+            blob_hash, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                # a process reading the file can read it further
+                os.remove(self._object_path(blob_hash))
+            except FileNotFoundError:
+                pass  # removed by another process
+
+    def _add(self, blob_hash, size):
+        """
+        adds a stored file to the index (self.lock is held)
+        """
+        if blob_hash in self.entries:
+            self.entries.move_to_end(blob_hash)
+            return
+        self.entries[blob_hash] = size
+        self.size += size
+        self._evict()
+
+    def read(self, blob_hash, size, offset):
+        """
+        :param blob_hash: hash of the blob as bytes
+        :param size: size to read or None to read until the end
+        :param offset: offset from where to read
+        :return: the read part of the blob as bytes or None, if the blob
+                 is not stored
+        """
+        try:
+            fd = os.open(self._object_path(blob_hash), os.O_RDONLY)
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+                if blob_hash in self.entries:  # removed by another process
+                    self.size -= self.entries.pop(blob_hash)
+            return None
+        try:
+            file_stat = os.fstat(fd)
+            file_size = file_stat.st_size
+            if size is None:
+                size = file_size - offset
+            data = os.pread(fd, max(0, min(size, file_size - offset)),
+                            offset)
+            if time.time() - file_stat.st_mtime > self.touch_interval:
+                # the order of use for other processes and restarts
+                try:
+                    os.utime(fd)
+                except PermissionError:
+                    pass  # file of another user
+        finally:
+            os.close(fd)
+        with self.lock:
+            self.hits += 1
+            self._add(blob_hash, file_size)
+        return data
+
+    def _tmp_path(self, blob_hash):
+        """
+        :return: path of a temporary file unique for this thread
+        """
+        return os.path.join(
+            self.tmp_dir,
+            f'{os.getpid()}.{threading.get_ident()}.{blob_hash.decode()}')
+
+    def _commit(self, blob_hash, tmp_path, size):
+        """
+        moves the written temporary file to objects/
+        """
+        path = self._object_path(blob_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        with self.lock:
+            rescan = time.time() - self.scanned > self.rescan_interval
+            if rescan:
+                # only one thread reads the directory
+                self.scanned = float('inf')
+            else:
+                self._add(blob_hash, size)
+        if rescan:
+            # finds the new file, too
+            try:
+                self._scan()
+            except OSError:
+                with self.lock:
+                    # the directory is read again after rescan_interval
+                    self.scanned = time.time()
+                raise
+
+    def store(self, blob_hash, content):
+        """
+        :param blob_hash: hash of the blob as bytes
+        :param content: content of the blob (bytes-like)
+
+        Content larger than max_size is not stored.
+        """
+        if (len(content) > self.max_size) or \
+                os.path.exists(self._object_path(blob_hash)):
+            return
+        tmp_path = self._tmp_path(blob_hash)
+        try:
+            with open(tmp_path, 'wb') as fd:
+                fd.write(content)
+                if self.fsync:
+                    fd.flush()
+                    os.fsync(fd.fileno())
+            self._commit(blob_hash, tmp_path, len(content))
+        except OSError:
+            # e. g. no space left on device; the cache is optional
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def fill(self, repopath, blob_hash):
+        """
+        :param repopath: path to the repository to read the blob from
+        :param blob_hash: hash of the blob as bytes
+
+        Stores the blob by "git cat-file blob" without reading it into
+        memory (for large blobs).
+        """
+        if os.path.exists(self._object_path(blob_hash)):
+            return
+        tmp_path = self._tmp_path(blob_hash)
+        try:
+            with open(tmp_path, 'wb') as fd:
+                subprocess.run(
+                    ['git', 'cat-file', 'blob', blob_hash.decode()],
+                    stdout=fd, stderr=subprocess.DEVNULL,
+                    cwd=repopath, check=True)
+                if self.fsync:
+                    os.fsync(fd.fileno())
+                size = os.fstat(fd.fileno()).st_size
+            if size > self.max_size:
+                os.remove(tmp_path)
+                return
+            self._commit(blob_hash, tmp_path, size)
+        except (OSError, subprocess.CalledProcessError):
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def _fill_thread(self):
+        """
+        runs fill for the blobs in self.fill_queue until it is empty
+        """
+        while True:
+            with self.lock:
+                if not self.fill_queue:
+                    self.fill_threads -= 1
+                    return
+                repopath, blob_hash = self.fill_queue.popleft()
+            try:
+                self.fill(repopath, blob_hash)
+            finally:
+                with self.lock:
+                    self.filling.discard(blob_hash)
+
+    def fill_async(self, repopath, blob_hash):
+        """
+        :param repopath: path to the repository to read the blob from
+        :param blob_hash: hash of the blob as bytes
+
+        Stores the blob by fill in a background thread. At most
+        fill_workers threads run; a blob is only stored by one thread at
+        a time. If max_fill_queue blobs are waiting, the blob is not
+        stored (the cache is optional).
+        """
+        with self.lock:
+            if (blob_hash in self.filling) or (blob_hash in self.entries) \
+                    or (len(self.fill_queue) >= self.max_fill_queue):
+                return
+            self.filling.add(blob_hash)
+            self.fill_queue.append((repopath, blob_hash))
+            if self.fill_threads >= self.fill_workers:
+                return  # a running thread stores the blob
+            self.fill_threads += 1
+        threading.Thread(
+            target=self._fill_thread, name='disk_blob_cache_fill',
+            daemon=True).start()
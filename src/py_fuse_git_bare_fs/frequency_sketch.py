@@ -0,0 +1,102 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Approximate access frequencies for the admission of a cache (TinyLFU:
+Einziger, Friedman and Manes: "TinyLFU: A Highly Efficient Cache
+Admission Policy", ACM Transactions on Storage 2017).
+
+A new entry is only stored in a full cache, if it was accessed more
+often than the entry it would displace. Therefore a scan reading every
+file once (e. g. a backup or a recursive download) does not remove the
+files read repeatedly.
+"""
+
+# counter -> counter // 2 for all counters (used to age the counters)
+_HALVE = bytes(i >> 1 for i in range(256))
+# odd factors for the multiplicative hashing of the rows
+_SEEDS = [0xc3a5c85c97cb3127, 0xb492b66fbe98f273,
+          0x9ae16a3b2f90404f, 0xcbf29ce484222325]
+_MASK64 = 0xffffffffffffffff
+
+
+class FrequencySketch():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Count-min sketch: every key increments one counter in each of 4
+    rows (selected by the hash of the key multiplied by a different
+    factor for every row); the estimated frequency is the minimum of
+    these counters, so collisions can only overestimate it. A counter
+    saturates at max_count.
+
+    After sample_size increments all counters are halved (aging), so the
+    estimate follows the recent accesses and old popularity fades.
+
+    The sketch is not thread safe; the cache has to serialize the calls.
+
+    Example:
+
+      from py_fuse_git_bare_fs.frequency_sketch import FrequencySketch
+      sketch = FrequencySketch(1024)
+      sketch.increment(b'a')
+      sketch.frequency(b'a')
+    """
+
+    def __init__(self, entries, max_count=15):
+        """
+        :param entries: expected number of distinct keys in the cache
+        :param max_count: maximal value of a counter (at most 255)
+        """
+        self.width = 64
+        while self.width < entries:
+            self.width *= 2
+        # the upper bits of the product select the counter of a row
+        self.shift = 64 - self.width.bit_length() + 1
+        self.max_count = max_count
+        self.sample_size = 10 * self.width
+        self.additions = 0
+        # row i uses the counters [i * width, (i + 1) * width)
+        self.table = bytearray(len(_SEEDS) * self.width)
+
+    def _indexes(self, key):
+        """
+        :return: the indexes of the counters of key (one in every row)
+        """
+        key_hash = hash(key) & _MASK64
+        shift = self.shift
+        return [row * self.width + (((key_hash * seed) & _MASK64) >> shift)
+                for row, seed in enumerate(_SEEDS)]
+
+    def increment(self, key):
+        """
+        :param key: key of an accessed entry, e. g. the hash of a blob
+        """
+        indexes = self._indexes(key)
+        count = min(self.table[i] for i in indexes)
+        if count < self.max_count:
+            # conservative update: only the minimal counters are increased
+            for i in indexes:
+                if self.table[i] == count:
+                    self.table[i] = count + 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.table = self.table.translate(_HALVE)
+            self.additions //= 2
+
+    def frequency(self, key):
+        """
+        :param key: key of an entry
+        :return: estimated number of recent accesses of the entry
+        """
+        return min(self.table[i] for i in self._indexes(key))
+
+    def clear(self):
+        """
+        resets all counters
+        """
+        self.table = bytearray(len(self.table))
+        self.additions = 0
@@ -1,7 +1,7 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2022-01-13 (last change).
+:Date: 2022-01-13, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 """
 
@@ -54,6 +54,29 @@ def _my_log_debug(log, msg):
         log.debug(msg)
 
 
+def _get_disk_cache(args):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    :return: DiskBlobCache as given by "-disk_cache_dir" or
+             "-shared_cache" or None
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+    if args.shared_cache[0] is not None:
+        from .disk_blob_cache import DiskBlobCache, shared_cache_path
+        # the files are in memory, fsync is not necessary;
+        # the path is predictable, so only the user may write to it
+        return DiskBlobCache(shared_cache_path(args.shared_cache[0]),
+                             max_size=args.shared_cache_size[0],
+                             fsync=False, rescan_interval=10, private=True)
+    if args.disk_cache_dir[0] is None:
+        return None
+    from .disk_blob_cache import DiskBlobCache
+    return DiskBlobCache(args.disk_cache_dir[0],
+                         max_size=args.disk_cache_size[0])
+
+
 def fuse_git_bare_fs_repo(args):
     """
     :Author: Daniel Mohr
@@ -83,6 +106,15 @@ def fuse_git_bare_fs_repo(args):
             args.root_object[0].encode(),
             args.max_cache_size[0],
             file_st_modes=args.file_st_modes,
+            lazy_tree=args.lazy_tree,
+            keep_subtrees=args.keep_subtrees,
+            ref_check_interval=args.ref_check_interval[0],
+            cache_policy=args.cache_policy[0],
+            disk_cache=_get_disk_cache(args),
+            small_cache_entries=args.small_cache_entries[0],
+            small_cache_size=args.small_cache_size[0],
+            cache_compression=args.cache_compression,
+            cache_admission=args.cache_admission,
             log=log)
         _my_log_debug(
             log,
@@ -97,6 +129,15 @@ def fuse_git_bare_fs_repo(args):
             args.root_object[0].encode(),
             args.max_cache_size[0],
             file_st_modes=args.file_st_modes,
+            lazy_tree=args.lazy_tree,
+            keep_subtrees=args.keep_subtrees,
+            ref_check_interval=args.ref_check_interval[0],
+            cache_policy=args.cache_policy[0],
+            disk_cache=_get_disk_cache(args),
+            small_cache_entries=args.small_cache_entries[0],
+            small_cache_size=args.small_cache_size[0],
+            cache_compression=args.cache_compression,
+            cache_admission=args.cache_admission,
             nofail=args.nofail)
         _my_log_debug(
             log,
@@ -148,6 +189,15 @@ def fuse_git_bare_fs_tree(args):
                 args.gitolite_user_file[0],
                 args.max_cache_size[0],
                 file_st_modes=args.file_st_modes,
+                lazy_tree=args.lazy_tree,
+                keep_subtrees=args.keep_subtrees,
+                ref_check_interval=args.ref_check_interval[0],
+                cache_policy=args.cache_policy[0],
+                disk_cache=_get_disk_cache(args),
+                small_cache_entries=args.small_cache_entries[0],
+                small_cache_size=args.small_cache_size[0],
+                cache_compression=args.cache_compression,
+                cache_admission=args.cache_admission,
                 log=log)
             _my_log_debug(
                 log,
@@ -163,6 +213,15 @@ def fuse_git_bare_fs_tree(args):
                 args.root_object[0].encode(),
                 args.max_cache_size[0],
                 file_st_modes=args.file_st_modes,
+                lazy_tree=args.lazy_tree,
+                keep_subtrees=args.keep_subtrees,
+                ref_check_interval=args.ref_check_interval[0],
+                cache_policy=args.cache_policy[0],
+                disk_cache=_get_disk_cache(args),
+                small_cache_entries=args.small_cache_entries[0],
+                small_cache_size=args.small_cache_size[0],
+                cache_compression=args.cache_compression,
+                cache_admission=args.cache_admission,
                 log=log)
             _my_log_debug(
                 log,
@@ -183,6 +242,15 @@ def fuse_git_bare_fs_tree(args):
                 args.gitolite_user_file[0],
                 args.max_cache_size[0],
                 file_st_modes=args.file_st_modes,
+                lazy_tree=args.lazy_tree,
+                keep_subtrees=args.keep_subtrees,
+                ref_check_interval=args.ref_check_interval[0],
+                cache_policy=args.cache_policy[0],
+                disk_cache=_get_disk_cache(args),
+                small_cache_entries=args.small_cache_entries[0],
+                small_cache_size=args.small_cache_size[0],
+                cache_compression=args.cache_compression,
+                cache_admission=args.cache_admission,
                 nofail=args.nofail)
             _my_log_debug(
                 log,
@@ -197,6 +265,15 @@ def fuse_git_bare_fs_tree(args):
                 args.root_object[0].encode(),
                 args.max_cache_size[0],
                 file_st_modes=args.file_st_modes,
+                lazy_tree=args.lazy_tree,
+                keep_subtrees=args.keep_subtrees,
+                ref_check_interval=args.ref_check_interval[0],
+                cache_policy=args.cache_policy[0],
+                disk_cache=_get_disk_cache(args),
+                small_cache_entries=args.small_cache_entries[0],
+                small_cache_size=args.small_cache_size[0],
+                cache_compression=args.cache_compression,
+                cache_admission=args.cache_admission,
                 nofail=args.nofail)
             _my_log_debug(
                 log,
@@ -276,7 +353,110 @@ def my_argument_parser():
         default=[1073741824],
         dest='max_cache_size',
         help='Defines the maximal used cache size. '
+        'The cache is filled up to this size; '
+        'then files are removed as selected by "-cache_policy". '
         'default: 1073741824 (1 GB)')
+    common_parser.add_argument(
+        '-cache_policy',
+        nargs=1,
+        type=str,
+        choices=['lru', 'arc'],
+        required=False,
+        default=['lru'],
+        dest='cache_policy',
+        help='Defines which files are removed from a full cache: '
+        '"lru" removes the least recently used file, '
+        '"arc" (adaptive replacement cache) keeps files read repeatedly '
+        'in favor of files read only once. '
+        'default: lru')
+    common_parser.add_argument(
+        '-cache_compression',
+        action='store_true',
+        help='If given, only a quarter of "-cache_size" is used for '
+        'uncompressed files. Files not read recently are stored '
+        'compressed in the rest of the cache and decompressed on the '
+        'next read. This keeps more files (e. g. text) in the cache '
+        'at the cost of processing time.')
+    common_parser.add_argument(
+        '-cache_admission',
+        action='store_true',
+        help='If given, the reads of all files are counted approximately '
+        'and a new file is only stored in a full cache, if it was read '
+        'more often recently than the file it would remove. This keeps '
+        'the files read repeatedly in the cache during a scan reading '
+        'every file once (e. g. a backup or a recursive download).')
+    common_parser.add_argument(
+        '-small_cache_entries',
+        nargs=1,
+        type=int,
+        required=False,
+        default=[65536],
+        dest='small_cache_entries',
+        help='Defines the maximal number of cached small files '
+        '(smaller than 128 kB, e. g. html, css or configuration files). '
+        'Small files are cached separately from large files, '
+        'so reading large files does not remove them. '
+        'default: 65536')
+    common_parser.add_argument(
+        '-small_cache_size',
+        nargs=1,
+        type=int,
+        required=False,
+        default=[67108864],
+        dest='small_cache_size',
+        help='Defines the maximal size of the cached small files. '
+        'default: 67108864 (64 MB)')
+    second_cache_tier = common_parser.add_mutually_exclusive_group()
+    second_cache_tier.add_argument(
+        '-disk_cache_dir',
+        nargs=1,
+        type=str,
+        required=False,
+        default=[None],
+        dest='disk_cache_dir',
+        help='If given, the content of files is also stored in this '
+        'directory (e. g. on a local fast disk). '
+        'The stored files survive a restart and can be shared by '
+        'several mounts. '
+        'default: no disk cache')
+    common_parser.add_argument(
+        '-disk_cache_size',
+        nargs=1,
+        type=int,
+        required=False,
+        default=[10737418240],
+        dest='disk_cache_size',
+        help='Defines the maximal size of the files stored in '
+        '"-disk_cache_dir". The least recently used files are removed '
+        'first. default: 10737418240 (10 GB)')
+    second_cache_tier.add_argument(
+        '-shared_cache',
+        nargs=1,
+        type=str,
+        required=False,
+        default=[None],
+        dest='shared_cache',
+        help='If given, the content of files is also stored in memory '
+        'shared by all mounts on this host using the same name '
+        '(in /dev/shm/fuse_git_bare_fs_[name]). '
+        'A file read by many mounts (e. g. one mount for every user) is '
+        'stored only once; you can reduce "-cache_size" then. '
+        'The files are served as stored, so the directory is only '
+        'accessible by the user running the mount (mode 0700) and all '
+        'mounts using the same name have to run as the same user. An '
+        'existing directory, which is a symbolic link, owned by another '
+        'user or writable by others, is rejected. '
+        'default: no shared cache')
+    common_parser.add_argument(
+        '-shared_cache_size',
+        nargs=1,
+        type=int,
+        required=False,
+        default=[1073741824],
+        dest='shared_cache_size',
+        help='Defines the maximal size of the files stored in '
+        '"-shared_cache" (in memory). The least recently used files are '
+        'removed first. default: 1073741824 (1 GB)')
     common_parser.add_argument(
         '-daemon',
         action='store_false',
@@ -335,6 +515,57 @@ def my_argument_parser():
         'Example: fuse_git_bare_fs '
         '-o "repo,file_st_modes=33184=33256=41471=16872" foo bar',
         metavar=('file', 'executable', 'link', 'directory'))
+    common_parser.add_argument(
+        '-lazy_tree',
+        action='store_true',
+        help='If given, only the root directory of a repository is read '
+        'on mount or after a change of the root repository object. '
+        'Every other directory is read on its first access. '
+        'This speeds up mounting of repositories with many files.')
+    common_parser.add_argument(
+        '-keep_subtrees',
+        action='store_true',
+        help='If given, already read directories are reused after a '
+        'change of the root repository object, if they are not changed '
+        '(even if they are moved to another path). '
+        'This works with and without "-lazy_tree"; without "-lazy_tree" '
+        'only the directories read one by one are kept, i. e. the '
+        'directories read by the refresh after a change (the complete '
+        'tree read on mount is not kept).')
+    common_parser.add_argument(
+        '-ref_check_interval',
+        nargs=1,
+        type=float,
+        required=False,
+        default=[0],
+        dest='ref_check_interval',
+        help='Defines the time in seconds the resolved root repository '
+        'object is reused without checking the repository. '
+        'Within this time a change of the repository is not seen; '
+        'after it only one access checks the repository, '
+        'concurrent accesses use the last result. '
+        'default: 0 (check on every access)')
+    common_parser.add_argument(
+        '-backend',
+        nargs=1,
+        type=str,
+        choices=['dulwich', 'git', 'native'],
+        required=False,
+        default=[None],
+        dest='backend',
+        help='Defines the backend to read the git repositories: '
+        '"dulwich" uses the python module dulwich, '
+        '"git" uses the command line program git and '
+        '"native" reads the object files (packs and loose objects) '
+        'by pure python. '
+        'default: dulwich if available, otherwise git')
+    common_parser.add_argument(
+        '-no_inotify',
+        action='store_true',
+        help='If given, the references of the repositories are not watched '
+        'by inotify. Instead the files of the references are checked on '
+        'every access (polling). Use this, if the repositories are changed '
+        'on other hosts (e. g. on a network file system like NFS).')
     common_parser.add_argument(
         '-uid',
         nargs=1,
@@ -576,6 +807,14 @@ def fuse_git_bare_fs():
             if 'PATH' not in os.environ:
                 os.environ['PATH'] = '/usr/local/sbin:/usr/local/bin:' + \
                     '/usr/sbin:/usr/bin:/sbin:/bin:/snap/bin'
+        if args.backend[0] is not None:
+            # pylint: disable = bad-option-value, import-outside-toplevel
+            from .repotools import set_backend
+            set_backend(args.backend[0])
+        if args.no_inotify:
+            # pylint: disable = bad-option-value, import-outside-toplevel
+            from .ref_watcher import ref_watcher
+            ref_watcher.enabled = False
         args.func(args)  # call the programs
     else:  # no sub command given
         parser.print_help()
@@ -9,6 +9,7 @@ import errno
 import sys
 import warnings
 
+from .read_buffer import read_buffer
 from .repo_class import RepoClass
 from .simple_file_handler import SimpleFileHandlerClass
 from .used_fs_operations_mixin import _UsedFsOperationsMixin
@@ -31,7 +32,11 @@ class _GitBareRepoMixin(_UsedFsOperationsMixin):
 
     def __init__(self, src_dir, root_object, max_cache_size,
                  simple_file_handler=None, file_st_modes=None, nofail=False,
-                 log=None):
+                 log=None, lazy_tree=False, keep_subtrees=False,
+                 ref_check_interval=0, cache_policy='lru',
+                 disk_cache=None,
+                 small_cache_entries=65536, small_cache_size=67108864,
+                 cache_compression=False, cache_admission=False):
         self.src_dir = src_dir
         self.root_object = root_object
         if simple_file_handler is None:
@@ -48,7 +53,14 @@ class _GitBareRepoMixin(_UsedFsOperationsMixin):
                     self.src_dir, self.root_object,
                     max_cache_size=max_cache_size,
                     simple_file_handler=self.simple_file_handler,
-                    file_st_modes=file_st_modes)
+                    file_st_modes=file_st_modes,
+                    lazy_tree=lazy_tree, keep_subtrees=keep_subtrees,
+                    ref_check_interval=ref_check_interval,
+                    cache_policy=cache_policy, disk_cache=disk_cache,
+                    small_cache_entries=small_cache_entries,
+                    small_cache_size=small_cache_size,
+                    cache_compression=cache_compression,
+                    cache_admission=cache_admission)
             except Exception:
                 msg = 'mount fail, '
                 msg += 'try running without "-nofail" to get precise error'
@@ -58,7 +70,14 @@ class _GitBareRepoMixin(_UsedFsOperationsMixin):
             self.repo = RepoClass(
                 self.src_dir, self.root_object, max_cache_size=max_cache_size,
                 simple_file_handler=self.simple_file_handler,
-                file_st_modes=file_st_modes)
+                file_st_modes=file_st_modes,
+                lazy_tree=lazy_tree, keep_subtrees=keep_subtrees,
+                ref_check_interval=ref_check_interval,
+                cache_policy=cache_policy, disk_cache=disk_cache,
+                small_cache_entries=small_cache_entries,
+                small_cache_size=small_cache_size,
+                cache_compression=cache_compression,
+                cache_admission=cache_admission)
 
     def __del__(self):
         if hasattr(self, 'simple_file_handler'):
@@ -87,7 +106,8 @@ class _GitBareRepoMixin(_UsedFsOperationsMixin):
         if not self.simple_file_handler.is_file_handler(self.src_dir,
                                                         file_handler):
             raise fusepy.FuseOSError(errno.EBADF)
-        return self.repo.read(path, size, offset, file_handler)
+        return read_buffer(
+            self.repo.read(path, size, offset, file_handler))
 
     def readdir(self, path, file_handler):
         """
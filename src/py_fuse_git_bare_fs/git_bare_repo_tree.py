@@ -9,11 +9,12 @@ import errno
 import os
 import re
 import sys
+import threading
 import time
 import warnings
 
 from .empty_attr_mixin import _EmptyAttrMixin
-from .read_write_lock import ReadWriteLock
+from .read_buffer import read_buffer
 from .repo_class import RepoClass
 from .simple_file_cache import SimpleFileCache
 from .simple_file_handler import SimpleFileHandlerClass
@@ -44,10 +45,20 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
 
     def __init__(self, src_dir, root_object, max_cache_size,
                  simple_file_handler=None, file_st_modes=None, nofail=False,
-                 log=None):
+                 log=None, lazy_tree=False, keep_subtrees=False,
+                 ref_check_interval=0, cache_policy='lru',
+                 disk_cache=None,
+                 small_cache_entries=65536, small_cache_size=67108864,
+                 cache_compression=False, cache_admission=False):
         self.src_dir = src_dir
         self.root_object = root_object
-        self.cache = SimpleFileCache(max_cache_size=max_cache_size)
+        self.cache = SimpleFileCache(max_cache_size=max_cache_size,
+                                     policy=cache_policy,
+                                     disk_cache=disk_cache,
+                                     small_cache_entries=small_cache_entries,
+                                     small_cache_size=small_cache_size,
+                                     compression=cache_compression,
+                                     admission=cache_admission)
         if simple_file_handler is None:
             self.simple_file_handler = SimpleFileHandlerClass()
         else:
@@ -56,54 +67,51 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
         if self.file_st_modes is not None:
             self._empty_dir_attr['st_mode'] = self.file_st_modes[3]
             self._empty_file_attr['st_mode'] = self.file_st_modes[0]
+        self.lazy_tree = lazy_tree
+        self.keep_subtrees = keep_subtrees
+        self.ref_check_interval = ref_check_interval
         self.nofail = nofail
         if log is not None:
             self.log = log
         self.repos = {}
-        self._lock = ReadWriteLock()
+        # lock for changing self.repos; self.repos is replaced by an
+        # updated copy, so it can be read without a lock
+        self._lock = threading.Lock()
         dt0 = time.time()
-        with self._lock.write_locked():
-            if self.nofail:
-                # pylint: disable=broad-except
-                try:
-                    self.repos = self._get_repos()
-                except Exception:
-                    msg = 'mount fail, '
-                    msg += 'try running without "-nofail" to get precise error'
-                    warnings.warn(msg)
-                    sys.exit(0)
-            else:
+        if self.nofail:
+            # pylint: disable=broad-except
+            try:
                 self.repos = self._get_repos()
+            except Exception:
+                msg = 'mount fail, '
+                msg += 'try running without "-nofail" to get precise error'
+                warnings.warn(msg)
+                sys.exit(0)
+        else:
+            self.repos = self._get_repos()
         self._update_repos_time = time.time()
         self._update_repos_dt = max(6, (self._update_repos_time - dt0) * 100)
 
     def _del_(self):
-        self._lock.acquire_write()
+        self._lock.acquire()  # pylint: disable=consider-using-with
         del self.repos
 
     def _update_repos(self):
         if time.time() - self._update_repos_time > self._update_repos_dt:
             dt0 = time.time()
             repos = self._get_repos()
-            with self._lock.write_locked():
-                for reponame, repo in repos.items():  # add new found repos
-                    if reponame not in self.repos:
-                        self.repos[reponame] = repo
-                for reponame in list(self.repos.keys()):
-                    # remove obsolete repos
-                    if reponame not in repos:
-                        del self.repos[reponame]
+            with self._lock:
+                # keep the already used repos and remove obsolete repos
+                self.repos = {reponame: self.repos.get(reponame, repo)
+                              for reponame, repo in repos.items()}
             self._update_repos_time = time.time()
             self._update_repos_dt = max(
                 6, (self._update_repos_time - dt0) * 100)
 
     def _get_repos(self):
         """
-        self._lock has to have the write lock, e. g.::
-
-          self._lock.acquire_write()
-          ...
-          self._lock.release_write()
+        :return: the found repositories as dict:
+                 {reponame: [reposrcname, RepoClass or None, lock]}
         """
         repos = {}
         for dirpath, dirnames, _ in os.walk(self.src_dir):
@@ -114,7 +122,8 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
                         if reposrcname[-1] == '/':
                             reposrcname = reposrcname[:-1]
                         if reposrcname != 'gitolite-admin':
-                            repos[reposrcname] = [reposrcname, None]
+                            repos[reposrcname] = [
+                                reposrcname, None, threading.Lock()]
                             break
                     reposrcname = os.path.join(
                         dirpath, dirname)[1 + len(self.src_dir):]
@@ -122,24 +131,61 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
                     if reponame[-1] == '/':
                         reponame = reponame[:-1]
                     if reponame != 'gitolite-admin':
-                        repos[reponame] = [reposrcname, None]
+                        repos[reponame] = [
+                            reposrcname, None, threading.Lock()]
         return repos
 
     def _extract_repo_from_path(self, path):
         """
-        self._lock has to have the read lock, e. g.::
+        :return: name of the repository containing path or None
 
-          self._lock.acquire_read()
-          ...
-          self._lock.release_read()
+        The leading directories of path are looked up in self.repos
+        (without a lock).
+        """
+        repos = self.repos
+        parts = path.split('/')
+        for i in range(2, len(parts) + 1):
+            reponame = '/'.join(parts[1:i])
+            if reponame in repos:
+                return reponame
+        return None
+
+    def _get_repo(self, actual_repo):
         """
-        actual_repo = None
-        for repo in self.repos:
-            res = re.findall(r'^\/' + repo + r'$|^\/' + repo + r'\/', path)
-            if res:
-                actual_repo = repo
-                break
-        return actual_repo
+        :return: the instance of RepoClass of the repository actual_repo,
+                 which is created on the first use
+
+        Only threads using the same repository wait for each other.
+        If the repository is removed by _update_repos in the meantime,
+        ENOENT is raised.
+        """
+        actual_repo_list = self.repos.get(actual_repo, None)
+        if actual_repo_list is None:  # no such file or directory
+            raise fusepy.FuseOSError(errno.ENOENT)
+        if actual_repo_list[1] is None:
+            with actual_repo_list[2]:
+                if actual_repo_list[1] is None:
+                    actual_repo_list[1] = RepoClass(
+                        os.path.join(self.src_dir, actual_repo_list[0]),
+                        root_object=self.root_object, cache=self.cache,
+                        simple_file_handler=self.simple_file_handler,
+                        file_st_modes=self.file_st_modes,
+                        lazy_tree=self.lazy_tree,
+                        keep_subtrees=self.keep_subtrees,
+                        ref_check_interval=self.ref_check_interval)
+        return actual_repo_list[1]
+
+    def _get_repo_from_path(self, path):
+        """
+        :return: (name of the repository, instance of RepoClass)
+                 containing path
+
+        If path is not in a repository, ENOENT is raised.
+        """
+        actual_repo = self._extract_repo_from_path(path)
+        if actual_repo is None:  # no such file or directory
+            raise fusepy.FuseOSError(errno.ENOENT)
+        return actual_repo, self._get_repo(actual_repo)
 
     def getattr(self, path, file_handler=None):
         """
@@ -152,54 +198,26 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
         if path == '/':
             return self._empty_dir_attr
         self._update_repos()
-        self._lock.acquire_read()
         actual_repo = self._extract_repo_from_path(path)
         if actual_repo is None:  # check if path is part of repo path
-            part_of_repo_path = False
             for repo in self.repos:
                 if repo.startswith(path[1:]):
-                    part_of_repo_path = True
-                    break
-            if part_of_repo_path:
-                self._lock.release_read()
-                return self._empty_dir_attr
+                    return self._empty_dir_attr
             # no such file or directory
-            self._lock.release_read()
             raise fusepy.FuseOSError(errno.ENOENT)
-        actual_repo_list = self.repos[actual_repo]
-        self._lock.release_read()
-        if actual_repo_list[1] is None:
-            actual_repo_list[1] = RepoClass(
-                os.path.join(self.src_dir, actual_repo_list[0]),
-                root_object=self.root_object, cache=self.cache,
-                simple_file_handler=self.simple_file_handler,
-                file_st_modes=self.file_st_modes)
-        ret = actual_repo_list[1].getattr(
+        return self._get_repo(actual_repo).getattr(
             _extract_repopath_from_path(actual_repo, path))
-        return ret
 
     def read(self, path, size, offset, file_handler):
         """
         read parts of path
         """
         self._update_repos()
-        self._lock.acquire_read()
-        actual_repo = self._extract_repo_from_path(path)
-        if actual_repo is None:  # no such file or directory
-            self._lock.release_read()
-            raise fusepy.FuseOSError(errno.ENOENT)
-        actual_repo_list = self.repos[actual_repo]
-        self._lock.release_read()
-        if actual_repo_list[1] is None:
-            actual_repo_list[1] = RepoClass(
-                os.path.join(self.src_dir, actual_repo_list[0]),
-                root_object=self.root_object, cache=self.cache,
-                simple_file_handler=self.simple_file_handler,
-                file_st_modes=self.file_st_modes)
-        ret = actual_repo_list[1].read(
+        actual_repo, repo = self._get_repo_from_path(path)
+        ret = repo.read(
             _extract_repopath_from_path(actual_repo, path),
             size, offset, file_handler)
-        return ret
+        return read_buffer(ret)
 
     def readdir(self, path, file_handler):
         """
@@ -211,12 +229,10 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
         # pylint: disable=unused-argument
         # /foo/bar.git/baz
         self._update_repos()
-        self._lock.acquire_read()
         if path == '/':
             retlist = ['.', '..']
             for repo in self.repos:
                 retlist.append(repo.split('/')[0])
-            self._lock.release_read()
             return list(set(retlist))
         actual_repo = self._extract_repo_from_path(path)
         if actual_repo is None:  # check if path is part of repo path
@@ -227,45 +243,22 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
                 if res:
                     repos.append(res[0])
             if bool(repos):  # path is part of repo path
-                self._lock.release_read()
                 return list(set(repos))
             # no such file or directory
-            self._lock.release_read()
             raise fusepy.FuseOSError(errno.ENOENT)
-        actual_repo_list = self.repos[actual_repo]
-        self._lock.release_read()
-        if actual_repo_list[1] is None:
-            actual_repo_list[1] = RepoClass(
-                os.path.join(self.src_dir, actual_repo_list[0]),
-                root_object=self.root_object, cache=self.cache,
-                simple_file_handler=self.simple_file_handler,
-                file_st_modes=self.file_st_modes)
-        ret = actual_repo_list[1].readdir(
+        return self._get_repo(actual_repo).readdir(
             _extract_repopath_from_path(actual_repo, path))
-        return ret
 
     def readlink(self, path):
         """
         read the symbolic link path
         """
         self._update_repos()
-        self._lock.acquire_read()
-        actual_repo = self._extract_repo_from_path(path)
-        if actual_repo is None:  # no such file or directory
-            self._lock.release_read()
-            raise fusepy.FuseOSError(errno.ENOENT)
-        actual_repo_list = self.repos[actual_repo]
-        self._lock.release_read()
-        if actual_repo_list[1] is None:
-            actual_repo_list[1] = RepoClass(
-                os.path.join(self.src_dir, actual_repo_list[0]),
-                root_object=self.root_object, cache=self.cache,
-                simple_file_handler=self.simple_file_handler,
-                file_st_modes=self.file_st_modes)
+        actual_repo, repo = self._get_repo_from_path(path)
         file_handler = self.open(path, 'r')
-        ret = actual_repo_list[1].read(
+        ret = bytes(repo.read(
             _extract_repopath_from_path(actual_repo, path),
-            None, 0, file_handler).decode()
+            None, 0, file_handler)).decode()
         self.release(path, file_handler)
         return ret
 
@@ -278,20 +271,8 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
         released.
         """
         self._update_repos()
-        self._lock.acquire_read()
-        actual_repo = self._extract_repo_from_path(path)
-        if actual_repo is None:  # no such file or directory
-            self._lock.release_read()
-            raise fusepy.FuseOSError(errno.ENOENT)
-        actual_repo_list = self.repos[actual_repo]
-        self._lock.release_read()
-        if actual_repo_list[1] is None:
-            actual_repo_list[1] = RepoClass(
-                os.path.join(self.src_dir, actual_repo_list[0]),
-                root_object=self.root_object, cache=self.cache,
-                simple_file_handler=self.simple_file_handler,
-                file_st_modes=self.file_st_modes)
-        return actual_repo_list[1].open(
+        actual_repo, repo = self._get_repo_from_path(path)
+        return repo.open(
             _extract_repopath_from_path(actual_repo, path), flags)
 
     def release(self, path, file_handler):
@@ -299,20 +280,8 @@ class _GitBareRepoTreeMixin(_EmptyAttrMixin, _UsedFsOperationsMixin):
         Releases the lock file_fandler on path.
         """
         self._update_repos()
-        self._lock.acquire_read()
-        actual_repo = self._extract_repo_from_path(path)
-        if actual_repo is None:  # no such file or directory
-            self._lock.release_read()
-            raise fusepy.FuseOSError(errno.ENOENT)
-        actual_repo_list = self.repos[actual_repo]
-        self._lock.release_read()
-        if actual_repo_list[1] is None:
-            actual_repo_list[1] = RepoClass(
-                os.path.join(self.src_dir, actual_repo_list[0]),
-                root_object=self.root_object, cache=self.cache,
-                simple_file_handler=self.simple_file_handler,
-                file_st_modes=self.file_st_modes)
-        actual_repo_list[1].release(
+        actual_repo, repo = self._get_repo_from_path(path)
+        repo.release(
             _extract_repopath_from_path(actual_repo, path), file_handler)
 
     def utimens(self, path, times=None):
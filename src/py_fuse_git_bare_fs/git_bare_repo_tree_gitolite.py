@@ -12,6 +12,7 @@ import sys
 import warnings
 
 from .empty_attr_mixin import _EmptyAttrMixin
+from .read_buffer import read_buffer
 from .simple_file_handler import SimpleFileHandlerClass
 from .user_repos import UserRepos
 
@@ -60,7 +61,11 @@ class _GitBareRepoTreeGitoliteMixin(_EmptyAttrMixin):
                  gitolite_cmd='gitolite', gitolite_user_file=None,
                  max_cache_size=1073741824,
                  simple_file_handler=None, file_st_modes=None, nofail=False,
-                 log=None):
+                 log=None, lazy_tree=False, keep_subtrees=False,
+                 ref_check_interval=0, cache_policy='lru',
+                 disk_cache=None,
+                 small_cache_entries=65536, small_cache_size=67108864,
+                 cache_compression=False, cache_admission=False):
         # pylint: disable=too-many-arguments
         self.src_dir = src_dir
         self.root_object = root_object
@@ -85,7 +90,16 @@ class _GitBareRepoTreeGitoliteMixin(_EmptyAttrMixin):
                 self.repos = UserRepos(src_dir, self.root_object,
                                        gitolite_cmd, gitolite_user_file,
                                        max_cache_size,
-                                       file_st_modes=file_st_modes)
+                                       file_st_modes=file_st_modes,
+                                       lazy_tree=lazy_tree,
+                                       keep_subtrees=keep_subtrees,
+                                       ref_check_interval=ref_check_interval,
+                                       cache_policy=cache_policy,
+                                       disk_cache=disk_cache,
+                                       small_cache_entries=small_cache_entries,
+                                       small_cache_size=small_cache_size,
+                                       cache_compression=cache_compression,
+                                       cache_admission=cache_admission)
             except Exception:
                 msg = 'mount fail, '
                 msg += 'try running without "-nofail" to get precise error'
@@ -95,7 +109,16 @@ class _GitBareRepoTreeGitoliteMixin(_EmptyAttrMixin):
             self.repos = UserRepos(src_dir, self.root_object,
                                    gitolite_cmd, gitolite_user_file,
                                    max_cache_size,
-                                   file_st_modes=file_st_modes)
+                                   file_st_modes=file_st_modes,
+                                   lazy_tree=lazy_tree,
+                                   keep_subtrees=keep_subtrees,
+                                   ref_check_interval=ref_check_interval,
+                                   cache_policy=cache_policy,
+                                   disk_cache=disk_cache,
+                                   small_cache_entries=small_cache_entries,
+                                   small_cache_size=small_cache_size,
+                                   cache_compression=cache_compression,
+                                   cache_admission=cache_admission)
 
     def _extract_user_from_path(self, path):
         actual_user = None
@@ -179,9 +202,9 @@ class _GitBareRepoTreeGitoliteMixin(_EmptyAttrMixin):
         actual_repo = self._extract_repo_from_path(actual_user, path)
         if actual_repo is None:  # no such file or directory
             raise fusepy.FuseOSError(errno.ENOENT)
-        return self.repos.repos[actual_repo].read(
+        return read_buffer(self.repos.repos[actual_repo].read(
             _extract_repopath_from_path(actual_user, actual_repo, path),
-            size, offset, file_handler)
+            size, offset, file_handler))
 
     def readdir(self, path, file_handler):
         """
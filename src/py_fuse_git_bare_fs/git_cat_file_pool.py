@@ -0,0 +1,394 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+"""
+
+import atexit
+import collections
+import os
+import os.path
+import select
+import subprocess
+import threading
+
+
+_GIT_SUPPORTS_BATCH_COMMAND = None
+
+
+def git_supports_batch_command():
+    """
+    :return: True if the command line program git supports
+             "git cat-file --batch-command" (git 2.36 or newer)
+
+    The result is determined only once per process.
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable=global-statement
+    global _GIT_SUPPORTS_BATCH_COMMAND
+    if _GIT_SUPPORTS_BATCH_COMMAND is None:
+        _GIT_SUPPORTS_BATCH_COMMAND = False
+        try:
+            cpi = subprocess.run(
+                ['git', 'version'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                timeout=3, check=True)
+            # e. g.: git version 2.39.5
+            version = cpi.stdout.decode().split()[2].split('.')
+            _GIT_SUPPORTS_BATCH_COMMAND = \
+                (int(version[0]), int(version[1])) >= (2, 36)
+        except (OSError, subprocess.SubprocessError, IndexError, ValueError):
+            pass
+    return _GIT_SUPPORTS_BATCH_COMMAND
+
+
+class GitCatFileProcess():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    A long-lived coprocess "git cat-file --batch", "git cat-file --batch-check"
+    or "git cat-file --batch-command --buffer" for one repository.
+
+    Requests are written to stdin of the coprocess and the answers are read
+    from its stdout. Many requests can be given at once (pipelining); they are
+    written in chunks of at most max_pipelined requests to avoid a dead lock
+    by full pipes.
+
+    If the coprocess died (e. g. it was killed), it is restarted once for
+    the actual request.
+
+    If the coprocess does not read a request or does not answer for
+    timeout seconds (e. g. a stalled network file system), it is killed
+    and subprocess.TimeoutExpired is raised (like subprocess.run with a
+    timeout). The next request starts a new coprocess.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, src_dir, batch_option='--batch', max_pipelined=256,
+                 timeout=3):
+        """
+        :param src_dir: path to the git repository as str
+        :param batch_option: '--batch', '--batch-check' or '--batch-command'
+        :param max_pipelined: maximal number of requests written at once
+        :param timeout: maximal time in seconds to wait for the coprocess
+                        without any progress
+        """
+        # pylint: disable=too-many-arguments
+        self.src_dir = src_dir
+        self.batch_option = batch_option
+        self.max_pipelined = max_pipelined
+        self.timeout = timeout
+        self.cmd = ['git', 'cat-file', batch_option]
+        if batch_option == '--batch-command':
+            # the output is flushed by the command "flush"
+            self.cmd.append('--buffer')
+        self.lock = threading.Lock()
+        self.process = None
+        # data read from stdout of the coprocess, but not used yet
+        self._buffer = bytearray()
+        self.restarts = 0
+
+    def _start(self):
+        """
+        self.lock has to be locked
+        """
+        # pylint: disable=consider-using-with
+        self.process = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.src_dir, bufsize=0)
+        self._buffer = bytearray()
+
+    def _stop(self):
+        """
+        self.lock has to be locked
+        """
+        if self.process is not None:
+            process = self.process
+            self.process = None
+            for pipe in [process.stdin, process.stdout]:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+            try:
+                process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        self._buffer = bytearray()
+
+    def _kill(self):
+        """
+        self.lock has to be locked
+
+        kills the coprocess (e. g. if it hangs)
+        """
+        if self.process is not None:
+            self.process.kill()
+        self._stop()
+
+    def _wait_for(self, pipe, writable=False):
+        """
+        self.lock has to be locked
+
+        waits at most self.timeout seconds, until pipe can be read or
+        written
+
+        :raise subprocess.TimeoutExpired: if the time is over
+        """
+        if writable:
+            ready = select.select([], [pipe], [], self.timeout)[1]
+        else:
+            ready = select.select([pipe], [], [], self.timeout)[0]
+        if not ready:
+            raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+
+    def _write(self, data):
+        """
+        self.lock has to be locked
+
+        writes data to stdin of the coprocess
+        """
+        data = memoryview(data)
+        while data:
+            self._wait_for(self.process.stdin, writable=True)
+            data = data[os.write(self.process.stdin.fileno(), data):]
+
+    def _fill(self):
+        """
+        self.lock has to be locked
+
+        reads available data from stdout of the coprocess to self._buffer
+
+        :raise BrokenPipeError: if the coprocess died
+        """
+        self._wait_for(self.process.stdout)
+        data = os.read(self.process.stdout.fileno(), 1048576)
+        if not data:
+            # coprocess died
+            raise BrokenPipeError(self.src_dir)
+        self._buffer += data
+
+    def _readline(self):
+        """
+        self.lock has to be locked
+
+        :return: the next line from stdout of the coprocess
+        """
+        start = 0
+        while True:
+            pos = self._buffer.find(b'\n', start)
+            if pos >= 0:
+                line = bytes(self._buffer[:pos + 1])
+                del self._buffer[:pos + 1]
+                return line
+            start = len(self._buffer)
+            self._fill()
+
+    def _read(self, size):
+        """
+        self.lock has to be locked
+
+        :return: the next size bytes from stdout of the coprocess
+        """
+        while len(self._buffer) < size:
+            self._fill()
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def is_alive(self):
+        """
+        health check of the coprocess
+
+        :return: True if the coprocess is running
+        """
+        return (self.process is not None) and (self.process.poll() is None)
+
+    def close(self):
+        """
+        stops the coprocess; it will be restarted on the next request
+        """
+        with self.lock:
+            self._stop()
+
+    def _read_answer(self, with_content):
+        """
+        self.lock has to be locked
+
+        :return: (header, content); content is None for missing objects or
+                 if with_content is False
+        """
+        header = self._readline()
+        content = None
+        if with_content and not (header.endswith(b' missing\n') or
+                                 header.endswith(b' ambiguous\n')):
+            size = int(header.split()[-1])
+            # the content is followed by a newline
+            content = self._read(size + 1)
+            if content[-1:] != b'\n':
+                raise BrokenPipeError(self.src_dir)
+            content = content[:-1]
+        return (header, content)
+
+    def _request(self, lines, with_content):
+        """
+        self.lock has to be locked
+        """
+        if not self.is_alive():
+            self._stop()
+            self._start()
+        answers = []
+        for i in range(0, len(lines), self.max_pipelined):
+            chunk = lines[i:i + self.max_pipelined]
+            data = b'\n'.join(chunk) + b'\n'
+            if self.batch_option == '--batch-command':
+                data += b'flush\n'
+            self._write(data)
+            for _ in chunk:
+                answers.append(self._read_answer(with_content))
+        return answers
+
+    def request(self, git_objects):
+        """
+        :param git_objects: list of names of git objects as bytes
+                            (e. g. hashes or branch names); for the option
+                            '--batch-command' the command has to be given,
+                            e. g. b'info master'
+        :return: list of tuples (header, content) with header as bytes
+                 (e. g. b'78981922613b2afb6025042ff6bd878ac1994e85 blob 2\\n')
+                 and content as bytes or None (content is only read
+                 for '--batch' and the command 'contents')
+
+        A name containing a newline would be read as several requests
+        by the coprocess; for such a name ValueError is raised.
+
+        Example:
+
+          from py_fuse_git_bare_fs.git_cat_file_pool import GitCatFileProcess
+          process = GitCatFileProcess('.', '--batch-check')
+          process.request([b'master', b'HEAD'])
+        """
+        if not git_objects:
+            return []
+        for git_object in git_objects:
+            if b'\n' in git_object:
+                raise ValueError(
+                    f'invalid name of a git object: {git_object!r}')
+        with_content = self.batch_option == '--batch'
+        if self.batch_option == '--batch-command':
+            with_content = git_objects[0].startswith(b'contents ')
+        with self.lock:
+            try:
+                return self._request(git_objects, with_content)
+            except (BrokenPipeError, ValueError):
+                # ValueError is raised for I/O operation on closed file
+                pass
+            except subprocess.TimeoutExpired:
+                # a hanging coprocess would block all later requests
+                self._kill()
+                raise
+            # restart the coprocess and try it again
+            self.restarts += 1
+            self._stop()
+            try:
+                return self._request(git_objects, with_content)
+            except subprocess.TimeoutExpired:
+                self._kill()
+                raise
+            except (BrokenPipeError, ValueError) as errmsg:
+                returncode = 128
+                if self.process is not None:
+                    self.process.poll()
+                    if self.process.returncode is not None:
+                        returncode = self.process.returncode
+                self._stop()
+                raise subprocess.CalledProcessError(
+                    returncode, self.cmd) from errmsg
+
+
+class GitCatFilePool():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Pool of long-lived "git cat-file" coprocesses. For every repository
+    one coprocess for reading contents ("--batch") and one for reading
+    object information (hash, type and size) is kept.
+
+    For at most max_repos repositories coprocesses are kept; the
+    coprocesses of the least recently used repository are stopped.
+
+    Example:
+
+      from py_fuse_git_bare_fs.git_cat_file_pool import git_cat_file_pool
+      git_cat_file_pool.get('.', 'info').request([b'info master'])
+    """
+
+    def __init__(self, max_repos=64):
+        """
+        :param max_repos: maximal number of repositories to keep coprocesses
+        """
+        self.max_repos = max_repos
+        self.lock = threading.Lock()
+        self.repos = collections.OrderedDict()
+
+    def get(self, src_dir, channel):
+        """
+        :param src_dir: path to the git repository as str
+        :param channel: 'contents' or 'info'
+        :return: an instance of GitCatFileProcess
+        """
+        src_dir = os.path.abspath(src_dir)
+        obsolete = []
+        with self.lock:
+            if src_dir in self.repos:
+                self.repos.move_to_end(src_dir)
+            else:
+                if not os.path.isdir(src_dir):
+                    raise FileNotFoundError(src_dir)
+                if git_supports_batch_command():
+                    info = GitCatFileProcess(src_dir, '--batch-command')
+                else:
+                    info = GitCatFileProcess(src_dir, '--batch-check')
+                self.repos[src_dir] = {
+                    'contents': GitCatFileProcess(src_dir, '--batch'),
+                    'info': info}
+                while len(self.repos) > self.max_repos:
+                    obsolete.append(self.repos.popitem(last=False)[1])
+            process = self.repos[src_dir][channel]
+        for processes in obsolete:
+            for obsolete_process in processes.values():
+                obsolete_process.close()
+        return process
+
+    def remove(self, src_dir):
+        """
+        stops the coprocesses for the repository src_dir
+        """
+        src_dir = os.path.abspath(src_dir)
+        with self.lock:
+            processes = self.repos.pop(src_dir, {})
+        for process in processes.values():
+            process.close()
+
+    def close_all(self):
+        """
+        stops all coprocesses
+        """
+        with self.lock:
+            repos = list(self.repos.values())
+            self.repos.clear()
+        for processes in repos:
+            for process in processes.values():
+                process.close()
+
+
+git_cat_file_pool = GitCatFilePool()
+atexit.register(git_cat_file_pool.close_all)
@@ -0,0 +1,705 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+A pure python object store for git repositories.
+
+The pack index files (version 2), the multi-pack-index and the packs are
+mapped into memory (mmap). An object is found by a binary search in the
+sorted table of names (starting with the range given by the fanout table)
+and is inflated with zlib directly from the mapped pack. Loose objects are
+read from objects/xx/.
+
+A repack (e. g. "git gc") is detected by the changed pack directory,
+if an object is not found in the known packs.
+
+Resolved bases of deltas are cached in delta_base_cache (an instance of
+:class:`py_fuse_git_bare_fs.object_cache.ObjectCache`). Therefore
+successive versions of a file stored as deltas of each other are not
+reconstructed from the start of the delta chain every time.
+
+https://git-scm.com/docs/pack-format
+https://git-scm.com/docs/gitformat-pack
+"""
+
+import collections
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from .object_cache import ObjectCache
+
+# object types in packs
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+TYPE_NAMES = {OBJ_COMMIT: b'commit', OBJ_TREE: b'tree', OBJ_BLOB: b'blob',
+              OBJ_TAG: b'tag'}
+TYPE_NUMBERS = {name: number for number, name in TYPE_NAMES.items()}
+
+# resolved bases of deltas: (path of the pack, offset) -> (type, data)
+# (at most 96 MiB like the default of core.deltaBaseCacheLimit of git)
+delta_base_cache = ObjectCache(
+    max_entries=4096, max_bytes=100663296, sizeof=lambda value: len(value[1]))
+
+
+def get_controldir(src_dir):
+    """
+    :param src_dir: path to the git repository as str
+    :return: path of the git control directory of the repository
+
+    For a non-bare repository the control directory is .git.
+    """
+    if os.path.isdir(os.path.join(src_dir, 'objects')):
+        return src_dir
+    return os.path.join(src_dir, '.git')
+
+
+def _map_file(path):
+    """
+    :param path: path of a file
+    :return: the file mapped read only into memory
+    """
+    with open(path, 'rb') as fd:
+        return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _read_varint(data, pos):
+    """
+    :return: (value, new position) of a size in a delta
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def apply_delta(base, delta):
+    """
+    :param base: data of the base object as bytes
+    :param delta: data of the delta as bytes
+    :return: the data of the object as bytes
+    """
+    base_size, pos = _read_varint(delta, 0)
+    if base_size != len(base):
+        raise ValueError('delta does not fit to its base')
+    size, pos = _read_varint(delta, pos)
+    base = memoryview(base)
+    data = bytearray()
+    end = len(delta)
+    while pos < end:
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:  # copy from base
+            offset = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            length = 0
+            for i in range(3):
+                if opcode & (0x10 << i):
+                    length |= delta[pos] << (8 * i)
+                    pos += 1
+            if length == 0:
+                length = 0x10000
+            data += base[offset:offset + length]
+        elif opcode:  # insert
+            data += delta[pos:pos + opcode]
+            pos += opcode
+        else:
+            raise ValueError('invalid delta opcode 0')
+    if len(data) != size:
+        raise ValueError('delta result has wrong size')
+    return bytes(data)
+
+
+class PackIndex():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    pack index file (version 2) mapped into memory
+
+    Example:
+
+      from py_fuse_git_bare_fs.native_object_store import PackIndex
+      index = PackIndex('objects/pack/pack-[hash].idx')
+      index.find(bytes.fromhex('2e65efe2a145dda7ee51d1741299f848e5bf752e'))
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the pack index file
+        """
+        self.path = path
+        self.map = _map_file(path)
+        if self.map[:8] != b'\377tOc\0\0\0\2':
+            raise ValueError(f'{path} is not a pack index of version 2')
+        self.fanout = struct.unpack_from('>256I', self.map, 8)
+        self.number = self.fanout[255]
+        self.names = 8 + 1024
+        self.offsets = self.names + 24 * self.number
+        self.large_offsets = self.offsets + 4 * self.number
+
+    def __len__(self):
+        return self.number
+
+    def find(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: offset of the object in the pack or None
+        """
+        first = sha[0]
+        low = self.fanout[first - 1] if first > 0 else 0
+        high = self.fanout[first]
+        idx = self.map
+        names = self.names
+        while low < high:
+            mid = (low + high) // 2
+            name = idx[names + 20 * mid:names + 20 * mid + 20]
+            if name < sha:
+                low = mid + 1
+            elif name > sha:
+                high = mid
+            else:
+                offset = struct.unpack_from(
+                    '>I', idx, self.offsets + 4 * mid)[0]
+                if offset & 0x80000000:  # index in 64 bit offset table
+                    offset = struct.unpack_from(
+                        '>Q', idx,
+                        self.large_offsets + 8 * (offset & 0x7fffffff))[0]
+                return offset
+        return None
+
+
+class MultiPackIndex():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    multi-pack-index file (version 1, sha1) mapped into memory
+
+    https://git-scm.com/docs/gitformat-pack
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the multi-pack-index file
+        """
+        self.path = path
+        self.map = _map_file(path)
+        if self.map[:4] != b'MIDX' or self.map[4] != 1 or self.map[5] != 1:
+            raise ValueError(f'{path} is not a multi-pack-index '
+                             'of version 1 with sha1')
+        number_of_chunks = self.map[6]
+        if self.map[7] != 0:
+            raise ValueError(f'{path}: incremental multi-pack-index')
+        number_of_packs = struct.unpack_from('>I', self.map, 8)[0]
+        chunks = {}
+        offsets = []
+        # the table of chunks is terminated by an entry with the id 0
+        for i in range(number_of_chunks + 1):
+            chunk_id, offset = struct.unpack_from(
+                '>4sQ', self.map, 12 + 12 * i)
+            chunks[chunk_id] = offset
+            offsets.append(offset)
+        start = chunks[b'PNAM']
+        end = min(offset for offset in offsets if offset > start)
+        names = self.map[start:end].split(b'\0', number_of_packs)
+        self.pack_names = [name.decode() for name in names[:number_of_packs]]
+        self.fanout = struct.unpack_from('>256I', self.map, chunks[b'OIDF'])
+        self.number = self.fanout[255]
+        self.names = chunks[b'OIDL']
+        self.offsets = chunks[b'OOFF']
+        self.large_offsets = chunks.get(b'LOFF', None)
+
+    def __len__(self):
+        return self.number
+
+    def find(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: (name of the pack index, offset in the pack) or None
+        """
+        first = sha[0]
+        low = self.fanout[first - 1] if first > 0 else 0
+        high = self.fanout[first]
+        midx = self.map
+        names = self.names
+        while low < high:
+            mid = (low + high) // 2
+            name = midx[names + 20 * mid:names + 20 * mid + 20]
+            if name < sha:
+                low = mid + 1
+            elif name > sha:
+                high = mid
+            else:
+                pack_number, offset = struct.unpack_from(
+                    '>II', midx, self.offsets + 8 * mid)
+                if offset & 0x80000000:  # index in 64 bit offset table
+                    offset = struct.unpack_from(
+                        '>Q', midx,
+                        self.large_offsets + 8 * (offset & 0x7fffffff))[0]
+                return self.pack_names[pack_number], offset
+        return None
+
+
+class Pack():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    pack file mapped into memory
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the pack file
+        """
+        self.path = path
+        self.map = _map_file(path)
+        self.view = memoryview(self.map)
+
+    def read_header(self, offset):
+        """
+        :param offset: offset of an object in the pack
+        :return: (type, size, offset of the data, base) with base the
+                 offset of the base object for OBJ_OFS_DELTA, the binary
+                 sha1 of the base object for OBJ_REF_DELTA or None
+        """
+        pack = self.map
+        byte = pack[offset]
+        obj_type = (byte >> 4) & 7
+        size = byte & 15
+        shift = 4
+        pos = offset + 1
+        while byte & 0x80:
+            byte = pack[pos]
+            pos += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        base = None
+        if obj_type == OBJ_OFS_DELTA:
+            byte = pack[pos]
+            pos += 1
+            base_distance = byte & 0x7f
+            while byte & 0x80:
+                byte = pack[pos]
+                pos += 1
+                base_distance = ((base_distance + 1) << 7) | (byte & 0x7f)
+            base = offset - base_distance
+        elif obj_type == OBJ_REF_DELTA:
+            base = pack[pos:pos + 20]
+            pos += 20
+        return obj_type, size, pos, base
+
+    def inflate(self, offset, size):
+        """
+        :param offset: offset of the zlib stream in the pack
+        :param size: size of the inflated data
+        :return: the inflated data as bytes
+        """
+        decompressor = zlib.decompressobj()
+        # a zlib stream is at most a few bytes larger than its content
+        chunk = size + 64
+        parts = []
+        while not decompressor.eof:
+            compressed = self.view[offset:offset + chunk]
+            if not compressed:
+                raise ValueError(f'truncated object in {self.path}')
+            parts.append(decompressor.decompress(compressed))
+            offset += chunk
+            chunk = 65536
+        data = b''.join(parts)
+        if len(data) != size:
+            raise ValueError(f'corrupt object in {self.path}')
+        return data
+
+    def inflate_prefix(self, offset, size):
+        """
+        :param offset: offset of the zlib stream in the pack
+        :param size: maximal size of the inflated data
+        :return: at most size bytes from the beginning of the inflated data
+        """
+        return zlib.decompressobj().decompress(
+            self.view[offset:offset + size + 64], size)
+
+
+class NativeObjectStore():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Object store of a git repository read by pure python.
+
+    Objects are searched in the multi-pack-index (if available), in the
+    pack indexes not covered by it, as loose objects and in the alternate
+    object directories. If an object is not found and the pack directory
+    has changed, the packs are read again.
+
+    Example:
+
+      from py_fuse_git_bare_fs.native_object_store import NativeObjectStore
+      store = NativeObjectStore('.git/objects')
+      store.get_object(
+          bytes.fromhex('2e65efe2a145dda7ee51d1741299f848e5bf752e'))
+    """
+
+    def __init__(self, objects_dir, alternates=True):
+        """
+        :param objects_dir: path of the object directory
+        :param alternates: if True, the alternate object directories given
+                           in info/alternates are used, too
+        """
+        if not os.path.isdir(objects_dir):
+            raise FileNotFoundError(objects_dir)
+        self.objects_dir = objects_dir
+        self.pack_dir = os.path.join(objects_dir, 'pack')
+        self.lock = threading.Lock()
+        self.signature = None
+        self.midx = None
+        self.indexes = []
+        self.packs = {}
+        self.reloads = 0
+        self._load_packs()
+        self.alternates = []
+        if alternates:
+            self._load_alternates()
+
+    def _get_signature(self):
+        """
+        :return: signature of the pack directory or None
+        """
+        try:
+            stat = os.stat(self.pack_dir)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _load_packs(self):
+        """
+        maps the (multi-)pack-index files of the pack directory into memory
+        """
+        signature = self._get_signature()
+        midx = None
+        indexes = []
+        try:
+            filenames = sorted(os.listdir(self.pack_dir))
+        except FileNotFoundError:
+            filenames = []
+        covered = set()
+        if 'multi-pack-index' in filenames:
+            try:
+                midx = MultiPackIndex(
+                    os.path.join(self.pack_dir, 'multi-pack-index'))
+                covered = set(midx.pack_names)
+            except (FileNotFoundError, ValueError, KeyError):
+                midx = None
+        for filename in filenames:
+            if filename.endswith('.idx') and filename not in covered and \
+                    filename[:-4] + '.pack' in filenames:
+                try:
+                    indexes.append(
+                        (PackIndex(os.path.join(self.pack_dir, filename)),
+                         filename))
+                except (FileNotFoundError, ValueError):
+                    pass
+        # the largest packs first
+        indexes.sort(key=lambda index: len(index[0]), reverse=True)
+        with self.lock:
+            self.signature = signature
+            self.midx = midx
+            self.indexes = indexes
+            self.packs = {}
+
+    def _load_alternates(self):
+        """
+        reads the alternate object directories
+        """
+        try:
+            with open(os.path.join(self.objects_dir, 'info', 'alternates'),
+                      encoding='utf-8') as fd:
+                lines = fd.read().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                path = os.path.join(self.objects_dir, line)
+                try:
+                    # alternates of alternates are not followed
+                    self.alternates.append(
+                        NativeObjectStore(path, alternates=False))
+                except FileNotFoundError:
+                    pass
+
+    def _get_pack(self, index_name):
+        """
+        :param index_name: name of the pack index file
+        :return: the pack as instance of Pack
+        """
+        with self.lock:
+            pack = self.packs.get(index_name, None)
+        if pack is None:
+            pack = Pack(os.path.join(self.pack_dir,
+                                     index_name[:-4] + '.pack'))
+            with self.lock:
+                pack = self.packs.setdefault(index_name, pack)
+        return pack
+
+    def _locate_in_packs(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: (pack, offset) or None
+
+        If a pack file was removed after its index was read (e. g. by
+        "git repack" or "git gc"), the packs are read again.
+        """
+        try:
+            return self._find_in_packs(sha)
+        except FileNotFoundError:
+            self.reloads += 1
+            self._load_packs()
+        return self._find_in_packs(sha)
+
+    def _find_in_packs(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: (pack, offset) or None
+        """
+        with self.lock:
+            midx = self.midx
+            indexes = self.indexes
+        if midx is not None:
+            location = midx.find(sha)
+            if location is not None:
+                return self._get_pack(location[0]), location[1]
+        for index, index_name in indexes:
+            offset = index.find(sha)
+            if offset is not None:
+                return self._get_pack(index_name), offset
+        return None
+
+    def locate(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: ('pack', pack, offset) or ('loose', path) or None
+        """
+        location = self._locate_in_packs(sha)
+        if location is not None:
+            return ('pack',) + location
+        hexsha = sha.hex()
+        path = os.path.join(self.objects_dir, hexsha[:2], hexsha[2:])
+        if os.path.isfile(path):
+            return ('loose', path)
+        if self._get_signature() != self.signature:
+            # repacked in the meantime
+            self.reloads += 1
+            self._load_packs()
+            location = self._locate_in_packs(sha)
+            if location is not None:
+                return ('pack',) + location
+            if os.path.isfile(path):  # not packed anymore (unlikely)
+                return ('loose', path)
+        for alternate in self.alternates:
+            location = alternate.locate(sha)
+            if location is not None:
+                return location
+        return None
+
+    @staticmethod
+    def _read_loose(path, header_only=False):
+        """
+        :param path: path of a loose object
+        :param header_only: if True, only type and size are read
+        :return: (type, size, data) with data None if header_only is True
+        """
+        with open(path, 'rb') as fd:
+            if header_only:
+                raw = zlib.decompressobj().decompress(fd.read(256), 64)
+            else:
+                raw = zlib.decompress(fd.read())
+        nulpos = raw.index(b'\0')
+        type_name, size = raw[:nulpos].split(b' ')
+        size = int(size)
+        data = None
+        if not header_only:
+            data = raw[nulpos + 1:]
+            if len(data) != size:
+                raise ValueError(f'corrupt loose object {path}')
+        return TYPE_NUMBERS[type_name], size, data
+
+    def _read_packed(self, pack, offset):
+        """
+        :param pack: pack as instance of Pack
+        :param offset: offset of the object in the pack
+        :return: (type, data) with the deltas applied
+
+        The resolved bases of deltas are stored in delta_base_cache.
+        Therefore a delta chain is only followed up to a cached base.
+        """
+        deltas = []
+        while True:
+            if deltas:
+                cached = delta_base_cache.get((pack.path, offset))
+                if cached is not None:
+                    obj_type, data = cached
+                    break
+            obj_type, size, data_offset, base = pack.read_header(offset)
+            if obj_type == OBJ_OFS_DELTA:
+                deltas.append((pack, offset, data_offset, size))
+                offset = base
+            elif obj_type == OBJ_REF_DELTA:
+                deltas.append((pack, offset, data_offset, size))
+                location = self.locate(base)
+                if location is None:
+                    raise KeyError(base.hex())
+                if location[0] == 'loose':
+                    obj_type, _, data = self._read_loose(location[1])
+                    break
+                pack, offset = location[1:]
+            else:
+                data = pack.inflate(data_offset, size)
+                if deltas:
+                    delta_base_cache.put((pack.path, offset),
+                                         (obj_type, data))
+                break
+        for i in range(len(deltas) - 1, -1, -1):
+            delta_pack, delta_offset, data_offset, size = deltas[i]
+            data = apply_delta(data, delta_pack.inflate(data_offset, size))
+            if i > 0:  # base of the next delta
+                delta_base_cache.put((delta_pack.path, delta_offset),
+                                     (obj_type, data))
+        return obj_type, data
+
+    def get_object(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: (type name, data), e. g. (b'blob', b'foo\\n')
+
+        KeyError is raised for a missing object.
+        """
+        location = self.locate(sha)
+        if location is None:
+            raise KeyError(sha.hex())
+        if location[0] == 'loose':
+            obj_type, _, data = self._read_loose(location[1])
+        else:
+            obj_type, data = self._read_packed(location[1], location[2])
+        return TYPE_NAMES[obj_type], data
+
+    def get_size(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: size of the object
+
+        Only the header of the object (or of the delta) is inflated.
+        KeyError is raised for a missing object.
+        """
+        location = self.locate(sha)
+        if location is None:
+            raise KeyError(sha.hex())
+        if location[0] == 'loose':
+            return self._read_loose(location[1], header_only=True)[1]
+        pack, offset = location[1:]
+        obj_type, size, data_offset, _ = pack.read_header(offset)
+        if obj_type in (OBJ_OFS_DELTA, OBJ_REF_DELTA):
+            # the delta starts with the size of the base and of the result
+            prefix = pack.inflate_prefix(data_offset, 20)
+            _, pos = _read_varint(prefix, 0)
+            size, _ = _read_varint(prefix, pos)
+        return size
+
+    def get_type(self, sha):
+        """
+        :param sha: binary sha1 of the object (20 bytes)
+        :return: type name of the object, e. g. b'tag'
+
+        Only the headers of the object (and of the bases of a delta) are
+        read. KeyError is raised for a missing object.
+        """
+        location = self.locate(sha)
+        while location is not None:
+            if location[0] == 'loose':
+                return TYPE_NAMES[
+                    self._read_loose(location[1], header_only=True)[0]]
+            pack, offset = location[1:]
+            obj_type, _, _, base = pack.read_header(offset)
+            if obj_type == OBJ_OFS_DELTA:
+                location = ('pack', pack, base)
+            elif obj_type == OBJ_REF_DELTA:
+                location = self.locate(base)
+            else:
+                return TYPE_NAMES[obj_type]
+        raise KeyError(sha.hex())
+
+
+class NativeObjectStoreRegistry():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Registry of object stores of git repositories.
+
+    At most max_repos object stores are kept; the least recently used
+    one is removed. The mapped files are unmapped, if the object store
+    is not used anymore.
+
+    Example:
+
+      from py_fuse_git_bare_fs.native_object_store import \\
+          native_object_store_registry
+      store = native_object_store_registry.get('.')
+    """
+
+    def __init__(self, max_repos=64):
+        """
+        :param max_repos: maximal number of kept object stores
+        """
+        self.max_repos = max_repos
+        self.lock = threading.Lock()
+        self.stores = collections.OrderedDict()
+
+    def get(self, src_dir):
+        """
+        :param src_dir: path to the git repository as str
+        :return: the object store as instance of NativeObjectStore
+
+        FileNotFoundError is raised, if src_dir is not a git repository.
+        """
+        src_dir = os.path.abspath(src_dir)
+        with self.lock:
+            store = self.stores.get(src_dir, None)
+            if store is not None:
+                self.stores.move_to_end(src_dir)
+                return store
+        store = NativeObjectStore(
+            os.path.join(get_controldir(src_dir), 'objects'))
+        with self.lock:
+            store = self.stores.setdefault(src_dir, store)
+            while len(self.stores) > self.max_repos:
+                self.stores.popitem(last=False)
+        return store
+
+    def remove(self, src_dir):
+        """
+        removes the object store of src_dir
+        """
+        with self.lock:
+            self.stores.pop(os.path.abspath(src_dir), None)
+
+
+native_object_store_registry = NativeObjectStoreRegistry()
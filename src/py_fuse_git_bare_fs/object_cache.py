@@ -0,0 +1,163 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Process-wide caches for data derived from git objects.
+
+git objects are content-addressed: an object with a given hash has always
+the same content. Therefore data derived from an object can be shared
+between commits and between repositories (e. g. forks of a project).
+"""
+
+import collections
+import threading
+
+
+class ObjectCache():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Thread safe cache with at most max_entries entries.
+    If max_bytes is given, the sum of the sizes of the values (given by
+    the function sizeof) is at most max_bytes, too.
+    The least recently used entry is removed first.
+
+    The cached values are shared; they must not be modified.
+
+    Example:
+
+      from py_fuse_git_bare_fs.object_cache import ObjectCache
+      cache = ObjectCache(max_entries=2)
+      cache.put('a', 1)
+      cache.get('a')
+    """
+
+    def __init__(self, max_entries=65536, max_bytes=None, sizeof=len):
+        """
+        :param max_entries: maximal number of cached entries
+        :param max_bytes: maximal sum of the sizes of the values or None
+        :param sizeof: function (value) -> size of the value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """
+        :param key: key of the entry, e. g. the hash of a git object
+        :return: cached value or None
+        """
+        with self.lock:
+            value = self.entries.get(key, None)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+        return value
+
+    def get_many(self, keys):
+        """
+        :param keys: list of keys
+        :return: list of the cached values (None for not cached keys)
+        """
+        values = []
+        with self.lock:
+            for key in keys:
+                value = self.entries.get(key, None)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                values.append(value)
+        return values
+
+    def _put(self, key, value):
+        """
+        stores an entry (the lock has to be held)
+        """
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:
+                return  # would remove all other entries
+            old_value = self.entries.get(key, None)
+            if old_value is not None:
+                self.size -= self.sizeof(old_value)
+            self.size += size
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+    def _evict(self):
+        """
+        removes the least recently used entries (the lock has to be held)
+        """
+        while len(self.entries) > self.max_entries:
+            _, value = self.entries.popitem(last=False)
+            if self.max_bytes is not None:
+                self.size -= self.sizeof(value)
+        if self.max_bytes is not None:
+            while self.size > self.max_bytes:
+                _, value = self.entries.popitem(last=False)
+                self.size -= self.sizeof(value)
+
+    def put(self, key, value):
+        """
+        :param key: key of the entry, e. g. the hash of a git object
+        :param value: value to store (not None)
+        """
+        with self.lock:
+            self._put(key, value)
+            self._evict()
+
+    def victim(self, size):
+        """
+        :param size: size of a new value
+        :return: key of the entry removed first to store a new entry with
+                 a value of this size or None, if no entry is removed
+        """
+        with self.lock:
+            if (len(self.entries) < self.max_entries) and (
+                    (self.max_bytes is None) or
+                    (self.size + size <= self.max_bytes)):
+                return None
+            return next(iter(self.entries), None)
+
+    def put_many(self, items):
+        """
+        :param items: list of tuples (key, value)
+        """
+        with self.lock:
+            for key, value in items:
+                self._put(key, value)
+            self._evict()
+
+    def clear(self):
+        """
+        removes all entries
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# parsed tree objects: tree hash (str) -> level as given by get_tree_level
+tree_cache = ObjectCache(max_entries=65536)
+# sizes of blobs: blob hash (bytes) -> size (int)
+blob_size_cache = ObjectCache(max_entries=1048576)
@@ -0,0 +1,37 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Handing read data to fusepy without copying it.
+
+fusepy copies the result of the operation read by ctypes.memmove into the
+buffer of the kernel. ctypes.memmove accepts bytes and ctypes arrays, but
+not a memoryview. A memoryview (e. g. a part of a cached file, see
+:mod:`py_fuse_git_bare_fs.simple_file_cache`) is therefore provided as a
+ctypes array using the same memory; then the data is copied only once.
+"""
+
+import ctypes
+
+
+def read_buffer(data):
+    """
+    :param data: read data as bytes or memoryview
+    :return: data as object accepted by fusepy (bytes or ctypes array)
+
+    Example:
+
+      from py_fuse_git_bare_fs.read_buffer import read_buffer
+      buf = read_buffer(memoryview(bytearray(b'abc'))[1:])
+      bytes(buf)
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    if isinstance(data, memoryview):
+        if data.readonly or (not data.c_contiguous) or (len(data) == 0):
+            return bytes(data)
+        return (ctypes.c_char * len(data)).from_buffer(data)
+    return data
@@ -0,0 +1,316 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Resolution of references (e. g. branches or tags) of git repositories by
+reading the loose references and the file packed-refs directly.
+
+A resolved reference is cached together with a signature of all read
+files (inode, modification time and size). As long as this signature is
+unchanged, the cached result is used; checking it needs only a few
+calls of os.stat instead of starting a git process.
+
+If the repository is watched by inotify (see
+:mod:`py_fuse_git_bare_fs.ref_watcher`), the cached result is used as
+long as no change was notified; then not even os.stat is called.
+
+Symbolic references (e. g. HEAD) are followed and annotated tags are
+peeled to the tagged commit.
+
+With :class:`RefCheckWindow` a resolved reference can be reused for a
+given time without any check (freshness window).
+"""
+
+import os
+import re
+import threading
+import time
+
+from .native_object_store import get_controldir, native_object_store_registry
+from .object_cache import ObjectCache
+from .ref_watcher import ref_watcher
+
+# names, which can be resolved as references (no revision expressions)
+_REFNAME_REGPAT = re.compile(r'^[A-Za-z0-9_+/.-]+$')
+_HASH_REGPAT = re.compile(r'^[0-9a-f]{40}$')
+
+
+def _stat_signature(paths):
+    """
+    :param paths: list of paths of files
+    :return: tuple of (inode, modification time, size) or None
+             for every file
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            signature.append(None)
+        else:
+            signature.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class RefResolver():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Resolves references of git repositories and caches the results.
+
+    Like "git rev-parse" a name is searched as given, in refs/, in
+    refs/tags/, in refs/heads/, in refs/remotes/ and as
+    refs/remotes/[name]/HEAD. A full hash is used as given.
+
+    Names, which are not references (e. g. 'master~1'), and repositories
+    using reftable are resolved by the function fallback (e. g. get_ref
+    from :mod:`py_fuse_git_bare_fs.repotools`) without caching.
+
+    Example:
+
+      from py_fuse_git_bare_fs.ref_resolver import ref_resolver
+      commit_hash = ref_resolver.resolve('.', b'master')
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (src_dir, root_object) -> (paths, signature, generation, result)
+        self.refs = {}
+        # controldir -> (signature, {refname: (hash, peeled hash or None)})
+        self.packed_refs = {}
+        # hash (str) -> peeled hash (str) of annotated tags and commits
+        self.peeled = ObjectCache(max_entries=65536)
+        self.hits = 0
+        self.misses = 0
+
+    def _read_packed_refs(self, controldir):
+        """
+        :param controldir: path to the git control directory
+        :return: {refname: (hash, peeled hash or None)}
+        """
+        path = os.path.join(controldir, 'packed-refs')
+        signature = _stat_signature([path])
+        with self.lock:
+            cached = self.packed_refs.get(controldir, None)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        refs = {}
+        try:
+            with open(path, encoding='utf-8') as fd:
+                refname = None
+                for line in fd:
+                    if line.startswith('#'):
+                        continue
+                    if line.startswith('^'):  # peeled tag of the last line
+                        if refname is not None:
+                            refs[refname] = (refs[refname][0],
+                                             line[1:].strip())
+                        continue
+                    parts = line.split()
+                    if len(parts) == 2:
+                        refname = parts[1]
+                        refs[refname] = (parts[0], None)
+        except FileNotFoundError:
+            pass
+        with self.lock:
+            self.packed_refs[controldir] = (signature, refs)
+        return refs
+
+    def _read_ref(self, controldir, refname, paths, depth=5):
+        """
+        :param controldir: path to the git control directory
+        :param refname: full name of a reference as str, e. g. 'refs/heads/a'
+        :param paths: list to append the paths of the read loose references
+        :param depth: maximal number of followed symbolic references
+        :return: (hash, peeled hash or None) or None
+        """
+        path = os.path.join(controldir, refname)
+        paths.append(path)
+        try:
+            with open(path, encoding='utf-8') as fd:
+                content = fd.read().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return self._read_packed_refs(controldir).get(refname, None)
+        if content.startswith('ref: '):  # symbolic reference
+            if depth == 0:
+                return None
+            return self._read_ref(
+                controldir, content[5:].strip(), paths, depth - 1)
+        return (content, None)
+
+    def _peel(self, src_dir, obj_hash):
+        """
+        :param src_dir: path to the git repository as str
+        :param obj_hash: hash of an object as str
+        :return: hash of the object or of the commit an annotated tag
+                 points to
+        """
+        peeled = self.peeled.get(obj_hash)
+        if peeled is not None:
+            return peeled
+        store = native_object_store_registry.get(src_dir)
+        peeled = obj_hash
+        while store.get_type(bytes.fromhex(peeled)) == b'tag':
+            _, data = store.get_object(bytes.fromhex(peeled))
+            peeled = data[7:47].decode()  # b'object [hash]\n'
+        self.peeled.put(obj_hash, peeled)
+        return peeled
+
+    def _resolve(self, src_dir, name):
+        """
+        :param src_dir: path to the git repository as str
+        :param name: name of the reference as str
+        :return: (paths, result) with result the hash as str or None,
+                 if name can not be resolved as reference
+        """
+        controldir = get_controldir(src_dir)
+        if not os.path.isdir(controldir):
+            raise FileNotFoundError(src_dir)
+        if os.path.isdir(os.path.join(controldir, 'reftable')):
+            return [], None
+        if _HASH_REGPAT.match(name):
+            return [], self._peel(src_dir, name)
+        if (not _REFNAME_REGPAT.match(name)) or ('..' in name) or \
+                name.startswith('/') or name.endswith('/'):
+            return [], None
+        paths = [os.path.join(controldir, 'packed-refs')]
+        for refname in [name, 'refs/' + name, 'refs/tags/' + name,
+                        'refs/heads/' + name, 'refs/remotes/' + name,
+                        'refs/remotes/' + name + '/HEAD']:
+            ref = self._read_ref(controldir, refname, paths)
+            if ref is not None:
+                obj_hash, peeled = ref
+                if peeled is None:
+                    peeled = self._peel(src_dir, obj_hash)
+                return paths, peeled
+        return paths, name + ' missing'
+
+    def resolve(self, src_dir, root_object, fallback=None):
+        """
+        :param src_dir: path to the git repository as str
+        :param root_object: name of the reference as bytes
+        :param fallback: function (src_dir, root_object) -> hash as str
+                         used for names, which are not references
+        :return: hash of the commit as str or error message
+                 '[root_object] missing'
+
+        FileNotFoundError is raised, if src_dir is not a git repository.
+
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+        """
+        key = (src_dir, root_object)
+        generation = ref_watcher.get_generation(src_dir)
+        with self.lock:
+            cached = self.refs.get(key, None)
+        if cached is not None:
+            if generation is None:
+                up_to_date = _stat_signature(cached[0]) == cached[1]
+            else:
+                up_to_date = generation == cached[2]
+            if up_to_date:
+                with self.lock:
+                    self.hits += 1
+                return cached[3]
+        with self.lock:
+            self.misses += 1
+        name = root_object.decode()
+        try:
+            paths, result = self._resolve(src_dir, name)
+            if result is not None:
+                # the references are read again after the signature is
+                # taken; the result is only cached, if it is unchanged
+                signature = _stat_signature(paths)
+                if self._resolve(src_dir, name) == (paths, result):
+                    with self.lock:
+                        self.refs[key] = (paths, signature, generation,
+                                          result)
+                return result
+        except (KeyError, ValueError):
+            pass  # e. g. a missing tag object or an unknown object format
+        if fallback is None:
+            return name + ' missing'
+        return fallback(src_dir, root_object)
+
+    def clear(self):
+        """
+        removes all cached references
+        """
+        with self.lock:
+            self.refs.clear()
+            self.packed_refs.clear()
+            self.hits = 0
+            self.misses = 0
+        self.peeled.clear()
+
+
+class RefCheckWindow():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Reuses the result of a check (e. g. resolving a reference) for
+    interval seconds. After the interval exactly one caller performs the
+    check again; concurrent callers get the last result meanwhile
+    (single-flight). With an interval of 0 every call performs the check.
+
+    Example:
+
+      from py_fuse_git_bare_fs.ref_resolver import RefCheckWindow
+      from py_fuse_git_bare_fs.ref_resolver import ref_resolver
+      window = RefCheckWindow(1.0)
+      commit_hash = window.get(
+          lambda: ref_resolver.resolve('.', b'master'))
+    """
+
+    def __init__(self, interval=0):
+        """
+        :param interval: time in seconds a result is reused
+        """
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.result = None
+        # time.monotonic() until the result is used or None (no result)
+        self.expires = None
+        self.checking = False
+        self.checks = 0
+
+    def get(self, check):
+        """
+        :param check: function without arguments performing the check
+        :return: result of check (maybe of a former call)
+        """
+        if not self.interval:
+            return check()
+        with self.lock:
+            if self.expires is not None and (
+                    self.checking or time.monotonic() < self.expires):
+                return self.result
+            self.checking = True
+            self.checks += 1
+        try:
+            result = check()
+        except BaseException:
+            with self.lock:
+                self.checking = False
+            raise
+        with self.lock:
+            self.result = result
+            self.expires = time.monotonic() + self.interval
+            self.checking = False
+        return result
+
+    def invalidate(self):
+        """
+        the next call of get performs the check (concurrent callers
+        still get the last result)
+        """
+        with self.lock:
+            if self.expires is not None:
+                self.expires = float('-inf')
+
+
+ref_resolver = RefResolver()
@@ -0,0 +1,299 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Notification about changed references of git repositories by inotify.
+
+One thread per process reads the inotify events of all watched
+repositories. Pending events are also read before a generation is
+returned; therefore a change is seen by the next request.
+
+For every repository the directories refs/ (with all subdirectories) and
+the control directory (for HEAD and packed-refs) are watched.
+Every change gives the repository a new generation. As long as the
+generation is unchanged, the references are unchanged. The generations are
+taken from one counter for all repositories; therefore a repository
+watched again (e. g. after it was replaced by another repository at the
+same path) never gets a generation it had before.
+
+If inotify is not available (e. g. not on Linux) or the limit of
+watches is reached, a repository is not watched and the generation is
+None; then the references have to be checked by polling.
+
+inotify does not see changes made on other hosts (e. g. on NFS).
+In this case the watcher has to be disabled (see -no_inotify).
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+
+from .native_object_store import get_controldir
+
+# see /usr/include/linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | \
+    IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | \
+    IN_ONLYDIR
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+def _get_libc():
+    """
+    :return: libc with the inotify functions or None
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        for name in ['inotify_init1', 'inotify_add_watch',
+                     'inotify_rm_watch']:
+            getattr(libc, name)
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class RefWatcher():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Watches the references of git repositories by inotify.
+
+    At most max_watches directories are watched; further repositories
+    are not watched.
+
+    Example:
+
+      from py_fuse_git_bare_fs.ref_watcher import ref_watcher
+      generation = ref_watcher.get_generation('.')
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, enabled=True, max_watches=8192):
+        """
+        :param enabled: if False, no repository is watched
+        :param max_watches: maximal number of watched directories
+        """
+        self.enabled = enabled
+        self.max_watches = max_watches
+        self.lock = threading.Lock()
+        self.libc = None
+        self.inotify_fd = None
+        self.thread = None
+        # src_dir -> generation (int) or None (not watchable)
+        self.generations = {}
+        # last generation given to any repository
+        self.last_generation = 0
+        # src_dir -> {wd: path}
+        self.repo_watches = {}
+        # wd -> {src_dir: path}
+        self.watches = {}
+        # src_dir -> path of the control directory
+        self.controldirs = {}
+        self.events = 0
+
+    def _start(self):
+        """
+        initializes inotify and starts the thread (self.lock is held)
+
+        :return: True on success
+        """
+        if self.inotify_fd is not None:
+            return True
+        self.libc = _get_libc()
+        if self.libc is None:
+            self.enabled = False
+            return False
+        inotify_fd = self.libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if inotify_fd < 0:
+            self.enabled = False
+            return False
+        self.inotify_fd = inotify_fd
+        self.thread = threading.Thread(
+            target=self._run, name='ref_watcher', daemon=True)
+        self.thread.start()
+        return True
+
+    def _add_watch(self, src_dir, path):
+        """
+        adds a watch for the directory path of src_dir (self.lock is held)
+
+        :return: True on success
+        """
+        if len(self.watches) >= self.max_watches:
+            return False
+        wd = self.libc.inotify_add_watch(
+            self.inotify_fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                return True  # removed in the meantime
+            return False  # e. g. ENOSPC: limit of watches reached
+        self.watches.setdefault(wd, {})[src_dir] = path
+        self.repo_watches.setdefault(src_dir, {})[wd] = path
+        return True
+
+    def _add_tree_watches(self, src_dir, path):
+        """
+        adds watches for the directory path and its subdirectories
+        (self.lock is held)
+
+        :return: True on success
+        """
+        for dirpath, _, _ in os.walk(path):
+            if not self._add_watch(src_dir, dirpath):
+                return False
+        return True
+
+    def _next_generation(self):
+        """
+        :return: a new generation (self.lock is held)
+        """
+        self.last_generation += 1
+        return self.last_generation
+
+    def _remove_repo(self, src_dir):
+        """
+        removes all watches of src_dir (self.lock is held)
+        """
+        for wd in self.repo_watches.pop(src_dir, {}):
+            users = self.watches.get(wd, {})
+            users.pop(src_dir, None)
+            if not users:
+                self.watches.pop(wd, None)
+                # fails for an already removed watch (IN_IGNORED)
+                self.libc.inotify_rm_watch(self.inotify_fd, wd)
+
+    def get_generation(self, src_dir):
+        """
+        :param src_dir: path to the git repository as str
+        :return: generation of the references of src_dir as int or None,
+                 if src_dir can not be watched
+
+        The repository is watched on the first call.
+        """
+        with self.lock:
+            if self.inotify_fd is not None:
+                # events of changes made before this call are handled
+                # (they may not be handled by the thread yet)
+                self._read_events()
+            if src_dir in self.generations:
+                return self.generations[src_dir]
+            if not self.enabled or not self._start():
+                return None
+            controldir = os.path.abspath(get_controldir(src_dir))
+            if not os.path.isdir(os.path.join(controldir, 'refs')):
+                return None  # no repository (yet)
+            self.controldirs[src_dir] = controldir
+            if self._add_watch(src_dir, controldir) and \
+                    self._add_tree_watches(
+                        src_dir, os.path.join(controldir, 'refs')):
+                self.generations[src_dir] = self._next_generation()
+            else:
+                # fallback to polling
+                self._remove_repo(src_dir)
+                self.generations[src_dir] = None
+            return self.generations[src_dir]
+
+    def _changed(self, src_dir):
+        """
+        marks the references of src_dir as changed (self.lock is held)
+        """
+        if self.generations.get(src_dir, None) is not None:
+            self.generations[src_dir] = self._next_generation()
+
+    def _handle_event(self, wd, mask, name):
+        """
+        handles one inotify event (self.lock is held)
+        """
+        self.events += 1
+        if mask & IN_Q_OVERFLOW:  # events lost
+            for src_dir in self.generations:
+                self._changed(src_dir)
+            return
+        for src_dir, path in list(self.watches.get(wd, {}).items()):
+            controldir = self.controldirs[src_dir]
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                # a watched directory is removed
+                self._changed(src_dir)
+                if path in [controldir, os.path.join(controldir, 'refs')]:
+                    # watch the repository again on the next request
+                    # (with a new generation)
+                    self._remove_repo(src_dir)
+                    self.generations.pop(src_dir, None)
+                else:
+                    self.repo_watches[src_dir].pop(wd, None)
+                    self.watches[wd].pop(src_dir, None)
+                    if not self.watches[wd]:
+                        del self.watches[wd]
+                continue
+            if name.endswith('.lock'):
+                continue  # a reference is changed by renaming a lock file
+            if path == controldir and name not in ['HEAD', 'packed-refs']:
+                continue  # other files of the control directory
+            if (mask & IN_ISDIR) and (mask & (IN_CREATE | IN_MOVED_TO)):
+                if not self._add_tree_watches(
+                        src_dir, os.path.join(path, name)):
+                    # fallback to polling
+                    self._remove_repo(src_dir)
+                    self.generations[src_dir] = None
+                    continue
+            self._changed(src_dir)
+
+    def _read_events(self):
+        """
+        reads and handles all pending inotify events (self.lock is held)
+        """
+        while True:
+            try:
+                data = os.read(self.inotify_fd, 65536)
+            except InterruptedError:
+                continue
+            except OSError:  # BlockingIOError: no pending event
+                return
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = data[pos:pos + length].rstrip(b'\0')
+                pos += length
+                self._handle_event(wd, mask, os.fsdecode(name))
+
+    def _run(self):
+        """
+        waits for inotify events and handles them
+        """
+        while True:
+            try:
+                select.select([self.inotify_fd], [], [])
+            except InterruptedError:
+                continue
+            except (OSError, ValueError):
+                break
+            with self.lock:
+                self._read_events()
+
+
+ref_watcher = RefWatcher()
@@ -1,7 +1,7 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2022-02-23, 2023-03-31 (last change).
+:Date: 2022-02-23, 2023-03-31, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 """
 
@@ -14,28 +14,56 @@ import hashlib
 import os
 import os.path
 import re
+import threading
 import time
 import warnings
 
+from .blob_stream import open_blob_stream, ReadAheadStream
 from .empty_attr_mixin import _EmptyAttrMixin
+from .object_cache import blob_size_cache
 from .read_write_lock import ReadWriteLock
+from .ref_resolver import RefCheckWindow, ref_resolver
+from .repotools import \
+     get_ref, get_repo_data, get_size_of_blob, get_sizes_of_blobs, \
+     get_tree, get_tree_level
 from .simple_file_cache import SimpleFileCache
 from .simple_file_handler import SimpleFileHandlerClass
-try:
-    from .repotools_dulwich import \
-     get_ref, get_repo_data, get_size_of_blob, get_tree
-except (ModuleNotFoundError, ImportError):
-    from .repotools_git import \
-     get_ref, get_repo_data, get_size_of_blob, get_tree
 
 
 class RepoClass(_EmptyAttrMixin):
     """
     :Author: Daniel Mohr
-    :Date: 2022-02-23, 2023-03-31
+    :Date: 2022-02-23, 2023-03-31, 2026-10-18
 
     https://git-scm.com/book/en/v2
     https://git-scm.com/docs/git-cat-file
+
+    With lazy_tree only the root tree is read on mount. Every other
+    directory is read the first time it is used. With keep_subtrees the
+    already read tree objects are reused after a change of root_object,
+    even if they are moved to another path.
+
+    After a change of root_object only the directories with a changed
+    tree hash are read again (incremental refresh).
+
+    Files with at least stream_min_size bytes are read by streams
+    (see :mod:`py_fuse_git_bare_fs.blob_stream`), if possible. For every
+    file handler a stream is kept, so sequential reads continue the
+    decompression. With read_ahead > 0, sequential reads of a file
+    handler are detected and up to read_ahead bytes after the read data
+    are decompressed in the background (see
+    :class:`py_fuse_git_bare_fs.blob_stream.ReadAheadStream`).
+
+    The repository is read by the backend selected in
+    :mod:`py_fuse_git_bare_fs.repotools`. root_object is resolved by
+    :mod:`py_fuse_git_bare_fs.ref_resolver`, which reads the references
+    again only if their files change. root_object can be a branch, a tag
+    (annotated tags are peeled), a symbolic reference or a hash.
+
+    With ref_check_interval > 0 the resolved root_object is reused for
+    this time in seconds (see
+    :class:`py_fuse_git_bare_fs.ref_resolver.RefCheckWindow`); a change
+    of root_object is seen at the latest after this time.
     """
     # pylint: disable=too-many-instance-attributes
     time_regpat = re.compile(r' ([0-9]+) [0-9+-]+$')
@@ -52,21 +80,48 @@ class RepoClass(_EmptyAttrMixin):
 
     def __init__(self, src_dir, root_object=b'master',
                  max_cache_size=1073741824, cache=None,
-                 simple_file_handler=None, file_st_modes=None):
+                 simple_file_handler=None, file_st_modes=None,
+                 lazy_tree=False, keep_subtrees=False,
+                 stream_min_size=8388608, ref_check_interval=0,
+                 cache_policy='lru', disk_cache=None,
+                 small_cache_entries=65536, small_cache_size=67108864,
+                 cache_compression=False, cache_admission=False,
+                 read_ahead=4194304):
         # pylint: disable=too-many-arguments
         self.src_dir = src_dir
         self.root_object = root_object
+        self._ref_check = RefCheckWindow(ref_check_interval)
         self.tree = None
+        # hashes of the directories in self.tree: {path: hash}
+        self.tree_hashes = {}
         self.commit_hash = None
         self.tree_hash = None
         # we use the last commit time for everything, could be enhanced
         self.time = None
+        self.lazy_tree = lazy_tree
+        self.keep_subtrees = keep_subtrees
+        # directories (tree objects) read for the actual and the last commit
+        # (only used with keep_subtrees)
+        self._tree_levels = {}
+        self._old_tree_levels = {}
         if cache is None:
-            self.cache = SimpleFileCache(max_cache_size=max_cache_size)
+            self.cache = SimpleFileCache(
+                max_cache_size=max_cache_size, policy=cache_policy,
+                disk_cache=disk_cache,
+                small_cache_entries=small_cache_entries,
+                small_cache_size=small_cache_size,
+                compression=cache_compression,
+                admission=cache_admission)
         else:
             self.cache = cache
         self.content_cache = {}
         self.content_cache_size = 0
+        self.stream_min_size = stream_min_size
+        self.read_ahead = read_ahead
+        # streams of the opened files: {file_handler: (blob_hash, stream)}
+        # (with read_ahead the streams are instances of ReadAheadStream)
+        self._blob_streams = {}
+        self._blob_streams_lock = threading.Lock()
         if simple_file_handler is None:
             self.simple_file_handler = SimpleFileHandlerClass()
         else:
@@ -82,12 +137,23 @@ class RepoClass(_EmptyAttrMixin):
             self._read_tree()
 
     def __del__(self):
+        for _, stream in self._blob_streams.values():
+            if stream is not None:
+                stream.close()
         self.simple_file_handler.remove_repo(self.src_dir)
-        self.cache.clear_repo_old(self.src_dir)
         self.lock.acquire_write()
 
+    def _get_ref(self):
+        """
+        :return: hash of the commit of self.root_object as str or
+                 error message
+        """
+        return self._ref_check.get(
+            lambda: ref_resolver.resolve(
+                self.src_dir, self.root_object, fallback=get_ref))
+
     def _cache_up_to_date(self):
-        if get_ref(self.src_dir, self.root_object) == self.commit_hash:
+        if self._get_ref() == self.commit_hash:
             return True
         self.simple_file_handler.remove_repo(self.src_dir)
         return False
@@ -95,14 +161,20 @@ class RepoClass(_EmptyAttrMixin):
     def _update_cache(self, update_cache=None):
         if (update_cache) or (not self._cache_up_to_date()):
             self.tree = None
+            self.tree_hashes = {}
             self.commit_hash = None
             self.tree_hash = None
             self.time = None
             self.content_cache = {}
-            self.cache.clear_repo_old(self.src_dir)
+            commit_hash = self._get_ref()
+            if commit_hash.endswith(' missing'):
+                commit_hash = self.root_object
+            else:
+                # the resolved (and peeled) commit
+                commit_hash = commit_hash.encode()
             repo_data = get_repo_data(
                 self.src_dir,
-                self.root_object,
+                commit_hash,
                 self.time_regpat)
             if isinstance(repo_data, tuple):
                 (self.commit_hash, self.tree_hash, self.time) = repo_data
@@ -111,36 +183,186 @@ class RepoClass(_EmptyAttrMixin):
         return True
 
     def _read_tree(self, update_cache=None):
+        """
+        self.lock has to have the write lock
+
+        If there is already a tree, it is adapted by _patch_tree.
+        """
+        old_tree = self.tree
+        old_tree_hashes = self.tree_hashes
         if not self._update_cache(update_cache=update_cache):
             return
+        if self.keep_subtrees:
+            self._old_tree_levels = self._tree_levels
+            self._tree_levels = {}
+        if old_tree is not None:
+            self.tree = old_tree
+            self.tree_hashes = old_tree_hashes
+            self._patch_tree('/', self.tree_hash)
+            return
         # self.tree[path] =
         #   {'listdir': [], 'blobs': {name: {'mode': str, 'hash': str}}}
-        self.tree = get_tree(
-            self.src_dir, self.tree_hash, self.tree_content_regpat)
+        # with lazy_tree or after _patch_tree additional: 'trees': {name: hash}
+        self.tree_hashes = {}
+        if self.lazy_tree:
+            self.tree = {'/': self._get_tree_level(self.tree_hash)}
+            self.tree_hashes['/'] = self.tree_hash
+        else:
+            self.tree = get_tree(
+                self.src_dir, self.tree_hash, self.tree_content_regpat,
+                tree_hashes=self.tree_hashes)
 
-    def _get_size_of_blob(self, head, tail):
-        if 'st_size' not in self.tree[head]['blobs'][tail]:
-            self.tree[head]['blobs'][tail]['st_size'] = get_size_of_blob(
-                self.src_dir,
-                self.tree[head]['blobs'][tail]['hash'].encode())
+    def _patch_tree(self, path, tree_hash):
+        """
+        self.lock has to have the write lock
 
-    def readdir(self, path):
+        Adapts the directory path and its subdirectories in self.tree to the
+        tree tree_hash. Only subdirectories with a changed hash are read.
+        Subdirectories not read before (lazy_tree) are not read.
+
+        :param path: path of a directory in self.tree
+        :param tree_hash: new hash of the directory path
+
+        The cached content of files needs no adaption, since it is cached
+        by the hash of the blobs.
         """
-        :param path: string of the path to read/list
+        if self.tree_hashes[path] == tree_hash:
+            return
+        old_level = self.tree[path]
+        level = self._get_tree_level(tree_hash)
+        self.tree[path] = level
+        self.tree_hashes[path] = tree_hash
+        for name in old_level['listdir']:
+            subpath = os.path.join(path, name)
+            if (name in old_level['blobs']) or (subpath not in self.tree):
+                continue
+            if name in level['trees']:
+                self._patch_tree(subpath, level['trees'][name])
+            else:
+                self._remove_tree(subpath)
+        if not self.lazy_tree:
+            for name, subtree_hash in level['trees'].items():
+                subpath = os.path.join(path, name)
+                if subpath not in self.tree:
+                    self._add_tree(subpath, subtree_hash)
+
+    def _remove_tree(self, path):
+        """
+        self.lock has to have the write lock
+
+        Removes the directory path and its subdirectories from self.tree.
+        """
+        level = self.tree.pop(path)
+        del self.tree_hashes[path]
+        for name in level['listdir']:
+            subpath = os.path.join(path, name)
+            if (name not in level['blobs']) and (subpath in self.tree):
+                self._remove_tree(subpath)
+
+    def _add_tree(self, path, tree_hash):
+        """
+        self.lock has to have the write lock
+
+        Adds the directory path and its subdirectories to self.tree.
+        """
+        if tree_hash is None:  # submodule
+            self.tree[path] = self._get_tree_level(tree_hash)
+            self.tree_hashes[path] = tree_hash
+            return
+        tree_hashes = {}
+        subtree = get_tree(self.src_dir, tree_hash, self.tree_content_regpat,
+                           tree_hashes=tree_hashes)
+        for subpath, level in subtree.items():
+            self.tree[path + subpath.rstrip('/')] = level
+            self.tree_hashes[path + subpath.rstrip('/')] = \
+                tree_hashes[subpath]
+
+    def _refresh_tree(self):
+        """
+        reads the tree again, if root_object has changed
         """
         if not self._cache_up_to_date():
             with self.lock.write_locked():
                 self._read_tree(update_cache=True)
-        else:
-            # remove old cached files
-            self.cache.clear_repo_old(self.src_dir)
-        self.lock.acquire_read()
-        ret = None
-        if (self.tree is None) or (path not in self.tree):
-            ret = ['.', '..']
-        else:
-            ret = ['.', '..'] + self.tree[path]['listdir']
-        self.lock.release_read()
+            return True
+        return False
+
+    def _get_tree_level(self, tree_hash):
+        """
+        :param tree_hash: hash of the tree as str or None for a submodule
+        :return: the directory tree_hash as dict
+        """
+        if tree_hash is None:  # submodule, provided as empty directory
+            return {'listdir': [], 'blobs': {}, 'trees': {}}
+        level = self._tree_levels.get(tree_hash, None)
+        if level is None:
+            level = self._old_tree_levels.get(tree_hash, None)
+            if level is None:
+                level = get_tree_level(self.src_dir, tree_hash)
+            if self.keep_subtrees:
+                self._tree_levels[tree_hash] = level
+        return level
+
+    def _get_tree_dir(self, path):
+        """
+        self.lock has to have the read lock
+
+        :param path: path of a directory
+        :return: the directory path as dict or None if path is not a directory
+
+        With lazy_tree the directory is read, if it is not read before.
+        """
+        if self.tree is None:
+            return None
+        if path in self.tree:
+            return self.tree[path]
+        if (not self.lazy_tree) or (path == '/'):
+            return None
+        head, tail = os.path.split(path)
+        parent = self._get_tree_dir(head)
+        if (parent is None) or (tail not in parent['trees']):
+            return None
+        # a dict is thread safe, a parallel read of the same directory
+        # is not a problem
+        level = self._get_tree_level(parent['trees'][tail])
+        self.tree_hashes[path] = parent['trees'][tail]
+        self.tree[path] = level
+        return level
+
+    def _get_size_of_blob(self, blob):
+        """
+        :param blob: dict of the blob {'mode': str, 'hash': str}
+        :return: size of the blob
+
+        The sizes are cached in blob_size_cache (content-addressed),
+        therefore the shared dict blob is not modified.
+        """
+        blob_hash = blob['hash'].encode()
+        # typically the size is already read by readdir
+        size = blob_size_cache.get(blob_hash)
+        if size is None:
+            size = get_size_of_blob(self.src_dir, blob_hash)
+        return size
+
+    def readdir(self, path):
+        """
+        :param path: string of the path to read/list
+        """
+        self._refresh_tree()
+        with self.lock.read_locked():
+            tree_dir = self._get_tree_dir(path)
+            if tree_dir is None:
+                ret = ['.', '..']
+            else:
+                ret = ['.', '..'] + tree_dir['listdir']
+        if (tree_dir is not None) and bool(tree_dir['blobs']):
+            # typically getattr is called for every entry next (e. g. ls -l),
+            # therefore we read all sizes not cached yet at once
+            missing = [
+                blob['hash'].encode() for blob in tree_dir['blobs'].values()
+                if blob['hash'].encode() not in blob_size_cache]
+            if missing:
+                get_sizes_of_blobs(self.src_dir, missing)
         return ret
 
     def _get_annex_path_bare_repo(self, path):
@@ -176,19 +398,11 @@ class RepoClass(_EmptyAttrMixin):
         get attributes of the path
         """
         # pylint: disable=too-many-branches,too-many-statements
-        updated_cache = False
-        if not self._cache_up_to_date():
-            updated_cache = True
-            with self.lock.write_locked():
-                self._read_tree(update_cache=True)
+        self._refresh_tree()
         head, tail = os.path.split(path)
-        self.lock.acquire_read()
-        if ((updated_cache) or
-                (self.tree is None) or (head not in self.tree)):
-            if not updated_cache:
-                with self.lock.write_locked():
-                    self._read_tree()
-            if (self.tree is None) or (head not in self.tree):
+        with self.lock.read_locked():
+            tree_head = self._get_tree_dir(head)
+            if tree_head is None:
                 # file:///usr/share/doc/python3/html/library/errno.html
                 # no such file or directory
                 if (tail == '') and (head == '/'):
@@ -199,55 +413,49 @@ class RepoClass(_EmptyAttrMixin):
                     ret = self._empty_dir_attr.copy()
                     ret['st_atime'] = ret['st_mtime'] = ret['st_ctime'] = \
                         time.time()
-                    self.lock.release_read()
                     return ret
-                self.lock.release_read()
-                raise fusepy.FuseOSError(errno.ENOENT)
-        ret = {}
-        ret['st_uid'], ret['st_gid'] = self.st_uid_st_gid
-        ret['st_atime'] = ret['st_mtime'] = ret['st_ctime'] = self.time
-        if (tail == '') or (path in self.tree):  # path is dir
-            ret['st_mode'] = self._empty_dir_attr['st_mode']
-            ret['st_size'] = 4096  # typical for ext4
-        else:  # path is blob
-            # https://git-scm.com/book/en/v2/Git-Internals-Git-Objects
-            # 100644 normal file
-            # 100755 executable file
-            # 120000 symbolic link
-            if tail not in self.tree[head]['blobs']:
-                # no such file or directory
-                self.lock.release_read()
                 raise fusepy.FuseOSError(errno.ENOENT)
-            st_mode = self.gitmode2st_mode[
-                self.tree[head]['blobs'][tail]['mode']]
-            self._get_size_of_blob(head, tail)
-            st_size = self.tree[head]['blobs'][tail]['st_size']
-            if st_mode == 41471:  # 120000 symbolic link
-                # check if it is an accessable git-annex file
-                blob_hash = self.tree[head]['blobs'][tail]['hash'].encode()
-                link_path = self.cache.get(
-                    self.src_dir, path,
-                    blob_hash, st_size, st_size, 0).decode()
-                #      self._get_annex_path_bare_repo(link_path))
-                #      self._get_annex_path_non_bare_repo(link_path))
-                annex_object = self.annex_object_regpat.findall(link_path)
-                if annex_object:
-                    apath = self._get_annex_path(link_path)
-                    if apath is not None:
-                        # git annex file stored locally
-                        stat = os.lstat(apath)
-                        st_mode = stat.st_mode  # default to be overwritten
-                        # we have to decide if
-                        # apath is normal file or executable
-                        if os.access(apath, os.X_OK):  # executable
-                            st_mode = self.gitmode2st_mode['100755']
-                        else:  # assume normal file
-                            st_mode = self.gitmode2st_mode['100644']
-                        st_size = stat.st_size
-            ret['st_mode'] = st_mode
-            ret['st_size'] = st_size
-        self.lock.release_read()
-        return ret
+            ret = {}
+            ret['st_uid'], ret['st_gid'] = self.st_uid_st_gid
+            ret['st_atime'] = ret['st_mtime'] = ret['st_ctime'] = self.time
+            if (tail == '') or (self._get_tree_dir(path) is not None):  # dir
+                ret['st_mode'] = self._empty_dir_attr['st_mode']
+                ret['st_size'] = 4096  # typical for ext4
+            else:  # path is blob
+                # https://git-scm.com/book/en/v2/Git-Internals-Git-Objects
+                # 100644 normal file
+                # 100755 executable file
+                # 120000 symbolic link
+                if tail not in tree_head['blobs']:
+                    # no such file or directory
+                    raise fusepy.FuseOSError(errno.ENOENT)
+                blob = tree_head['blobs'][tail]
+                st_mode = self.gitmode2st_mode[blob['mode']]
+                st_size = self._get_size_of_blob(blob)
+                if st_mode == 41471:  # 120000 symbolic link
+                    # check if it is an accessable git-annex file
+                    blob_hash = blob['hash'].encode()
+                    link_path = bytes(self.cache.get(
+                        self.src_dir, blob_hash, st_size, st_size, 0)).decode()
+                    #      self._get_annex_path_bare_repo(link_path))
+                    #      self._get_annex_path_non_bare_repo(link_path))
+                    annex_object = self.annex_object_regpat.findall(link_path)
+                    if annex_object:
+                        apath = self._get_annex_path(link_path)
+                        if apath is not None:
+                            # git annex file stored locally
+                            stat = os.lstat(apath)
+                            st_mode = stat.st_mode  # default to be overwritten
+                            # we have to decide if
+                            # apath is normal file or executable
+                            if os.access(apath, os.X_OK):  # executable
+                                st_mode = self.gitmode2st_mode['100755']
+                            else:  # assume normal file
+                                st_mode = self.gitmode2st_mode['100644']
+                            st_size = stat.st_size
+                ret['st_mode'] = st_mode
+                ret['st_size'] = st_size
+            return ret
 
     def read(self, path, size, offset, file_fandler):
         """
@@ -260,90 +468,67 @@ class RepoClass(_EmptyAttrMixin):
         if not self.simple_file_handler.is_file_handler(self.src_dir,
                                                         file_fandler):
             raise fusepy.FuseOSError(errno.EBADF)
-        is_maybe_annex = False  # no git-annex file
-        ret = self.cache.get_cached(self.src_dir, path, size, offset, 0.5)
-        # check if it is an accessable git-annex file
+        self._refresh_tree()
+        # the path is resolved to the hash of the blob by the actual tree,
+        # therefore the cache (by hash) does not provide old content
         head, tail = os.path.split(path)
-        st_mode = None
         with self.lock.read_locked():
-            try:
-                st_mode = self.gitmode2st_mode[
-                    self.tree[head]['blobs'][tail]['mode']]
-            except (KeyError, TypeError):
-                pass
-        link_buf = None
-        if st_mode == 41471:  # 120000 symbolic link
-            # ret is only the complete link path, if size is None
-            # therefor we do our own check
-            # read file is link, but it is not completly read
-            link_buf = self.cache.get_cached(
-                self.src_dir, path, None, 0, 0.5)
-            if link_buf is not None:
-                is_maybe_annex = True  # maybe git-annex file
-                link_path = link_buf.decode()
+            tree_head = self._get_tree_dir(head)
+            if (tree_head is None) or (tail not in tree_head['blobs']):
+                # no such file or directory
+                raise fusepy.FuseOSError(errno.ENOENT)
+            blob = tree_head['blobs'][tail]
+            blob_hash = blob['hash'].encode()
+            st_size = self._get_size_of_blob(blob)
+            st_mode = self.gitmode2st_mode[blob['mode']]
+            # 120000 symbolic link, could be git-annex file
+            if st_mode == 41471:
+                link_buf = self.cache.get(
+                    self.src_dir, blob_hash, st_size, None, 0)
+                link_path = bytes(link_buf).decode()
                 annex_object = self.annex_object_regpat.findall(link_path)
                 if annex_object:
                     apath = self._get_annex_path(link_path)
                     if apath is not None:
                         # git-annex file, return content of linked file
-                        # normally a git annex file should be found here;
-                        # the annex if clause some lines below is normally
-                        # needless
                         with open(apath, 'rb') as fd:
                             fd.seek(offset, 0)
                             buf = fd.read(size)
                         return buf
+        ret = self.cache.get_cached(blob_hash, size, offset)
         if ret is not None:
             return ret
-        updated_cache = False
-        if not self._cache_up_to_date():
-            updated_cache = True
-            with self.lock.write_locked():
-                self._read_tree(update_cache=True)
-        else:
-            # remove old cached files
-            self.cache.clear_repo_old(self.src_dir)
-        head, tail = os.path.split(path)
-        self.lock.acquire_read()
-        if ((updated_cache) or
-                (self.tree is None) or (head not in self.tree)):
-            if not updated_cache:
-                with self.lock.write_locked():
-                    self._read_tree()
-            if (self.tree is None) or (head not in self.tree):
-                # no such file or directory
-                self.lock.release_read()
-                raise fusepy.FuseOSError(errno.ENOENT)
-        if tail not in self.tree[head]['blobs']:
-            # no such file or directory
-            self.lock.release_read()
-            raise fusepy.FuseOSError(errno.ENOENT)
-        blob_hash = self.tree[head]['blobs'][tail]['hash'].encode()
-        self._get_size_of_blob(head, tail)
-        st_size = self.tree[head]['blobs'][tail]['st_size']
-        if st_mode is None:
-            st_mode = self.gitmode2st_mode[
-                self.tree[head]['blobs'][tail]['mode']]
-        if (is_maybe_annex) or (st_mode == 41471):  # could be git-annex file
-            if link_buf is None:
-                link_buf = self.cache.get(
-                    self.src_dir, path, blob_hash, st_size, None, 0)
-            link_path = link_buf.decode()
-            annex_object = self.annex_object_regpat.findall(link_path)
-            if annex_object:
-                apath = self._get_annex_path(link_path)
-                if apath is not None:
-                    # git-annex file, return content of linked file
-                    with open(apath, 'rb') as fd:
-                        fd.seek(offset, 0)
-                        buf = fd.read(size)
-                    self.lock.release_read()
-                    return buf
-        # we read the complete file instead of the required part,
-        # this should be enhanced! (at least for unpacked objects)
-        self.lock.release_read()
+        if st_size >= self.stream_min_size:
+            # the blob is stored on disk (if configured) in the background
+            self.cache.fill_disk_cache(self.src_dir, blob_hash)
+            # read only the required part
+            buf = self._read_stream(file_fandler, blob_hash, size, offset)
+            if buf is not None:
+                return buf
+        # we read the complete file instead of the required part
         return self.cache.get(
-            self.src_dir, path, blob_hash, st_size, size, offset)
+            self.src_dir, blob_hash, st_size, size, offset)
+
+    def _read_stream(self, file_handler, blob_hash, size, offset):
+        """
+        :return: the read part of the blob or None, if the blob can not be
+                 streamed (e. g. a deltified object)
+        """
+        with self._blob_streams_lock:
+            stream_blob_hash, stream = self._blob_streams.get(
+                file_handler, (None, None))
+            if stream_blob_hash != blob_hash:
+                if stream is not None:
+                    stream.close()
+                stream = open_blob_stream(self.src_dir, blob_hash)
+                if (stream is not None) and (self.read_ahead > 0):
+                    stream = ReadAheadStream(
+                        stream, max_window=self.read_ahead)
+                # None is stored to not search again
+                self._blob_streams[file_handler] = (blob_hash, stream)
+        if stream is None:
+            return None
+        return stream.read(offset, size)
 
     def open(self, path, flags):
         """
@@ -360,9 +545,7 @@ class RepoClass(_EmptyAttrMixin):
         typical open functions.
         """
         # pylint: disable=unused-argument
-        if not self._cache_up_to_date():
-            with self.lock.write_locked():
-                self._read_tree(update_cache=True)
+        self._refresh_tree()
         return self.simple_file_handler.get(self.src_dir)
 
     def release(self, path, file_fandler):
@@ -376,6 +559,10 @@ class RepoClass(_EmptyAttrMixin):
         typical release functions.
         """
         # pylint: disable=unused-argument
+        with self._blob_streams_lock:
+            _, stream = self._blob_streams.pop(file_fandler, (None, None))
+        if stream is not None:
+            stream.close()
         self.simple_file_handler.remove(self.src_dir, file_fandler)
 
     def utimens(self, path, times=None):
@@ -0,0 +1,116 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+Selection of the backend to read the git repositories.
+
+The functions of this module call the functions with the same name of
+the selected backend module:
+
+  * dulwich: :mod:`py_fuse_git_bare_fs.repotools_dulwich`
+  * git: :mod:`py_fuse_git_bare_fs.repotools_git`
+  * native: :mod:`py_fuse_git_bare_fs.repotools_native`
+
+On default dulwich is used, if available. Otherwise git is used.
+
+Example:
+
+  from py_fuse_git_bare_fs.repotools import get_ref, set_backend
+  set_backend('native')
+  commit_hash = get_ref('.', b'master')
+"""
+
+import importlib
+
+BACKENDS = ['dulwich', 'git', 'native']
+
+try:
+    from . import repotools_dulwich as _backend
+except (ModuleNotFoundError, ImportError):
+    from . import repotools_git as _backend
+
+
+def set_backend(name=None):
+    """
+    :param name: name of the backend ('dulwich', 'git' or 'native')
+                 or None for the default
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable=global-statement,invalid-name
+    global _backend
+    if name is None:
+        try:
+            from . import repotools_dulwich as backend
+        except (ModuleNotFoundError, ImportError):
+            from . import repotools_git as backend
+    elif name in BACKENDS:
+        backend = importlib.import_module(
+            '.repotools_' + name, __package__)
+    else:
+        raise ValueError(f'unknown backend "{name}"')
+    _backend = backend
+
+
+def get_backend():
+    """
+    :return: name of the selected backend
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    return _backend.__name__.rsplit('_', 1)[1]
+
+
+def get_ref(src_dir, root_object):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_ref
+    """
+    return _backend.get_ref(src_dir, root_object)
+
+
+def get_blob_data(src_dir, blob_hash):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_blob_data
+    """
+    return _backend.get_blob_data(src_dir, blob_hash)
+
+
+def get_repo_data(src_dir, root_object, time_regpat):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_repo_data
+    """
+    return _backend.get_repo_data(src_dir, root_object, time_regpat)
+
+
+def get_size_of_blob(src_dir, blob_hash):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_size_of_blob
+    """
+    return _backend.get_size_of_blob(src_dir, blob_hash)
+
+
+def get_sizes_of_blobs(src_dir, blob_hashes):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_sizes_of_blobs
+    """
+    return _backend.get_sizes_of_blobs(src_dir, blob_hashes)
+
+
+def get_tree_level(src_dir, tree_hash):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_tree_level
+    """
+    return _backend.get_tree_level(src_dir, tree_hash)
+
+
+def get_tree(src_dir, tree_hash, tree_content_regpat=None,
+             tree_hashes=None):
+    """
+    see py_fuse_git_bare_fs.repotools_git.get_tree
+    """
+    return _backend.get_tree(src_dir, tree_hash, tree_content_regpat,
+                             tree_hashes=tree_hashes)
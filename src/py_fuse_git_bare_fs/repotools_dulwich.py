@@ -1,16 +1,185 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-10-12, 2023-03-31 (last change).
+:Date: 2021-10-12, 2023-03-31, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+All functions use opened repositories from the registry
+dulwich_repo_registry (an instance of :class:`DulwichRepoRegistry`).
+Therefore the packs, refs and the caches of dulwich are not read again
+for every call.
+
+Parsed tree objects and sizes of blobs are cached process-wide in
+:mod:`py_fuse_git_bare_fs.object_cache` and shared between repositories.
+
+dulwich inflates a complete object to get its size. Therefore the sizes
+of blobs are read from the headers of the objects by
+:mod:`py_fuse_git_bare_fs.native_object_store`; dulwich is only used for
+objects the native object store can not read.
 """
 
+import atexit
+import collections
+from contextlib import contextmanager
 import os
+import stat
+import threading
 import warnings
+import zlib
 
 import dulwich.errors
+import dulwich.objects
 import dulwich.repo
 
+from .native_object_store import native_object_store_registry
+from .object_cache import blob_size_cache, tree_cache
+from .repotools_git import canon_mode
+
+
+def _repo_signature(controldir):
+    """
+    :param controldir: path to the git control directory
+                       (e. g. the bare repository or .git)
+    :return: signature of the pack directory and the file packed-refs
+
+    If this signature changes (e. g. after "git gc" or "git repack"),
+    the repository has to be opened again.
+    """
+    stat = os.stat(os.path.join(controldir, 'objects', 'pack'))
+    signature = [stat.st_ino, stat.st_mtime_ns]
+    try:
+        stat = os.stat(os.path.join(controldir, 'packed-refs'))
+        signature += [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+    except FileNotFoundError:
+        pass
+    return tuple(signature)
+
+
+class _DulwichRepoHandle():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    an opened dulwich repository with a lock
+    """
+
+    def __init__(self, src_dir):
+        self.lock = threading.Lock()
+        self.closed = False
+        try:
+            self.repo = dulwich.repo.Repo(src_dir)
+        except dulwich.errors.NotGitRepository as errmsg:
+            raise FileNotFoundError(src_dir) from errmsg
+        self.controldir = self.repo.controldir()
+        self.signature = self.get_signature()
+
+    def get_signature(self):
+        """
+        :return: actual signature of the repository or None
+        """
+        try:
+            return _repo_signature(self.controldir)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def close(self):
+        """
+        closes the repository
+        """
+        with self.lock:
+            self.closed = True
+            self.repo.close()
+
+
+class DulwichRepoRegistry():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    Registry of opened dulwich repositories.
+
+    At most max_repos repositories are kept open; the least recently used
+    repository is closed. A repository is opened again, if its pack
+    directory or its file packed-refs changes (e. g. after "git gc").
+
+    dulwich repositories are not thread safe. Therefore a repository can
+    only be used by one thread at the same time.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_dulwich import dulwich_repo_registry
+      with dulwich_repo_registry.repo_locked('.') as repo:
+          print(repo.head())
+    """
+
+    def __init__(self, max_repos=64):
+        """
+        :param max_repos: maximal number of opened repositories
+        """
+        self.max_repos = max_repos
+        self.lock = threading.Lock()
+        self.handles = collections.OrderedDict()
+
+    def _get_handle(self, src_dir):
+        src_dir = os.path.abspath(src_dir)
+        with self.lock:
+            handle = self.handles.get(src_dir, None)
+        if handle is not None:
+            if handle.get_signature() == handle.signature:
+                with self.lock:
+                    if src_dir in self.handles:
+                        self.handles.move_to_end(src_dir)
+                return handle
+        new_handle = _DulwichRepoHandle(src_dir)
+        obsolete = []
+        with self.lock:
+            if src_dir in self.handles:
+                obsolete.append(self.handles.pop(src_dir))
+            self.handles[src_dir] = new_handle
+            while len(self.handles) > self.max_repos:
+                obsolete.append(self.handles.popitem(last=False)[1])
+        for obsolete_handle in obsolete:
+            obsolete_handle.close()
+        return new_handle
+
+    @contextmanager
+    def repo_locked(self, src_dir):
+        """
+        :param src_dir: path to the git repository as str
+
+        Provides the opened repository as dulwich.repo.Repo.
+        """
+        while True:
+            handle = self._get_handle(src_dir)
+            with handle.lock:
+                if not handle.closed:
+                    yield handle.repo
+                    break
+            # closed by another thread in the meantime
+
+    def remove(self, src_dir):
+        """
+        closes the repository src_dir
+        """
+        with self.lock:
+            handle = self.handles.pop(os.path.abspath(src_dir), None)
+        if handle is not None:
+            handle.close()
+
+    def close_all(self):
+        """
+        closes all repositories
+        """
+        with self.lock:
+            handles = list(self.handles.values())
+            self.handles.clear()
+        for handle in handles:
+            handle.close()
+
+
+dulwich_repo_registry = DulwichRepoRegistry()
+atexit.register(dulwich_repo_registry.close_all)
+
 
 def get_ref(src_dir, root_object):
     """
@@ -30,16 +199,14 @@ def get_ref(src_dir, root_object):
       commit_hash = get_ref('.', b'master')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-12, 2023-03-31
+    :Date: 2021-10-12, 2023-03-31, 2026-10-18
     """
     refs_root_object = b'refs/heads/' + root_object
-    try:
-        repo = dulwich.repo.Repo(src_dir)
-    except dulwich.errors.NotGitRepository as errmsg:
-        raise FileNotFoundError(src_dir) from errmsg
-    refs = repo.get_refs()
-    if refs_root_object in refs:
-        return repo.get_refs()[refs_root_object].decode()
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        try:
+            return repo.refs[refs_root_object].decode()
+        except KeyError:
+            pass
     return (root_object + b' missing').decode()
 
 
@@ -55,22 +222,19 @@ def get_blob_data(src_dir, blob_hash):
       get_blob_data('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-12, 2023-03-31
+    :Date: 2021-10-12, 2023-03-31, 2026-10-18
     """
-    try:
-        repo = dulwich.repo.Repo(src_dir)
-    except dulwich.errors.NotGitRepository as errmsg:
-        raise FileNotFoundError(src_dir) from errmsg
-    # repo.get_object(blob_hash).type_name == b'blob'
-    data = repo.get_object(blob_hash).data
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        # repo.get_object(blob_hash).type_name == b'blob'
+        data = repo.get_object(blob_hash).as_raw_string()
     return blob_hash + b' ' + b'blob' + b' ' + str(len(data)).encode() + \
-        b'\n' + repo.get_object(blob_hash).data + b'\n'
+        b'\n' + data + b'\n'
 
 
 def get_repo_data(src_dir, root_object, time_regpat=None):
     """
     :param src_dir: path to the git repository as str
-    :param root_object: name of the branch as bytes
+    :param root_object: name of the branch or hash of a commit as bytes
     :return: commit hash, tree hash, time of last commit
 
     Example:
@@ -80,29 +244,63 @@ def get_repo_data(src_dir, root_object, time_regpat=None):
       get_repo_data('.', b'master')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-11, 2023-03-31
+    :Date: 2021-10-11, 2023-03-31, 2026-10-18
     """
     # to be compatible to py_fuse_git_bare_fs.repotools_git.get_repo_data
     # we need the parameter/argument time_regpat:
     # pylint: disable=unused-argument
     refs_root_object = b'refs/heads/' + root_object
-    try:
-        repo = dulwich.repo.Repo(src_dir)
-    except dulwich.errors.NotGitRepository as errmsg:
-        raise FileNotFoundError(src_dir) from errmsg
-    refs = repo.get_refs()
-    if refs_root_object not in refs:
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        try:
+            commit_hash = repo.refs[refs_root_object]
+        except KeyError:
+            commit_hash = None
+            if dulwich.objects.valid_hexsha(root_object) and \
+                    root_object in repo:
+                # a hash (e. g. resolved by py_fuse_git_bare_fs.ref_resolver)
+                commit_hash = root_object
+        if commit_hash is not None:
+            gitobj = repo.get_object(commit_hash)
+            while isinstance(gitobj, dulwich.objects.Tag):  # annotated tag
+                commit_hash = gitobj.object[1]
+                gitobj = repo.get_object(commit_hash)
+    if commit_hash is None:
         # empty repo or root_object does not exists
         msg = f'root repository object "{root_object}" in "{src_dir}" ' + \
             'does not exists.'
         msg += 'Mountpoint will be empty.'
         warnings.warn(msg)
         return False
-    commit_hash = repo.get_refs()[refs_root_object].decode()
-    gitobj = repo.get_object(repo.get_refs()[refs_root_object])
     tree_hash = gitobj.tree.decode()
     commit_time = gitobj.commit_time
-    return (commit_hash, tree_hash, commit_time)
+    return (commit_hash.decode(), tree_hash, commit_time)
+
+
+def _read_sizes(repo, src_dir, blob_hashes):
+    """
+    :param repo: opened repository as dulwich.repo.Repo
+    :param src_dir: path to the git repository as str
+    :param blob_hashes: list of hashes of blobs as bytes
+    :return: list of the sizes of the blobs (not cached)
+
+    Only the headers of the objects are inflated.
+    """
+    try:
+        store = native_object_store_registry.get(src_dir)
+    except (OSError, ValueError):
+        store = None
+    sizes = []
+    for blob_hash in blob_hashes:
+        size = None
+        if store is not None:
+            try:
+                size = store.get_size(bytes.fromhex(blob_hash.decode()))
+            except (KeyError, OSError, ValueError, zlib.error):
+                pass  # e. g. an object format not known by the store
+        if size is None:
+            size = repo.get_object(blob_hash).raw_length()
+        sizes.append(size)
+    return sizes
 
 
 def get_size_of_blob(src_dir, blob_hash):
@@ -117,24 +315,121 @@ def get_size_of_blob(src_dir, blob_hash):
       get_size_of_blob('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-12, 2023-03-31
+    :Date: 2021-10-12, 2023-03-31, 2026-10-18
     """
-    try:
-        repo = dulwich.repo.Repo(src_dir)
-    except dulwich.errors.NotGitRepository as errmsg:
-        raise FileNotFoundError(src_dir) from errmsg
-    return repo.get_object(blob_hash).raw_length()
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        size = blob_size_cache.get(blob_hash)
+        if size is None:
+            size = _read_sizes(repo, src_dir, [blob_hash])[0]
+            blob_size_cache.put(blob_hash, size)
+    return size
+
+
+def get_sizes_of_blobs(src_dir, blob_hashes):
+    """
+    :param src_dir: path to the git repository as str
+    :param blob_hashes: list of hashes of blobs as bytes
+    :return: list of the sizes of the blobs
+
+    The sizes of not cached blobs are read with only one lock of the
+    repository.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_dulwich import get_sizes_of_blobs
+      get_sizes_of_blobs('.', [b'2e65efe2a145dda7ee51d1741299f848e5bf752e'])
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        sizes = blob_size_cache.get_many(blob_hashes)
+        missing = [i for i, size in enumerate(sizes) if size is None]
+        for i, size in zip(missing, _read_sizes(
+                repo, src_dir, [blob_hashes[i] for i in missing])):
+            sizes[i] = size
+    if missing:
+        blob_size_cache.put_many(
+            [(blob_hashes[i], sizes[i]) for i in missing])
+    return sizes
+
+
+def _get_tree_level(repo, tree_hash):
+    """
+    :param repo: opened repository as dulwich.repo.Repo
+    :param tree_hash: hash of the tree as bytes
+    """
+    level = {'listdir': [], 'blobs': {}, 'trees': {}}
+    # only the tree object is read; the type of an entry is given
+    # by its mode (reading the entries would decompress every blob)
+    for entry in repo.get_object(tree_hash).items():
+        obj_name = entry.path.decode()
+        level['listdir'].append(obj_name)
+        if stat.S_ISDIR(entry.mode):  # tree
+            level['trees'][obj_name] = entry.sha.decode()
+        elif dulwich.objects.S_ISGITLINK(entry.mode):  # submodule
+            level['trees'][obj_name] = None
+        else:  # blob
+            level['blobs'][obj_name] = {
+                'mode': canon_mode(f'{entry.mode:o}'),
+                'hash': entry.sha.decode()}
+    return level
+
+
+def _get_cached_tree_level(repo, tree_hash):
+    """
+    :param repo: opened repository as dulwich.repo.Repo
+    :param tree_hash: hash of the tree as str
+    """
+    level = tree_cache.get(tree_hash)
+    if level is None:
+        level = _get_tree_level(repo, tree_hash.encode())
+        tree_cache.put(tree_hash, level)
+    return level
 
 
-def get_tree(src_dir, tree_hash, tree_content_regpat=None):
+def get_tree_level(src_dir, tree_hash):
+    """
+    :param src_dir: path to the git repository as str
+    :param tree_hash: hash of the tree as str
+    :return: content of the tree object (only this directory) as a dict:
+             {'listdir': [name],
+              'blobs': {name: {'mode': str, 'hash': str}},
+              'trees': {name: hash}}
+
+    Submodules (gitlinks) are given in 'trees' with the hash None.
+
+    The result is shared by the cache tree_cache and must not be modified.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_dulwich import get_tree_level
+      get_tree_level('.', 'b213332fda65de4d2848a98e01f43d689cccbe6d')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        return _get_cached_tree_level(repo, tree_hash)
+
+
+def get_tree(src_dir, tree_hash, tree_content_regpat=None,
+             tree_hashes=None):
     """
     :param src_dir: path to the git repository as str
     :param tree_hash: has of the tree as str
     :param tree_content_regpat:
         compiled search pattern from re, e. g.
         re.compile(r'^([0-9]+) (commit|tree|blob|tag) ([0-9a-f]+)\t(.+)$')
+    :param tree_hashes: if a dict is given, the hashes of the directories
+                        are stored in it: {path: hash}
     :return: tree of the repo as a dict
 
+    Submodules (gitlinks) are provided as empty directories.
+
+    The lists and dicts in the result are shared by the cache tree_cache
+    and must not be modified.
+
     Example:
 
       from py_fuse_git_bare_fs.repotools_git import get_tree
@@ -143,41 +438,26 @@ def get_tree(src_dir, tree_hash, tree_content_regpat=None):
         'b213332fda65de4d2848a98e01f43d689cccbe6d')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-12, 2023-03-31
+    :Date: 2021-10-12, 2023-03-31, 2026-10-18
     """
     # to be compatible to py_fuse_git_bare_fs.repotools_git.get_repo_data
     # we need the parameter/argument tree_content_regpat:
     # pylint: disable=unused-argument
-    # pylint: disable=too-many-locals
-    try:
-        repo = dulwich.repo.Repo(src_dir)
-    except dulwich.errors.NotGitRepository as errmsg:
-        raise FileNotFoundError(src_dir) from errmsg
     tree = {}
     # tree[path] =
     #   {'listdir': [], 'blobs': {name: {'mode': str, 'hash': str}}}
-    dulwichmode2gitmode = {0o100644: '100644',
-                           0o100755: '100755',
-                           0o120000: '120000'}
-    trees = [('/', tree_hash.encode())]  # (name, hash)
-    tree['/'] = {}
-    while bool(trees):
-        act_path, act_tree_hash = trees.pop(0)
-        tree[act_path]['listdir'] = []
-        tree[act_path]['blobs'] = {}
-        treelist = repo.get_object(act_tree_hash).items()
-        for entry in treelist:
-            obj_type = repo.get_object(entry.sha).type_name
-            obj_hash = entry.sha
-            obj_name = entry.path.decode()
-            if obj_type == b'blob':
-                obj_mode = dulwichmode2gitmode[entry.mode]
-                tree[act_path]['listdir'].append(obj_name)
-                tree[act_path]['blobs'][obj_name] = {
-                    'mode': obj_mode, 'hash': obj_hash.decode()}
-            elif obj_type == b'tree':
-                tree[act_path]['listdir'].append(obj_name)
-                obj_path = os.path.join(act_path, obj_name)
-                trees.append((obj_path, obj_hash))
-                tree[obj_path] = {}
+    trees = collections.deque([('/', tree_hash)])  # (name, hash)
+    with dulwich_repo_registry.repo_locked(src_dir) as repo:
+        while bool(trees):
+            act_path, act_tree_hash = trees.popleft()
+            if tree_hashes is not None:
+                tree_hashes[act_path] = act_tree_hash
+            if act_tree_hash is None:  # submodule
+                tree[act_path] = {'listdir': [], 'blobs': {}}
+                continue
+            level = _get_cached_tree_level(repo, act_tree_hash)
+            tree[act_path] = {'listdir': level['listdir'],
+                              'blobs': level['blobs']}
+            for obj_name, obj_hash in level['trees'].items():
+                trees.append((os.path.join(act_path, obj_name), obj_hash))
     return tree
@@ -1,14 +1,49 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-10-12, 2023-03-31 (last change).
+:Date: 2021-10-12, 2023-03-31, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+All functions use long-lived "git cat-file" coprocesses from
+:mod:`py_fuse_git_bare_fs.git_cat_file_pool`. Therefore no new process is
+started for a request (besides the first one for a repository).
+Only the complete tree of a repository is read at once by "git ls-tree".
+
+Parsed tree objects and sizes of blobs are cached process-wide in
+:mod:`py_fuse_git_bare_fs.object_cache` and shared between repositories.
 """
 
+import collections
 import os
+import select
 import subprocess
 import warnings
 
+from .git_cat_file_pool import git_cat_file_pool
+from .object_cache import blob_size_cache, tree_cache
+
+
+def _git_cat_file_info(src_dir, git_objects):
+    """
+    :param src_dir: path to the git repository as str
+    :param git_objects: list of names of git objects as bytes
+    :return: list of headers as bytes, e. g.:
+             b'78981922613b2afb6025042ff6bd878ac1994e85 blob 2\\n'
+    """
+    process = git_cat_file_pool.get(src_dir, 'info')
+    if process.batch_option == '--batch-command':
+        git_objects = [b'info ' + git_object for git_object in git_objects]
+    return [header for header, _ in process.request(git_objects)]
+
+
+def _git_cat_file_contents(src_dir, git_object):
+    """
+    :param src_dir: path to the git repository as str
+    :param git_object: name of a git object as bytes
+    :return: (header, content) with content None for a missing object
+    """
+    return git_cat_file_pool.get(src_dir, 'contents').request([git_object])[0]
+
 
 def get_ref(src_dir, root_object):
     """
@@ -25,14 +60,12 @@ def get_ref(src_dir, root_object):
       commit_hash = get_ref('.', b'master')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-08
+    :Date: 2021-10-08, 2026-10-18
     """
-    cpi = subprocess.run(
-        ["git cat-file --batch-check='%(objectname)'"],
-        input=root_object,
-        stdout=subprocess.PIPE,
-        cwd=src_dir, shell=True, timeout=3, check=True)
-    return cpi.stdout.decode().strip()
+    header = _git_cat_file_info(src_dir, [root_object])[0]
+    if header.endswith(b' missing\n') or header.endswith(b' ambiguous\n'):
+        return header.decode().strip()
+    return header.split()[0].decode()
 
 
 def get_blob_data(src_dir, blob_hash):
@@ -45,14 +78,12 @@ def get_blob_data(src_dir, blob_hash):
       get_blob_data('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-11
+    :Date: 2021-10-11, 2026-10-18
     """
-    cpi = subprocess.run(
-        ["git cat-file --batch"],
-        input=blob_hash,
-        stdout=subprocess.PIPE,
-        cwd=src_dir, shell=True, timeout=3, check=True)
-    return cpi.stdout
+    header, content = _git_cat_file_contents(src_dir, blob_hash)
+    if content is None:
+        return header
+    return header + content + b'\n'
 
 
 def get_repo_data(src_dir, root_object, time_regpat):
@@ -71,20 +102,17 @@ def get_repo_data(src_dir, root_object, time_regpat):
       get_repo_data('.', b'master', re.compile(r' ([0-9]+) [+0-9+-]+$'))
 
     :Author: Daniel Mohr
-    :Date: 2021-10-11, 2023-03-31
+    :Date: 2021-10-11, 2023-03-31, 2026-10-18
     """
-    cpi = subprocess.run(
-        ["git cat-file --batch"], input=root_object,
-        stdout=subprocess.PIPE,
-        cwd=src_dir, shell=True, timeout=3, check=True)
-    if cpi.stdout.startswith(root_object):
+    header, content = _git_cat_file_contents(src_dir, root_object)
+    if content is None:
         # empty repo or root_object does not exists
         msg = f'root repository object "{root_object}" in "{src_dir}" ' + \
             'does not exists.'
         msg += 'Mountpoint will be empty.'
         warnings.warn(msg)
         return False
-    splittedstdout = cpi.stdout.decode().split('\n')
+    splittedstdout = (header + content).decode().split('\n')
     commit_hash = splittedstdout[0].split()[0]
     for data in splittedstdout:
         if data.startswith('tree'):
@@ -111,33 +139,252 @@ def get_size_of_blob(src_dir, blob_hash):
       get_size_of_blob('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
 
     :Author: Daniel Mohr
-    :Date: 2021-10-12
+    :Date: 2021-10-12, 2026-10-18
     """
-    cpi = subprocess.run(
-        ["git cat-file --batch-check='%(objectsize)'"],
-        input=blob_hash,
-        stdout=subprocess.PIPE,
-        cwd=src_dir, shell=True, timeout=3, check=True)
-    return int(cpi.stdout.decode())
+    # the coprocess is requested first to detect a missing repository
+    git_cat_file_pool.get(src_dir, 'info')
+    size = blob_size_cache.get(blob_hash)
+    if size is None:
+        size = int(_git_cat_file_info(src_dir, [blob_hash])[0].split()[-1])
+        blob_size_cache.put(blob_hash, size)
+    return size
 
 
-def _git_cat_file(src_dir, git_object):
-    cpi = subprocess.run(
-        ['git cat-file -p ' + git_object],
-        stdout=subprocess.PIPE,
-        cwd=src_dir, shell=True, timeout=3, check=True)
-    return cpi.stdout.decode()
+def get_sizes_of_blobs(src_dir, blob_hashes):
+    """
+    :param src_dir: path to the git repository as str
+    :param blob_hashes: list of hashes of blobs as bytes
+    :return: list of the sizes of the blobs
 
+    The sizes of not cached blobs are requested at once (pipelined).
+
+    Example:
 
-def get_tree(src_dir, tree_hash, tree_content_regpat):
+      from py_fuse_git_bare_fs.repotools_git import get_sizes_of_blobs
+      get_sizes_of_blobs('.', [b'2e65efe2a145dda7ee51d1741299f848e5bf752e'])
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # the coprocess is requested first to detect a missing repository
+    git_cat_file_pool.get(src_dir, 'info')
+    sizes = blob_size_cache.get_many(blob_hashes)
+    missing = [i for i, size in enumerate(sizes) if size is None]
+    if missing:
+        headers = _git_cat_file_info(
+            src_dir, [blob_hashes[i] for i in missing])
+        for i, header in zip(missing, headers):
+            sizes[i] = int(header.split()[-1])
+        blob_size_cache.put_many(
+            [(blob_hashes[i], sizes[i]) for i in missing])
+    return sizes
+
+
+def canon_mode(obj_mode):
+    """
+    :param obj_mode: mode of an entry of a tree object as str (octal)
+    :return: the canonical mode as str like given by "git cat-file -p"
+
+    Old versions of git stored other modes (e. g. 100664). Like git, any
+    mode not of a tree, a symbolic link or a submodule is a normal file,
+    which is executable if the owner may execute it.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_git import canon_mode
+      canon_mode('100664')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    mode = int(obj_mode, 8)
+    file_type = mode & 0o170000
+    if file_type == 0o040000:
+        return '40000'
+    if file_type in (0o120000, 0o160000):
+        return f'{file_type:o}'
+    if mode & 0o100:
+        return '100755'
+    return '100644'
+
+
+def _git_cat_file_tree(src_dir, tree_hash):
+    """
+    :param src_dir: path to the git repository as str
+    :param tree_hash: hash of the tree as str
+    :return: list of the entries (mode, type, hash, name) of the tree
+             (all as str) like the output of "git cat-file -p"
+    """
+    _, data = _git_cat_file_contents(src_dir, tree_hash.encode())
+    entries = []
+    if data is None:
+        return entries
+    # a tree object is a sequence of: [mode] [name]\0[20 bytes hash]
+    pos = 0
+    while pos < len(data):
+        spacepos = data.index(b' ', pos)
+        nulpos = data.index(b'\0', spacepos)
+        obj_mode = canon_mode(data[pos:spacepos].decode())
+        if obj_mode == '40000':
+            obj_type = 'tree'
+        elif obj_mode == '160000':
+            obj_type = 'commit'
+        else:
+            obj_type = 'blob'
+        entries.append((obj_mode, obj_type,
+                        data[nulpos + 1:nulpos + 21].hex(),
+                        data[spacepos + 1:nulpos].decode()))
+        pos = nulpos + 21
+    return entries
+
+
+def get_tree_level(src_dir, tree_hash):
+    """
+    :param src_dir: path to the git repository as str
+    :param tree_hash: hash of the tree as str
+    :return: content of the tree object (only this directory) as a dict:
+             {'listdir': [name],
+              'blobs': {name: {'mode': str, 'hash': str}},
+              'trees': {name: hash}}
+
+    Submodules (gitlinks) are given in 'trees' with the hash None.
+
+    The result is shared by the cache tree_cache and must not be modified.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_git import get_tree_level
+      get_tree_level('.', 'b213332fda65de4d2848a98e01f43d689cccbe6d')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # the coprocess is requested first to detect a missing repository
+    git_cat_file_pool.get(src_dir, 'contents')
+    level = tree_cache.get(tree_hash)
+    if level is not None:
+        return level
+    level = {'listdir': [], 'blobs': {}, 'trees': {}}
+    for (obj_mode, obj_type, obj_hash, obj_name) in \
+            _git_cat_file_tree(src_dir, tree_hash):
+        level['listdir'].append(obj_name)
+        if obj_type == 'blob':
+            level['blobs'][obj_name] = {'mode': obj_mode, 'hash': obj_hash}
+        elif obj_type == 'tree':
+            level['trees'][obj_name] = obj_hash
+        else:  # submodule (gitlink)
+            level['trees'][obj_name] = None
+    tree_cache.put(tree_hash, level)
+    return level
+
+
+def _read_nul_records(cmd, src_dir, timeout):
+    """
+    :param cmd: command as list of str; its output is separated by NUL
+    :param src_dir: working directory of the command as str
+    :param timeout: maximal time in seconds to wait for new output
+    :return: generator of the records of the output as bytes (without NUL)
+
+    The output is read and split while the command is running. If the
+    command does not write for timeout seconds (e. g. a stalled network
+    file system), it is killed and subprocess.TimeoutExpired is raised.
+    A failing command raises subprocess.CalledProcessError.
+    """
+    # the process is killed in the finally clause
+    # pylint: disable=consider-using-with
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        cwd=src_dir, bufsize=0)
+    try:
+        rest = b''
+        while True:
+            if not select.select([process.stdout], [], [], timeout)[0]:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            data = os.read(process.stdout.fileno(), 1048576)
+            if not data:
+                break
+            records = (rest + data).split(b'\0')
+            rest = records.pop()
+            yield from records
+        if rest:
+            yield rest
+        process.wait(timeout=timeout)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+
+
+def _git_ls_tree(src_dir, tree_hash, timeout=3):
+    """
+    :param src_dir: path to the git repository as str
+    :param tree_hash: hash of the tree as str
+    :param timeout: maximal time in seconds to wait for new output of git
+    :return: (levels, tree_hashes) with levels as {path: level} (level as
+             given by get_tree_level) and tree_hashes as {path: hash};
+             submodules are only given in tree_hashes (with hash None)
+
+    Reads the complete tree by one call of "git ls-tree -r -t -l -z".
+    The output is parsed while it is read, therefore a large tree is not
+    buffered at once.
+    The parsed tree objects and the sizes of the blobs are stored in the
+    caches tree_cache and blob_size_cache.
+    """
+    levels = {'/': {'listdir': [], 'blobs': {}, 'trees': {}}}
+    tree_hashes = {'/': tree_hash}
+    blob_sizes = []
+    # every record is: [mode] SP [type] SP [hash] SP [size]\t[path]\0
+    # trees are given before their content
+    for record in _read_nul_records(
+            ['git', 'ls-tree', '-r', '-t', '-l', '-z', tree_hash],
+            src_dir, timeout):
+        info, path = record.split(b'\t', 1)
+        obj_mode, obj_type, obj_hash, obj_size = info.split()
+        path = '/' + path.decode()
+        head, _, tail = path.rpartition('/')
+        level = levels[head or '/']
+        level['listdir'].append(tail)
+        if obj_type == b'blob':
+            level['blobs'][tail] = {'mode': obj_mode.decode(),
+                                    'hash': obj_hash.decode()}
+            blob_sizes.append((obj_hash, int(obj_size)))
+        elif obj_type == b'tree':
+            obj_hash = obj_hash.decode()
+            level['trees'][tail] = obj_hash
+            tree_hashes[path] = obj_hash
+            levels[path] = {'listdir': [], 'blobs': {}, 'trees': {}}
+        else:  # submodule (gitlink)
+            level['trees'][tail] = None
+            tree_hashes[path] = None
+    for path, level in levels.items():
+        tree_cache.put(tree_hashes[path], level)
+    blob_size_cache.put_many(blob_sizes)
+    return (levels, tree_hashes)
+
+
+def get_tree(src_dir, tree_hash, tree_content_regpat=None,
+             tree_hashes=None):
     """
     :param src_dir: path to the git repository as str
     :param tree_hash: has of the tree as str
     :param tree_content_regpat:
         compiled search pattern from re, e. g.
         re.compile(r'^([0-9]+) (commit|tree|blob|tag) ([0-9a-f]+)\t(.+)$')
+    :param tree_hashes: if a dict is given, the hashes of the directories
+                        are stored in it: {path: hash}
     :return: tree of the repo as a dict
 
+    Submodules (gitlinks) are provided as empty directories.
+
+    If the tree is not cached, the complete tree and the sizes of all blobs
+    are read by one call of "git ls-tree".
+
+    The lists and dicts in the result are shared by the cache tree_cache
+    and must not be modified.
+
     Example:
 
       import re
@@ -148,31 +395,41 @@ def get_tree(src_dir, tree_hash, tree_content_regpat):
         re.compile(r'^([0-9]+) (commit|tree|blob|tag) ([0-9a-f]+)\t(.+)$'))
 
     :Author: Daniel Mohr
-    :Date: 2021-10-12, 2023-03-31
+    :Date: 2021-10-12, 2023-03-31, 2026-10-18
     """
+    # the tree objects are read directly and not pretty printed,
+    # therefore we do not need the parameter/argument tree_content_regpat:
+    # pylint: disable=unused-argument
     tree = {}
     # tree[path] =
     #   {'listdir': [], 'blobs': {name: {'mode': str, 'hash': str}}}
-    trees = [('/', tree_hash)]  # (name, hash)
-    tree['/'] = {}
+    # the coprocess is requested first to detect a missing repository
+    # and its stall timeout is used for "git ls-tree"
+    process = git_cat_file_pool.get(src_dir, 'contents')
+    if tree_cache.get(tree_hash) is None:
+        levels, act_tree_hashes = _git_ls_tree(
+            src_dir, tree_hash, timeout=process.timeout)
+        if tree_hashes is not None:
+            tree_hashes.update(act_tree_hashes)
+        for act_path, level in levels.items():
+            tree[act_path] = {'listdir': level['listdir'],
+                              'blobs': level['blobs']}
+        for act_path, act_tree_hash in act_tree_hashes.items():
+            if act_tree_hash is None:  # submodule
+                tree[act_path] = {'listdir': [], 'blobs': {}}
+        return tree
+    # the tree is cached (e. g. a previous commit or a fork)
+    trees = collections.deque([('/', tree_hash)])  # (name, hash)
     while bool(trees):
-        act_path, act_tree_hash = trees.pop(0)
-        tree[act_path]['listdir'] = []
-        tree[act_path]['blobs'] = {}
-        git_objects = _git_cat_file(src_dir, act_tree_hash).split('\n')
-        for line in git_objects:
-            if len(line) < 8:
-                continue
-            res = tree_content_regpat.findall(line)
-            if res:
-                (obj_mode, obj_type, obj_hash, obj_name) = res[0]
-                if obj_type == 'blob':
-                    tree[act_path]['listdir'].append(obj_name)
-                    tree[act_path]['blobs'][obj_name] = {
-                        'mode': obj_mode, 'hash': obj_hash}
-                elif obj_type == 'tree':
-                    tree[act_path]['listdir'].append(obj_name)
-                    obj_path = os.path.join(act_path, obj_name)
-                    trees.append((obj_path, obj_hash))
-                    tree[obj_path] = {}
+        act_path, act_tree_hash = trees.popleft()
+        if tree_hashes is not None:
+            tree_hashes[act_path] = act_tree_hash
+        if act_tree_hash is None:  # submodule
+            tree[act_path] = {'listdir': [], 'blobs': {}}
+            continue
+        level = get_tree_level(src_dir, act_tree_hash)
+        tree[act_path] = {'listdir': level['listdir'],
+                          'blobs': level['blobs']}
+        for obj_name, obj_hash in level['trees'].items():
+            trees.append((os.path.join(act_path, obj_name), obj_hash))
     return tree
@@ -0,0 +1,274 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18 (last change).
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+All functions read the git objects by pure python using object stores from
+the registry native_object_store_registry (see
+:mod:`py_fuse_git_bare_fs.native_object_store`). Neither a git process nor
+the python module dulwich is used.
+
+Parsed tree objects and sizes of blobs are cached process-wide in
+:mod:`py_fuse_git_bare_fs.object_cache` and shared between repositories.
+"""
+
+import collections
+import os
+import warnings
+
+from .native_object_store import native_object_store_registry
+from .object_cache import blob_size_cache, tree_cache
+from .ref_resolver import ref_resolver
+from .repotools_git import canon_mode
+
+
+def get_ref(src_dir, root_object):
+    """
+    This use pure python to read/handle a git repository.
+
+    :param src_dir: path to the git repository as str
+    :param root_object: name of the branch as bytes
+    :return: hash of the branch root_object of the repository src_dir as str
+             or error message as bytes
+
+    The reference is resolved by ref_resolver (see
+    :mod:`py_fuse_git_bare_fs.ref_resolver`); annotated tags are peeled.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_ref
+      commit_hash = get_ref('.', b'master')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    return ref_resolver.resolve(src_dir, root_object)
+
+
+def get_blob_data(src_dir, blob_hash):
+    """
+    :param src_dir: path to the git repository as str
+    :param blob_hash: hash of the blob as bytes
+    :return: the data of a blob in a git repository
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_blob_data
+      get_blob_data('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    store = native_object_store_registry.get(src_dir)
+    try:
+        type_name, data = store.get_object(bytes.fromhex(blob_hash.decode()))
+    except (KeyError, ValueError):
+        return blob_hash + b' missing\n'
+    return blob_hash + b' ' + type_name + b' ' + str(len(data)).encode() + \
+        b'\n' + data + b'\n'
+
+
+def get_repo_data(src_dir, root_object, time_regpat=None):
+    """
+    :param src_dir: path to the git repository as str
+    :param root_object: name of the branch as bytes
+    :return: commit hash, tree hash, time of last commit
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_repo_data
+      get_repo_data('.', b'master')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # to be compatible to py_fuse_git_bare_fs.repotools_git.get_repo_data
+    # we need the parameter/argument time_regpat:
+    # pylint: disable=unused-argument
+    store = native_object_store_registry.get(src_dir)
+    commit_hash = get_ref(src_dir, root_object)
+    type_name = None
+    if not commit_hash.endswith(' missing'):
+        try:
+            type_name, data = store.get_object(bytes.fromhex(commit_hash))
+            while type_name == b'tag':  # annotated tag
+                commit_hash = data[7:47].decode()  # b'object [hash]\n'
+                type_name, data = store.get_object(
+                    bytes.fromhex(commit_hash))
+        except KeyError:
+            type_name = None
+    if type_name != b'commit':
+        # empty repo or root_object does not exists
+        msg = f'root repository object "{root_object}" in "{src_dir}" ' + \
+            'does not exists.'
+        msg += 'Mountpoint will be empty.'
+        warnings.warn(msg)
+        return False
+    tree_hash = None
+    commit_time = None
+    for line in data.split(b'\n'):
+        if not line:  # end of the header
+            break
+        if line.startswith(b'tree '):
+            tree_hash = line[5:].decode()
+        elif line.startswith(b'committer '):
+            # committer [name] <[email]> [time] [timezone]
+            commit_time = int(line.rsplit(b' ', 2)[1])
+    return (commit_hash, tree_hash, commit_time)
+
+
+def get_size_of_blob(src_dir, blob_hash):
+    """
+    :param src_dir: path to the git repository as str
+    :param blob_hash: has of the blob as bytes
+    :return: integer of the amount of bytes of the blob
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_size_of_blob
+      get_size_of_blob('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # the object store is requested first to detect a missing repository
+    store = native_object_store_registry.get(src_dir)
+    size = blob_size_cache.get(blob_hash)
+    if size is None:
+        size = store.get_size(bytes.fromhex(blob_hash.decode()))
+        blob_size_cache.put(blob_hash, size)
+    return size
+
+
+def get_sizes_of_blobs(src_dir, blob_hashes):
+    """
+    :param src_dir: path to the git repository as str
+    :param blob_hashes: list of hashes of blobs as bytes
+    :return: list of the sizes of the blobs
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_sizes_of_blobs
+      get_sizes_of_blobs('.', [b'2e65efe2a145dda7ee51d1741299f848e5bf752e'])
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    store = native_object_store_registry.get(src_dir)
+    sizes = blob_size_cache.get_many(blob_hashes)
+    missing = [i for i, size in enumerate(sizes) if size is None]
+    if missing:
+        for i in missing:
+            sizes[i] = store.get_size(bytes.fromhex(blob_hashes[i].decode()))
+        blob_size_cache.put_many(
+            [(blob_hashes[i], sizes[i]) for i in missing])
+    return sizes
+
+
+def _get_tree_level(store, tree_hash):
+    """
+    :param store: object store as instance of NativeObjectStore
+    :param tree_hash: hash of the tree as str
+    """
+    level = {'listdir': [], 'blobs': {}, 'trees': {}}
+    _, data = store.get_object(bytes.fromhex(tree_hash))
+    # a tree object is a sequence of: [mode] [name]\0[20 bytes hash]
+    pos = 0
+    while pos < len(data):
+        spacepos = data.index(b' ', pos)
+        nulpos = data.index(b'\0', spacepos)
+        obj_mode = canon_mode(data[pos:spacepos].decode())
+        obj_name = data[spacepos + 1:nulpos].decode()
+        level['listdir'].append(obj_name)
+        if obj_mode == '40000':  # tree
+            level['trees'][obj_name] = data[nulpos + 1:nulpos + 21].hex()
+        elif obj_mode == '160000':  # submodule (gitlink)
+            level['trees'][obj_name] = None
+        else:  # blob
+            level['blobs'][obj_name] = {
+                'mode': obj_mode, 'hash': data[nulpos + 1:nulpos + 21].hex()}
+        pos = nulpos + 21
+    return level
+
+
+def _get_cached_tree_level(store, tree_hash):
+    """
+    :param store: object store as instance of NativeObjectStore
+    :param tree_hash: hash of the tree as str
+    """
+    level = tree_cache.get(tree_hash)
+    if level is None:
+        level = _get_tree_level(store, tree_hash)
+        tree_cache.put(tree_hash, level)
+    return level
+
+
+def get_tree_level(src_dir, tree_hash):
+    """
+    :param src_dir: path to the git repository as str
+    :param tree_hash: hash of the tree as str
+    :return: content of the tree object (only this directory) as a dict:
+             {'listdir': [name],
+              'blobs': {name: {'mode': str, 'hash': str}},
+              'trees': {name: hash}}
+
+    Submodules (gitlinks) are given in 'trees' with the hash None.
+
+    The result is shared by the cache tree_cache and must not be modified.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_tree_level
+      get_tree_level('.', 'b213332fda65de4d2848a98e01f43d689cccbe6d')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    return _get_cached_tree_level(
+        native_object_store_registry.get(src_dir), tree_hash)
+
+
+def get_tree(src_dir, tree_hash, tree_content_regpat=None,
+             tree_hashes=None):
+    """
+    :param src_dir: path to the git repository as str
+    :param tree_hash: has of the tree as str
+    :param tree_content_regpat: not used (compatibility to
+                                py_fuse_git_bare_fs.repotools_git.get_tree)
+    :param tree_hashes: if a dict is given, the hashes of the directories
+                        are stored in it: {path: hash}
+    :return: tree of the repo as a dict
+
+    Submodules (gitlinks) are provided as empty directories.
+
+    The lists and dicts in the result are shared by the cache tree_cache
+    and must not be modified.
+
+    Example:
+
+      from py_fuse_git_bare_fs.repotools_native import get_tree
+      get_tree(
+        '.',
+        'b213332fda65de4d2848a98e01f43d689cccbe6d')
+
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable=unused-argument
+    store = native_object_store_registry.get(src_dir)
+    tree = {}
+    trees = collections.deque([('/', tree_hash)])  # (name, hash)
+    while bool(trees):
+        act_path, act_tree_hash = trees.popleft()
+        if tree_hashes is not None:
+            tree_hashes[act_path] = act_tree_hash
+        if act_tree_hash is None:  # submodule
+            tree[act_path] = {'listdir': [], 'blobs': {}}
+            continue
+        level = _get_cached_tree_level(store, act_tree_hash)
+        tree[act_path] = {'listdir': level['listdir'],
+                          'blobs': level['blobs']}
+        for obj_name, obj_hash in level['trees'].items():
+            trees.append((os.path.join(act_path, obj_name), obj_hash))
+    return tree
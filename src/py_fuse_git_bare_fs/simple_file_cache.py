@@ -1,131 +1,530 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-10-11, 2023-03-31 (last change).
+:Date: 2021-10-11, 2023-03-31, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 """
 
+import collections
+import threading
 import time
+import weakref
+import zlib
 
-from .read_write_lock import ReadWriteLock
+from .cache_policy import CACHE_POLICIES
+from .frequency_sketch import FrequencySketch
+from .object_cache import ObjectCache
+from .repotools import get_blob_data
 
-try:
-    from .repotools_dulwich import get_blob_data
-except (ModuleNotFoundError, ImportError):
-    from .repotools_git import get_blob_data
+
+def _janitor(cache_ref, interval):
+    """
+    removes the expired entries of the cache every interval seconds,
+    as long as the cache exists
+
+    :param cache_ref: weak reference to an instance of SimpleFileCache
+    :param interval: time in seconds between two runs
+    """
+    while True:
+        time.sleep(interval)
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.clear_old()
+        del cache  # do not keep the cache alive while sleeping
+
+
+class _CacheShard():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    a part of the large blobs of SimpleFileCache with its own lock,
+    eviction policy, budget and access frequencies (for the admission)
+    """
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+
+    def __init__(self, max_cache_size, policy, sketch_entries=None):
+        """
+        :param max_cache_size: maximal size of the blobs in this shard
+        :param policy: name of the eviction policy, e. g. 'lru' or 'arc'
+        :param sketch_entries: expected number of blobs of this shard for
+                               the frequency sketch or None (no admission)
+        """
+        self.lock = threading.Lock()
+        self.max_cache_size = max_cache_size
+        self.actual_cache_size = 0
+        self.policy = CACHE_POLICIES[policy](max_cache_size)
+        self.hits = 0
+        self.misses = 0
+        # access frequencies of the blobs of this shard (small and large)
+        self.sketch = None
+        if sketch_entries is not None:
+            self.sketch = FrequencySketch(sketch_entries)
+        # number of blobs not stored by the admission
+        self.rejected = 0
+        # blob_hash -> [time of last use, content, len(content)]
+        self.cache = {}
+        # blob_hash -> None, the least recently used first (only with maxage)
+        self.last_used = collections.OrderedDict()
 
 
 class SimpleFileCache():
     """
     :Author: Daniel Mohr
-    :Date: 2021-10-11, 2023-03-31
+    :Date: 2021-10-11, 2023-03-31, 2026-10-18
+
+    The content of blobs is cached by the hash of the blob. The path of a
+    file is resolved to the hash by the tree of the repository; therefore
+    the same blob in different paths, commits or repositories (e. g.
+    forks using the same cache) is stored only once and a changed file
+    (new hash) never gets old content.
+
+    Blobs smaller than min_file_size (e. g. html, css, config files or
+    the targets of symbolic links) are stored in a separate tier (small)
+    with at most small_cache_entries entries and small_cache_size bytes;
+    an entry is only the content as bytes. Therefore reading large blobs
+    does not remove the many small files used often. The least recently
+    used small file is removed first.
+
+    The large blobs are stored up to max_cache_size bytes. To store a new
+    blob, the entries selected by the eviction policy are removed (see
+    :mod:`py_fuse_git_bare_fs.cache_policy`). With maxage, additionally
+    entries not used for this time are removed by a background thread
+    (janitor); the entries are kept in the order of their last use, so
+    only the expired entries are visited.
+
+    The large blobs are distributed to shards by their hash; every shard
+    has its own lock, eviction policy and an equal part of
+    max_cache_size. Therefore threads reading different blobs do not
+    wait for each other. On default, there is one shard for every 64 MB
+    (at most 16). A blob larger than the part of its shard (up to
+    max_cache_size) is stored, too; then the other shards remove blobs
+    (the shard holding the most bytes first), until all shards together
+    hold at most max_cache_size.
+
+    A read only looks up the entry under a short lock; the data is sliced
+    and read from the repository without holding a lock.
+
+    Only the content of a blob (without the header of "git cat-file") is
+    stored in a bytearray. A read returns a memoryview of the cached
+    content, so no data is copied (see
+    :mod:`py_fuse_git_bare_fs.read_buffer`).
+
+    With compression, only a quarter of max_cache_size is used for the
+    blobs described above (hot tier). A blob removed from it is stored
+    compressed by zlib (cold tier, up to the rest of max_cache_size,
+    least recently used removed first) and decompressed to the hot tier
+    on the next read. The compressed blob is kept, so it is not
+    compressed again when it is removed from the hot tier once more.
+    Blobs not compressible (by at least 10 %) are not stored in the cold
+    tier.
+
+    With disk_cache (an instance of
+    :class:`py_fuse_git_bare_fs.disk_blob_cache.DiskBlobCache`) the
+    blobs are also stored on disk; a blob not in memory is read from there
+    before it is read from the repository.
+
+    With admission, the accesses of all blobs are counted approximately
+    (see :mod:`py_fuse_git_bare_fs.frequency_sketch`). A new blob is only
+    stored in a full tier (small or large blobs), if it was read more
+    often recently than the blob it would displace. Therefore a scan
+    (e. g. a backup or a recursive download of a tree) does not remove
+    the blobs read repeatedly. The number of blobs not stored is given by
+    rejected_admissions.
+
+    Example:
+
+      from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+      cache = SimpleFileCache(max_cache_size=1048576, policy='arc')
+      cache.get('.', b'2e65efe2a145dda7ee51d1741299f848e5bf752e',
+                10, None, 0)
+      cache.hit_ratio()
     """
+    # pylint: disable=too-many-instance-attributes
 
     def __init__(self,
-                 min_file_size=131072, max_cache_size=1073741824, maxage=1):
+                 min_file_size=131072, max_cache_size=1073741824,
+                 maxage=None, policy='lru', disk_cache=None,
+                 small_cache_entries=65536, small_cache_size=67108864,
+                 compression=False, shards=None, admission=False):
         """
         :param min_file_size: minimum file size to store file in cache
-        :param cache_size: maximal cache size
-        :param maxage: files after this time are removed from the cache
+        :param max_cache_size: maximal cache size in bytes
+        :param maxage: files not used for this time are removed from the
+                       cache; None: only the eviction policy removes files
+        :param policy: name of the eviction policy, e. g. 'lru' or 'arc'
+        :param disk_cache: second tier as instance of DiskBlobCache or None
+        :param small_cache_entries: maximal number of cached small blobs
+        :param small_cache_size: maximal size of the cached small blobs
+        :param compression: if True, blobs not used recently are stored
+                            compressed
+        :param shards: number of shards of the large blobs or None to use
+                       one shard for every 64 MB (at most 16)
+        :param admission: if True, a new blob only displaces blobs read
+                          less often
         """
-        self.lock = ReadWriteLock()
+        # pylint: disable=too-many-arguments
         self.min_file_size = min_file_size
+        # blob_hash -> blob compressed by zlib (cold tier)
+        self.compressed = None
+        if compression:
+            self.compressed = ObjectCache(
+                max_entries=1048576,
+                max_bytes=max_cache_size - max_cache_size // 4)
+            max_cache_size //= 4
         self.max_cache_size = max_cache_size
         self.maxage = maxage
-        self.actual_cache_size = 0
-        with self.lock.write_locked():
-            self.cache = {}
+        if shards is None:
+            shards = max(1, min(16, max_cache_size // 67108864))
+        sketch_entries = None
+        if admission:
+            # large and small blobs of a shard
+            sketch_entries = (
+                max_cache_size // max(1, min_file_size) +
+                small_cache_entries) // shards
+        self.shards = [
+            _CacheShard(max_cache_size // shards, policy, sketch_entries)
+            for _ in range(shards)]
+        self.disk_cache = disk_cache
+        # blob_hash -> content (bytes) of blobs smaller than min_file_size
+        self.small = ObjectCache(max_entries=small_cache_entries,
+                                 max_bytes=small_cache_size)
+        self.janitor = None
+        if maxage is not None:
+            self.janitor = threading.Thread(
+                target=_janitor,
+                args=(weakref.ref(self), max(0.1, maxage / 2)),
+                name='simple_file_cache_janitor', daemon=True)
+            self.janitor.start()
 
-    def get_cached(self, repopath, path, size, offset, maxage=0.5):
+    def _shard(self, blob_hash):
         """
-        :param repopath: path to the actual repository
-        :param path: path in the actual repository to the blob
+        :return: the shard of the blob
+        """
+        return self.shards[hash(blob_hash) % len(self.shards)]
+
+    @property
+    def cache(self):
+        """
+        :return: copy of the entries of all shards (for inspection):
+                 blob_hash -> [time of last use, content, len(content)]
+        """
+        entries = {}
+        for shard in self.shards:
+            with shard.lock:
+                entries.update(shard.cache)
+        return entries
+
+    @property
+    def actual_cache_size(self):
+        """
+        :return: size of the stored large blobs
+        """
+        return sum(shard.actual_cache_size for shard in self.shards)
+
+    def hit_ratio(self):
+        """
+        :return: ratio of the reads served by the cache or None, if nothing
+                 was read
+        """
+        hits = self.small.hits
+        misses = 0
+        for shard in self.shards:
+            with shard.lock:
+                hits += shard.hits
+                misses += shard.misses
+        if hits + misses == 0:
+            return None
+        return hits / (hits + misses)
+
+    def rejected_admissions(self):
+        """
+        :return: number of blobs not stored in the cache by the admission
+        """
+        rejected = 0
+        for shard in self.shards:
+            with shard.lock:
+                rejected += shard.rejected
+        return rejected
+
+    @staticmethod
+    def _record(shard, blob_hash):
+        """
+        shard.lock has to be locked
+
+        Counts an access of the blob for the admission.
+        """
+        if shard.sketch is not None:
+            shard.sketch.increment(blob_hash)
+
+    def _admit_small(self, shard, blob_hash, size):
+        """
+        :return: True, if the small blob should be stored
+        """
+        if shard.sketch is None:
+            return True
+        victim = self.small.victim(size)
+        if victim is None:
+            return True
+        with shard.lock:
+            frequency = shard.sketch.frequency(blob_hash)
+        victim_shard = self._shard(victim)
+        with victim_shard.lock:
+            victim_frequency = victim_shard.sketch.frequency(victim)
+        if frequency > victim_frequency:
+            return True
+        with shard.lock:
+            shard.rejected += 1
+        return False
+
+    def get_cached(self, blob_hash, size, offset):
+        """
+        :param blob_hash: hash of the blob as bytes
         :param size: size to read
         :param offset: offset from where to read
+        :return: the read part of the blob as memoryview (or bytes, if it
+                 is small or read from disk_cache) or None, if it is not
+                 cached
         """
-        # pylint: disable=too-many-arguments
-        ret = None
-        with self.lock.read_locked():
-            if ((repopath in self.cache) and (path in self.cache[repopath]) and
-                    (time.time() - self.cache[repopath][path][0] < maxage)):
-                startindex = self.cache[repopath][path][2] - 1 - \
-                    self.cache[repopath][path][3] + offset
-                stopindex = self.cache[repopath][path][2] - 1
-                if size is not None:
-                    stopindex = min(startindex + size,
-                                    self.cache[repopath][path][2] - 1)
-                ret = self.cache[repopath][path][1][startindex:stopindex]
-                self.cache[repopath][path][0] = time.time()
-        return ret
+        content = self.small.get(blob_hash)
+        if content is not None:
+            if self.shards[0].sketch is not None:
+                shard = self._shard(blob_hash)
+                with shard.lock:
+                    shard.sketch.increment(blob_hash)
+            if size is None:
+                return content[offset:]
+            return content[offset:offset + size]
+        shard = self._shard(blob_hash)
+        with shard.lock:
+            entry = shard.cache.get(blob_hash, None)
+            if entry is not None:
+                shard.hits += 1
+                self._record(shard, blob_hash)
+                shard.policy.hit(blob_hash)
+                if self.maxage is not None:
+                    entry[0] = time.time()
+                    shard.last_used.move_to_end(blob_hash)
+        if (entry is None) and (self.compressed is not None):
+            entry = self._get_compressed(shard, blob_hash)
+        if entry is None:
+            if self.disk_cache is None:
+                return None
+            # the file is read without holding a lock
+            data = self.disk_cache.read(blob_hash, size, offset)
+            if data is not None:
+                with shard.lock:
+                    shard.hits += 1
+                    self._record(shard, blob_hash)
+            return data
+        # entry[1] is not modified, slicing needs no lock
+        if size is None:
+            return memoryview(entry[1])[offset:]
+        return memoryview(entry[1])[offset:offset + size]
+
+    def _get_compressed(self, shard, blob_hash):
+        """
+        :return: entry of the blob moved from the cold tier to the hot tier
+                 or None, if it is not stored compressed
+        """
+        data = self.compressed.get(blob_hash)
+        if data is None:
+            return None
+        # decompressed without holding a lock
+        content = bytearray(zlib.decompress(data))
+        if len(content) > self.max_cache_size:
+            # too large for the hot tier, it stays compressed
+            with shard.lock:
+                shard.hits += 1
+                self._record(shard, blob_hash)
+            return [None, content]
+        with shard.lock:
+            shard.hits += 1
+            self._record(shard, blob_hash)
+            victims = self._store(shard, blob_hash, content)
+            entry = shard.cache.get(blob_hash, [None, content])
+        victims += self._balance(shard)
+        self._compress(victims)
+        return entry
+
+    def _compress(self, victims):
+        """
+        :param victims: list of (blob_hash, content) removed from the hot
+                        tier
 
-    def get(self, repopath, path, blob_hash, st_size, size, offset):
+        Stores the compressible victims in the cold tier (if used).
         """
-        :param repopath: path to the actual repository
-        :param path: path in the actual repository to the blob
+        if self.compressed is None:
+            return
+        for blob_hash, content in victims:
+            if blob_hash in self.compressed:
+                continue  # the compressed blob is kept after a read
+            # compressed without holding a lock
+            data = zlib.compress(content, 1)
+            if len(data) < 0.9 * len(content):
+                self.compressed.put(blob_hash, data)
+
+    @staticmethod
+    def _remove(shard, blob_hash):
+        """
+        shard.lock has to be locked
+
+        :return: content of the removed blob
+        """
+        entry = shard.cache.pop(blob_hash)
+        shard.actual_cache_size -= entry[2]
+        shard.last_used.pop(blob_hash, None)
+        return entry[1]
+
+    def _store(self, shard, blob_hash, content):
+        """
+        shard.lock has to be locked
+
+        Stores the blob and evicts other blobs of the shard, if necessary.
+        A blob larger than the part of the shard is kept as the only blob
+        of the shard (see _balance). With admission, a blob is not stored,
+        if the shard is full and the blob was read less often than the
+        next blob to evict.
+
+        :return: list of (blob_hash, content) of the removed blobs (and of
+                 the given blob, if it is too large)
+        """
+        lendata = len(content)
+        if blob_hash in shard.cache:
+            # stored by a parallel call in the meantime
+            return []
+        if lendata > self.max_cache_size:
+            return [(blob_hash, content)]
+        if (shard.sketch is not None) and (
+                shard.actual_cache_size + lendata > shard.max_cache_size):
+            victim = shard.policy.victim()
+            if (victim is not None) and (
+                    shard.sketch.frequency(blob_hash) <=
+                    shard.sketch.frequency(victim)):
+                shard.rejected += 1
+                return []
+        shard.cache[blob_hash] = [time.time(), content, lendata]
+        if self.maxage is not None:
+            shard.last_used[blob_hash] = None
+        shard.actual_cache_size += lendata
+        shard.policy.insert(blob_hash, lendata)
+        victims = []
+        while shard.actual_cache_size > shard.max_cache_size:
+            if shard.policy.victim() == blob_hash:
+                break  # only the new blob is left
+            victim = shard.policy.evict()
+            if victim is None:
+                break
+            if victim in shard.cache:
+                victims.append((victim, self._remove(shard, victim)))
+        return victims
+
+    def _balance(self, shard):
+        """
+        Evicts blobs of the other shards, while all shards together hold
+        more than max_cache_size (e. g. after a blob larger than the part
+        of shard was stored in shard). The shard holding the most bytes is
+        reduced first.
+
+        :return: list of (blob_hash, content) of the removed blobs
+        """
+        victims = []
+        while self.actual_cache_size > self.max_cache_size:
+            others = [other for other in self.shards
+                      if (other is not shard) and other.actual_cache_size]
+            if not others:
+                break
+            other = max(others, key=lambda other: other.actual_cache_size)
+            with other.lock:
+                victim = other.policy.evict()
+                if victim is None:
+                    break
+                if victim in other.cache:
+                    victims.append((victim, self._remove(other, victim)))
+        return victims
+
+    def get(self, repopath, blob_hash, st_size, size, offset):
+        """
+        :param repopath: path to the repository to read the blob from
         :param blob_hash: hash of the blob as bytes
         :param st_size: size of the blob
         :param size: size to read
         :param offset: offset from where to read
+        :return: the read part of the blob as bytes or memoryview
         """
         # pylint: disable=too-many-arguments
-        self.clear_old()
-        ret = self.get_cached(
-            repopath, path, size, offset, maxage=2*self.maxage)
+        ret = self.get_cached(blob_hash, size, offset)
         if ret is None:
+            shard = self._shard(blob_hash)
+            with shard.lock:
+                shard.misses += 1
+                self._record(shard, blob_hash)
             data = get_blob_data(repopath, blob_hash)
             lendata = len(data)
+            # data is: [header]\n[content]\n
+            startindex = lendata - 1 - st_size
             if self.min_file_size <= st_size:
-                self.lock.acquire_read()
-                if self.actual_cache_size + lendata < self.max_cache_size:
-                    self.lock.release_read()
-                    with self.lock.write_locked():
-                        if repopath not in self.cache:
-                            self.cache[repopath] = {}
-                        self.cache[repopath][path] = [time.time(),
-                                                      data,
-                                                      lendata,
-                                                      st_size]
-                        self.actual_cache_size += self.cache[repopath][path][2]
-                else:
-                    self.lock.release_read()
-            startindex = lendata - 1 - st_size + offset
-            stopindex = lendata - 1
-            if size is not None:
-                stopindex = min(startindex + size, lendata - 1)
-            return data[startindex:stopindex]
+                content = bytearray(
+                    memoryview(data)[startindex:lendata - 1])
+                if self.disk_cache is not None:
+                    self.disk_cache.store(blob_hash, content)
+                with shard.lock:
+                    victims = self._store(shard, blob_hash, content)
+                victims += self._balance(shard)
+                self._compress(victims)
+                if size is None:
+                    return memoryview(content)[offset:]
+                return memoryview(content)[offset:offset + size]
+            content = data[startindex:lendata - 1]
+            if self._admit_small(shard, blob_hash, len(content)):
+                self.small.put(blob_hash, content)
+            if size is None:
+                return content[offset:]
+            return content[offset:offset + size]
         return ret
 
-    def _clear_repo_old(self, repopath):
+    def fill_disk_cache(self, repopath, blob_hash):
         """
-        write lock has to be locked
+        :param repopath: path to the repository to read the blob from
+        :param blob_hash: hash of the blob as bytes
+
+        Stores a (large) blob in disk_cache in the background without
+        storing it in memory.
         """
-        now = time.time()
-        for key in list(self.cache[repopath].keys()):
-            if now - self.cache[repopath][key][0] > self.maxage:
-                self.actual_cache_size -= self.cache[repopath][key][2]
-                del self.cache[repopath][key]
+        if self.disk_cache is not None:
+            self.disk_cache.fill_async(repopath, blob_hash)
 
     def clear_old(self):
         """
-        This method removes the cache for old data/repositories.
-        """
-        with self.lock.write_locked():
-            for repopath in list(self.cache.keys()):
-                self._clear_repo_old(repopath)
+        This method removes the blobs not used for maxage from the cache.
 
-    def clear_repo_old(self, repopath):
-        """
-        This method removes the cache for the given data/repositories,
-        if the cache is not up to date.
+        It is called by the janitor; only the expired entries are visited.
         """
-        with self.lock.write_locked():
-            if repopath in self.cache:
-                self._clear_repo_old(repopath)
+        if self.maxage is None:
+            return
+        oldest = time.time() - self.maxage
+        for shard in self.shards:
+            with shard.lock:
+                while shard.last_used:
+                    blob_hash = next(iter(shard.last_used))
+                    if shard.cache[blob_hash][0] >= oldest:
+                        break
+                    self._remove(shard, blob_hash)
+                    shard.policy.remove(blob_hash)
 
-    def clear_repo_all(self, repopath):
+    def clear(self):
         """
         This method removes the complete cache.
         """
-        with self.lock.write_locked():
-            if repopath in self.cache:
-                del self.cache[repopath]
+        for shard in self.shards:
+            with shard.lock:
+                shard.cache = {}
+                shard.last_used.clear()
+                shard.actual_cache_size = 0
+                shard.policy.clear()
+                if shard.sketch is not None:
+                    shard.sketch.clear()
+        self.small.clear()
+        if self.compressed is not None:
+            self.compressed.clear()
@@ -1,37 +1,72 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-04-29 (last change).
+:Date: 2021-04-29, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 """
 
 import errno
+import threading
 try:
     import fusepy  # https://github.com/fusepy/fusepy
 except ModuleNotFoundError:
     import fuse as fusepy
 
-from .read_write_lock import ReadWriteLock
+
+class _FileHandlerShard():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    file handlers of a part of the repositories with its own lock
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # repo -> set of file handlers
+        self.file_handler_repo = {}
 
 
 class SimpleFileHandlerClass():
     """
     :Author: Daniel Mohr
-    :Date: 2021-04-24
+    :Date: 2021-04-24, 2026-10-18
+
+    The file handlers are distributed to shards by the repository; every
+    shard has its own lock. Therefore threads using different
+    repositories do not wait for each other to check a file handler.
+    Only a new number is taken under a common lock (for a short time).
+
+    Example:
+
+      from py_fuse_git_bare_fs.simple_file_handler import \\
+          SimpleFileHandlerClass
+      file_handlers = SimpleFileHandlerClass()
+      file_handler = file_handlers.get('repo.git')
+      file_handlers.is_file_handler('repo.git', file_handler)
+      file_handlers.remove('repo.git', file_handler)
     """
 
-    def __init__(self, max_file_handlers=1024):
+    def __init__(self, max_file_handlers=1024, shards=16):
         """
         :param max_file_handlers: maximum number of file handlers
+        :param shards: number of shards
         """
         if max_file_handlers >= 2147483647:
             raise ValueError
         self.max_file_handlers = max_file_handlers
-        self.lock = ReadWriteLock()
-        with self.lock.write_locked():
-            self.next_file_handler_number = 0
-            self.file_handler = []
-            self.file_handler_repo = {}
+        # lock for the numbers of the file handlers
+        self.lock = threading.Lock()
+        self.next_file_handler_number = 0
+        self.file_handler = set()
+        self.shards = [_FileHandlerShard() for _ in range(shards)]
+
+    def _shard(self, repo):
+        """
+        :return: the shard of the repository repo
+        """
+        return self.shards[hash(repo) % len(self.shards)]
 
     def get(self, repo):
         """
@@ -39,22 +74,19 @@ class SimpleFileHandlerClass():
 
         It is used in an open command.
         """
-        if len(self.file_handler) >= self.max_file_handlers:
-            raise fusepy.FuseOSError(errno.EMFILE)
-        i = None
-        with self.lock.write_locked():
-            if repo in self.file_handler_repo:
-                pass
-            else:
-                self.file_handler_repo[repo] = []
+        with self.lock:
+            if len(self.file_handler) >= self.max_file_handlers:
+                raise fusepy.FuseOSError(errno.EMFILE)
             i = self.next_file_handler_number
             while i in self.file_handler:
                 i += 1
                 if i >= 2147483646:
                     i = 0
-            self.file_handler_repo[repo].append(i)
-            self.file_handler.append(i)
+            self.file_handler.add(i)
             self.next_file_handler_number = i + 1
+        shard = self._shard(repo)
+        with shard.lock:
+            shard.file_handler_repo.setdefault(repo, set()).add(i)
         return i
 
     def remove(self, repo, i):
@@ -63,14 +95,16 @@ class SimpleFileHandlerClass():
 
         It is used in a release/close command.
         """
-        with self.lock.write_locked():
-            if ((repo in self.file_handler_repo) and
-                    (i in self.file_handler_repo[repo])):
-                self.file_handler_repo[repo].pop(
-                    self.file_handler_repo[repo].index(i))
+        shard = self._shard(repo)
+        with shard.lock:
+            file_handlers = shard.file_handler_repo.get(repo, None)
+            if file_handlers is not None:
+                file_handlers.discard(i)
+                if not file_handlers:
+                    del shard.file_handler_repo[repo]
+        with self.lock:
             if i in self.file_handler:
-                self.file_handler.pop(
-                    self.file_handler.index(i))
+                self.file_handler.remove(i)
             else:
                 raise fusepy.FuseOSError(errno.EBADF)
 
@@ -78,21 +112,16 @@ class SimpleFileHandlerClass():
         """
         This method allows to check if the file handler i is still valid.
         """
-        ret = False
-        with self.lock.read_locked():
-            if ((repo in self.file_handler_repo) and
-                    (i in self.file_handler_repo[repo])):
-                ret = True
-        return ret
+        shard = self._shard(repo)
+        with shard.lock:
+            return i in shard.file_handler_repo.get(repo, ())
 
     def remove_repo(self, repo):
         """
         This method removes all file handlers belonging to the repository repo.
         """
-        with self.lock.write_locked():
-            if repo in self.file_handler_repo:
-                for i in self.file_handler_repo[repo]:
-                    if i in self.file_handler:
-                        self.file_handler.pop(
-                            self.file_handler.index(i))
-                del self.file_handler_repo[repo]
+        shard = self._shard(repo)
+        with shard.lock:
+            file_handlers = shard.file_handler_repo.pop(repo, set())
+        with self.lock:
+            self.file_handler -= file_handlers
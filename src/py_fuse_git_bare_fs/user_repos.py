@@ -1,7 +1,7 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-10-14, 2023-03-31, 2023-04-03 (last change).
+:Date: 2021-10-14, 2023-03-31, 2023-04-03, 2026-10-18 (last change).
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 """
 
@@ -11,12 +11,10 @@ import warnings
 
 from .repo_class import RepoClass
 from .read_write_lock import ReadWriteLock
+from .ref_resolver import RefCheckWindow, ref_resolver
+from .repotools import get_ref
 from .simple_file_cache import SimpleFileCache
 from .simple_file_handler import SimpleFileHandlerClass
-try:
-    from .repotools_dulwich import get_ref
-except (ModuleNotFoundError, ImportError):
-    from .repotools_git import get_ref
 
 
 def _filter_user_names(username):
@@ -31,7 +29,11 @@ def _filter_repo_names(reponame):
 class UserRepos():
     """
     :Author: Daniel Mohr
-    :Date: 2021-10-14, 2023-03-31, 2023-04-03
+    :Date: 2021-10-14, 2023-03-31, 2023-04-03, 2026-10-18
+
+    With ref_check_interval > 0 the resolved master of the repository
+    gitolite-admin is reused for this time in seconds; the value is also
+    passed to the created instances of RepoClass.
     """
     # pylint: disable=too-many-instance-attributes
 
@@ -39,19 +41,33 @@ class UserRepos():
                  gitolite_cmd='gitolite', gitolite_user_file=None,
                  max_cache_size=1073741824,
                  simple_file_handler=None,
-                 file_st_modes=None):
+                 file_st_modes=None, lazy_tree=False, keep_subtrees=False,
+                 ref_check_interval=0, cache_policy='lru',
+                 disk_cache=None,
+                 small_cache_entries=65536, small_cache_size=67108864,
+                 cache_compression=False, cache_admission=False):
         # pylint: disable=too-many-arguments
         self.repopath = repopath
         self.root_object = root_object  # not used for gitolite-admin
         self.gitolite_cmd = gitolite_cmd
         self.gitolite_user_file = gitolite_user_file
         self.adminrepo = os.path.join(self.repopath, 'gitolite-admin.git')
-        self.cache = SimpleFileCache(max_cache_size=max_cache_size)
+        self.cache = SimpleFileCache(max_cache_size=max_cache_size,
+                                     policy=cache_policy,
+                                     disk_cache=disk_cache,
+                                     small_cache_entries=small_cache_entries,
+                                     small_cache_size=small_cache_size,
+                                     compression=cache_compression,
+                                     admission=cache_admission)
         if simple_file_handler is None:
             self.simple_file_handler = SimpleFileHandlerClass()
         else:
             self.simple_file_handler = simple_file_handler
         self.file_st_modes = file_st_modes
+        self.lazy_tree = lazy_tree
+        self.keep_subtrees = keep_subtrees
+        self.ref_check_interval = ref_check_interval
+        self._ref_check = RefCheckWindow(ref_check_interval)
         self.lock = ReadWriteLock()
         with self.lock.write_locked():
             self.commit_hash = None
@@ -66,6 +82,15 @@ class UserRepos():
         del self.repos
         del self.lock
 
+    def _get_ref(self):
+        """
+        :return: hash of the commit of master of gitolite-admin as str or
+                 error message
+        """
+        return self._ref_check.get(
+            lambda: ref_resolver.resolve(
+                self.adminrepo, b'master', fallback=get_ref))
+
     def _cache_up_to_date(self):
         with self.lock.read_locked():
             commit_hash = self.commit_hash
@@ -83,7 +108,7 @@ class UserRepos():
             # self.gitolite_user_file is not a file anymore
             # (maybe it is deleted)
             return False
-        if get_ref(self.adminrepo, b'master') == commit_hash:
+        if self._get_ref() == commit_hash:
             return True
         return False
 
@@ -96,7 +121,7 @@ class UserRepos():
           self.lock.release_write()
         """
         if (update_cache) or (not self._cache_up_to_date()):
-            commit_hash = get_ref(self.adminrepo, b"master")
+            commit_hash = self._get_ref()
             if commit_hash.startswith("master"):
                 # empty repo or "master" does not exists
                 msg = 'root repository object "master" does not exists.'
@@ -184,7 +209,10 @@ class UserRepos():
                             os.path.join(self.repopath, reponame) + '.git',
                             root_object=self.root_object, cache=self.cache,
                             simple_file_handler=self.simple_file_handler,
-                            file_st_modes=self.file_st_modes)
+                            file_st_modes=self.file_st_modes,
+                            lazy_tree=self.lazy_tree,
+                            keep_subtrees=self.keep_subtrees,
+                            ref_check_interval=self.ref_check_interval)
                 else:
                     for reponame in repos:
                         # pylint: disable=consider-iterating-dictionary
@@ -193,7 +221,10 @@ class UserRepos():
                                 os.path.join(self.repopath, reponame) + '.git',
                                 root_object=self.root_object, cache=self.cache,
                                 simple_file_handler=self.simple_file_handler,
-                                file_st_modes=self.file_st_modes)
+                                file_st_modes=self.file_st_modes,
+                                lazy_tree=self.lazy_tree,
+                                keep_subtrees=self.keep_subtrees,
+                                ref_check_interval=self.ref_check_interval)
                     for reponame in list(self.repos.keys()):
                         if reponame not in repos:
                             del self.repos[reponame]
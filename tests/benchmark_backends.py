@@ -0,0 +1,117 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of the backends dulwich, git and native (reading the tree,
+the sizes of the blobs and the content of the blobs)
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_backends.py
+
+  pytest-3 -s benchmark_backends.py
+"""
+
+import os
+import re
+import subprocess
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkBackends(unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 20000 files in 200 directories and 2 large files of 64 MB
+    files_per_dir = 100
+    dirs = 200
+    large_files = 2
+    large_file_size = 67108864
+
+    def test_benchmark_backends(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_backends.py BenchmarkBackends
+
+        The repository is used as created by "git fast-import" (one pack
+        without deltas) and after "git repack -a -d -f" (deltas).
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        backends = {}
+        try:
+            from py_fuse_git_bare_fs import repotools_dulwich
+            backends['dulwich'] = repotools_dulwich
+        except (ModuleNotFoundError, ImportError):
+            pass
+        from py_fuse_git_bare_fs import repotools_git
+        backends['git'] = repotools_git
+        from py_fuse_git_bare_fs import repotools_native
+        backends['native'] = repotools_native
+        from py_fuse_git_bare_fs.object_cache import \
+            blob_size_cache, tree_cache
+        time_regpat = re.compile(r' ([0-9]+) [0-9+-]+$')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=self.dirs,
+                large_files=self.large_files,
+                large_file_size=self.large_file_size)
+            print(f'\n{self.files_per_dir * self.dirs} files, '
+                  f'{self.large_files} files with {self.large_file_size} '
+                  'bytes')
+            for packing in ['fast-import', 'repack']:
+                if packing == 'repack':
+                    subprocess.run(
+                        ['git', 'repack', '-q', '-a', '-d', '-f'],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                        cwd=src_dir, timeout=3600, check=True)
+                print(f'{packing}:')
+                for name, backend in backends.items():
+                    tree_hash = backend.get_repo_data(
+                        src_dir, b'master', time_regpat)[1]
+                    tree_cache.clear()
+                    blob_size_cache.clear()
+                    dt0 = time.time()
+                    tree = backend.get_tree(src_dir, tree_hash)
+                    print(f'  get_tree ({name}): '
+                          f'{time.time() - dt0:.3f} s')
+                    blob_hashes = [
+                        blob['hash'].encode()
+                        for level in tree.values()
+                        for blob in level['blobs'].values()]
+                    dt0 = time.time()
+                    sizes = backend.get_sizes_of_blobs(src_dir, blob_hashes)
+                    print(f'  get_sizes_of_blobs ({name}): '
+                          f'{time.time() - dt0:.3f} s')
+                    large_blob_hashes = [
+                        blob_hash for blob_hash, size in zip(
+                            blob_hashes, sizes)
+                        if size == self.large_file_size]
+                    dt0 = time.time()
+                    for blob_hash in blob_hashes:
+                        if blob_hash not in large_blob_hashes:
+                            backend.get_blob_data(src_dir, blob_hash)
+                    print(f'  get_blob_data for small files ({name}): '
+                          f'{time.time() - dt0:.3f} s')
+                    dt0 = time.time()
+                    for blob_hash in large_blob_hashes:
+                        backend.get_blob_data(src_dir, blob_hash)
+                    print(f'  get_blob_data for large files ({name}): '
+                          f'{time.time() - dt0:.3f} s')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
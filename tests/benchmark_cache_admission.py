@@ -0,0 +1,110 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of reading a working set of files during a scan of all files
+(e. g. a backup) with and without the admission of the cache
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_cache_admission.py
+
+  pytest-3 -s benchmark_cache_admission.py
+"""
+
+import os
+import random
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkCacheAdmission(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 1088 files of 256 kB: 64 files (16 MB) are read repeatedly, the
+    # others are read once by the scan; cache size 32 MB
+    files_per_dir = 64
+    dirs = 17
+    hot_files = 64
+    file_size = 262144
+    cache_size = 33554432
+    scan_reads_per_hot_read = 4
+
+    def test_benchmark_cache_admission(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_cache_admission.py BenchmarkCacheAdmission
+
+        After scan_reads_per_hot_read files of the scan, a random file of
+        the working set is read. The working set fits in the cache,
+        but the scan does not. The hit ratio of the reads of the working
+        set is given.
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+
+        def file_content(path):
+            return (path.encode() * self.file_size)[:self.file_size]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            paths = ['/' + path for path in self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=self.dirs,
+                file_content=file_content)]
+            hot = paths[:self.hot_files]
+            scan = paths[self.hot_files:]
+            print(f'\n{len(hot)} files read repeatedly, {len(scan)} files '
+                  f'read once, {self.file_size} bytes each, cache size '
+                  f'{self.cache_size}')
+            for policy in ['lru', 'arc']:
+                for admission in [False, True]:
+                    repo = RepoClass(src_dir, b'master',
+                                     max_cache_size=self.cache_size,
+                                     cache_policy=policy,
+                                     cache_admission=admission)
+                    rand = random.Random(0)
+
+                    def read(path):
+                        # pylint: disable=cell-var-from-loop
+                        file_handler = repo.open(path, 'r')
+                        repo.read(path, self.file_size, 0, file_handler)
+                        repo.release(path, file_handler)
+                    # warm up the working set
+                    for _ in range(4):
+                        for path in hot:
+                            read(path)
+                    misses = sum(
+                        shard.misses for shard in repo.cache.shards)
+                    hot_reads = 0
+                    dt0 = time.time()
+                    for i, path in enumerate(scan):
+                        read(path)
+                        if i % self.scan_reads_per_hot_read == 0:
+                            read(rand.choice(hot))
+                            hot_reads += 1
+                    duration = time.time() - dt0
+                    hot_misses = sum(
+                        shard.misses for shard in repo.cache.shards) - \
+                        misses - len(scan)
+                    print(f'  {policy}, admission {admission}: '
+                          f'{(hot_reads + len(scan)) / duration:.0f} '
+                          f'reads/s, hit ratio of the working set: '
+                          f'{1 - hot_misses / hot_reads:.3f}, rejected: '
+                          f'{repo.cache.rejected_admissions()}')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of reading text files (working set larger than the cache) with
+and without the compressed cache tier
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_compressed_cache.py
+
+  pytest-3 -s benchmark_compressed_cache.py
+"""
+
+import os
+import random
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkCompressedCache(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 256 text files of 256 kB (64 MB), cache size 32 MB
+    files_per_dir = 64
+    dirs = 4
+    file_size = 262144
+    cache_size = 33554432
+    reads = 20000
+
+    def test_benchmark_compressed_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_compressed_cache.py BenchmarkCompressedCache
+
+        Without compression only half of the files fit in the cache.
+        With compression the files not read recently are stored
+        compressed and all files fit in the cache. Reading a local
+        repository needs about the same time as decompressing (the
+        objects in a pack are compressed by zlib, too); the compression
+        saves the reads of the repository, which pays off, if these are
+        slow (e. g. a network file system or a busy disk).
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+
+        def file_content(path):
+            rand = random.Random(path)
+            words = [f'word{i} ' for i in range(1000)]
+            text = ''.join(rand.choice(words) for _ in range(
+                self.file_size // 8))
+            return text.encode()[:self.file_size]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            paths = ['/' + path for path in self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=self.dirs,
+                file_content=file_content)]
+            print(f'\n{len(paths)} files with {self.file_size} bytes, '
+                  f'cache size {self.cache_size}, {self.reads} reads')
+            for compression in [False, True]:
+                repo = RepoClass(src_dir, b'master',
+                                 max_cache_size=self.cache_size,
+                                 cache_compression=compression)
+                rand = random.Random(0)
+                dt0 = time.time()
+                for _ in range(self.reads):
+                    path = rand.choice(paths)
+                    file_handler = repo.open(path, 'r')
+                    repo.read(path, 131072,
+                              rand.randrange(0, self.file_size, 131072),
+                              file_handler)
+                    repo.release(path, file_handler)
+                duration = time.time() - dt0
+                print(f'  compression {compression}: '
+                      f'{self.reads / duration:.0f} reads/s, '
+                      f'hit ratio: {repo.cache.hit_ratio():.3f}')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
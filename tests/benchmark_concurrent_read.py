@@ -0,0 +1,105 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of concurrent reads of cached files (throughput with 1, 8 and
+32 reading threads)
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_concurrent_read.py
+
+  pytest-3 -s benchmark_concurrent_read.py
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkConcurrentRead(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 256 files of 256 kB (all fit in the cache)
+    files_per_dir = 64
+    dirs = 4
+    file_size = 262144
+    reads = 64000
+    threads = [1, 8, 32]
+
+    def _read(self, repo, paths, reads, seed):
+        """
+        reads 4 kB from random offsets of random files
+        """
+        rand = random.Random(seed)
+        for _ in range(reads):
+            path = rand.choice(paths)
+            file_handler = repo.open(path, 'r')
+            repo.read(path, 4096,
+                      rand.randrange(self.file_size - 4096), file_handler)
+            repo.release(path, file_handler)
+
+    def test_benchmark_concurrent_read(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_concurrent_read.py BenchmarkConcurrentRead
+
+        All files are read once before; then the reads are served by the
+        cache. Before, every read scanned all cached files under the
+        write lock of the cache (clear_old); now a read only looks up the
+        file under a short lock and expired files are removed by a
+        background thread.
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+
+        def file_content(path):
+            return (path.encode() * self.file_size)[:self.file_size]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            paths = ['/' + path for path in self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=self.dirs,
+                file_content=file_content)]
+            print(f'\n{len(paths)} files with {self.file_size} bytes, '
+                  f'{self.reads} reads of 4096 bytes')
+            for maxage in [None, 60]:
+                cache = SimpleFileCache(maxage=maxage)
+                repo = RepoClass(src_dir, b'master', cache=cache,
+                                 stream_min_size=2 * self.file_size)
+                self._read(repo, paths, len(paths), 0)
+                for threads in self.threads:
+                    workers = [
+                        threading.Thread(
+                            target=self._read,
+                            args=(repo, paths, self.reads // threads, i))
+                        for i in range(threads)]
+                    dt0 = time.time()
+                    for worker in workers:
+                        worker.start()
+                    for worker in workers:
+                        worker.join()
+                    duration = time.time() - dt0
+                    print(f'  maxage {maxage}, {threads} threads: '
+                          f'{self.reads / duration:.0f} reads/s')
+                print(f'  hit ratio: {cache.hit_ratio():.3f}')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of reading the tree of a repository (e. g. for mounting)
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_get_tree.py
+
+  pytest-3 -s benchmark_get_tree.py
+"""
+
+import os
+import re
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkGetTree(unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 20000 files in 200 directories and 4 large files of 64 MB
+    files_per_dir = 100
+    dirs = 200
+    large_files = 4
+    large_file_size = 67108864
+
+    def test_benchmark_get_tree(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_get_tree.py BenchmarkGetTree
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        backends = {}
+        try:
+            from py_fuse_git_bare_fs import repotools_dulwich
+            backends['dulwich'] = repotools_dulwich
+        except (ModuleNotFoundError, ImportError):
+            pass
+        from py_fuse_git_bare_fs import repotools_git
+        backends['git'] = repotools_git
+        from py_fuse_git_bare_fs.object_cache import tree_cache
+        tree_content_regpat = re.compile(
+            r'^([0-9]+) (commit|tree|blob|tag) ([0-9a-f]+)\t(.+)$')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=self.dirs,
+                large_files=self.large_files,
+                large_file_size=self.large_file_size)
+            print(f'\n{self.files_per_dir * self.dirs} files, '
+                  f'{self.large_files} files with {self.large_file_size} '
+                  'bytes')
+            for name, backend in backends.items():
+                tree_hash = backend.get_repo_data(
+                    src_dir, b'master',
+                    re.compile(r' ([0-9]+) [0-9+-]+$'))[1]
+                for cache in ['cold', 'warm']:
+                    if cache == 'cold':
+                        tree_cache.clear()
+                    dt0 = time.time()
+                    tree = backend.get_tree(
+                        src_dir, tree_hash, tree_content_regpat)
+                    print(f'get_tree ({name}, {cache} tree_cache): '
+                          f'{time.time() - dt0:.3f} s '
+                          f'for {len(tree)} directories')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
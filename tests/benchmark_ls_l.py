@@ -0,0 +1,99 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of "ls -l" (readdir and getattr for every entry) of a directory
+with many files
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_ls_l.py
+
+  pytest-3 -s benchmark_ls_l.py
+"""
+
+import os
+import re
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkLsL(unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 10000 files in one directory
+    files_per_dir = 10000
+
+    def test_benchmark_ls_l(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_ls_l.py BenchmarkLsL
+
+        Without prefetch (before) every getattr reads the size of one blob.
+        With prefetch (after) readdir reads the sizes of all blobs at once.
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        backends = {}
+        try:
+            from py_fuse_git_bare_fs import repotools_dulwich
+            backends['dulwich'] = repotools_dulwich
+        except (ModuleNotFoundError, ImportError):
+            pass
+        from py_fuse_git_bare_fs import repotools_git
+        backends['git'] = repotools_git
+        from py_fuse_git_bare_fs.object_cache import blob_size_cache
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=1)
+            print(f'\n{self.files_per_dir} files in one directory')
+            for name, backend in backends.items():
+                tree_hash = backend.get_repo_data(
+                    src_dir, b'master',
+                    re.compile(r' ([0-9]+) [0-9+-]+$'))[1]
+                level = backend.get_tree_level(
+                    src_dir, backend.get_tree_level(
+                        src_dir, backend.get_tree_level(
+                            src_dir, tree_hash)['trees']['d0'])['trees']['d0'])
+                blob_hashes = [blob['hash'].encode()
+                               for blob in level['blobs'].values()]
+                blob_size_cache.clear()
+                dt0 = time.time()
+                for blob_hash in blob_hashes:
+                    backend.get_size_of_blob(src_dir, blob_hash)
+                print(f'get_size_of_blob for every file ({name}): '
+                      f'{time.time() - dt0:.3f} s')
+                blob_size_cache.clear()
+                dt0 = time.time()
+                backend.get_sizes_of_blobs(src_dir, blob_hashes)
+                print(f'get_sizes_of_blobs ({name}): '
+                      f'{time.time() - dt0:.3f} s')
+            repo = RepoClass(src_dir, b'master', lazy_tree=True)
+            names = repo.readdir('/d0/d0')[2:]
+            for prefetch in [False, True]:
+                blob_size_cache.clear()
+                dt0 = time.time()
+                if prefetch:
+                    repo.readdir('/d0/d0')
+                for filename in names:
+                    repo.getattr('/d0/d0/' + filename)
+                print(f'ls -l with RepoClass (prefetch: {prefetch}): '
+                      f'{time.time() - dt0:.3f} s')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
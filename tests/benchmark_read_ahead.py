@@ -0,0 +1,76 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of reading a large file sequentially (e. g. a download of an
+artifact) with and without read-ahead
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_read_ahead.py
+
+  pytest-3 -s benchmark_read_ahead.py
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkReadAhead(unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # a file of 128 MB read in chunks of 128 kB (like the kernel)
+    file_size = 134217728
+    chunk_size = 131072
+    # time the reader needs for a chunk (e. g. to send it to a client)
+    consumer_delays = [0, 0.0005]
+
+    def test_benchmark_read_ahead(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_read_ahead.py BenchmarkReadAhead
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=1, dirs=1, large_files=1,
+                large_file_size=self.file_size)
+            path = '/large/l0.bin'
+            print(f'\nfile with {self.file_size} bytes, '
+                  f'reads of {self.chunk_size} bytes')
+            for consumer_delay in self.consumer_delays:
+                for read_ahead in [0, 4194304]:
+                    repo = RepoClass(src_dir, b'master',
+                                     read_ahead=read_ahead)
+                    file_handler = repo.open(path, 'r')
+                    dt0 = time.time()
+                    for offset in range(0, self.file_size, self.chunk_size):
+                        repo.read(path, self.chunk_size, offset,
+                                  file_handler)
+                        if consumer_delay > 0:
+                            time.sleep(consumer_delay)
+                    duration = time.time() - dt0
+                    repo.release(path, file_handler)
+                    print(f'  consumer delay {1000 * consumer_delay} ms, '
+                          f'read_ahead {read_ahead}: '
+                          f'{self.file_size / duration / 1048576:.0f} MB/s')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of sequential reads of a large cached file in chunks of 128 kB
+(as done by fusepy)
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_sequential_read.py
+
+  pytest-3 -s benchmark_sequential_read.py
+"""
+
+import ctypes
+import os
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkSequentialRead(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # one file of 256 MB
+    large_file_size = 268435456
+    chunk_size = 131072
+    rounds = 4
+
+    def test_benchmark_sequential_read(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_sequential_read.py BenchmarkSequentialRead
+
+        The file is read once before; then the reads are served by the
+        cache. Every chunk is copied by ctypes.memmove into a buffer like
+        fusepy does. "copy" converts the result to bytes before (a copy
+        of every chunk as done before), "zero-copy" uses read_buffer.
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.read_buffer import read_buffer
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=1, dirs=1, large_files=1,
+                large_file_size=self.large_file_size)
+            path = '/large/l0.bin'
+            cache = SimpleFileCache(max_cache_size=2 * self.large_file_size)
+            repo = RepoClass(src_dir, b'master', cache=cache,
+                             stream_min_size=2 * self.large_file_size)
+            buf = ctypes.create_string_buffer(self.chunk_size)
+            file_handler = repo.open(path, 'r')
+            dt0 = time.time()
+            repo.read(path, self.chunk_size, 0, file_handler)
+            print(f'\nfirst read (fill the cache): '
+                  f'{time.time() - dt0:.3f} s')
+            for name, convert in [('copy', bytes),
+                                  ('zero-copy', read_buffer)]:
+                dt0 = time.time()
+                for _ in range(self.rounds):
+                    for offset in range(
+                            0, self.large_file_size, self.chunk_size):
+                        ret = convert(repo.read(
+                            path, self.chunk_size, offset, file_handler))
+                        ctypes.memmove(buf, ret, len(ret))
+                speed = self.rounds * self.large_file_size / \
+                    (time.time() - dt0) / 1048576
+                print(f'  {name}: {speed:.0f} MB/s')
+            repo.release(path, file_handler)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
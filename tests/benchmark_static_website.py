@@ -0,0 +1,107 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+benchmark of serving a static website (many small files) by the
+operations of the mount, while large files are read in between
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_static_website.py
+
+  pytest-3 -s benchmark_static_website.py
+"""
+
+import os
+import random
+import tempfile
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkStaticWebsite(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 2000 pages of about 4 kB and 4 large files of 4 MB
+    files_per_dir = 50
+    dirs = 40
+    large_files = 4
+    large_file_size = 4194304
+    requests = 20000
+    # every 100th request reads a large file
+    large_every = 100
+
+    @staticmethod
+    def _serve(operations, path):
+        """
+        serves a file as a web server does through the mount
+        """
+        operations.getattr(path)
+        file_handler = operations.open(path, 'r')
+        operations.read(path, 131072, 0, file_handler)
+        operations.release(path, file_handler)
+
+    def test_benchmark_static_website(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_static_website.py BenchmarkStaticWebsite
+
+        Before, files smaller than 128 kB were not cached and read from
+        the repository for every request ("small_cache_entries 0"). Now
+        they are stored in a separate tier, which the large files (read
+        in between) cannot evict.
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.git_bare_repo import GitBareRepo
+
+        def file_content(path):
+            page = f'<html><head><title>{path}</title></head><body>'
+            return (page + 4000 * 'x' + '</body></html>\n').encode()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            paths = ['/' + path for path in self._prepare_benchmark_repo(
+                src_dir, files_per_dir=self.files_per_dir, dirs=self.dirs,
+                large_files=self.large_files,
+                large_file_size=self.large_file_size,
+                file_content=file_content)]
+            large_paths = [path for path in paths
+                           if path.startswith('/large/')]
+            paths = [path for path in paths if path not in large_paths]
+            print(f'\n{len(paths)} small files, {self.large_files} files '
+                  f'with {self.large_file_size} bytes, '
+                  f'{self.requests} requests')
+            for small_cache_entries in [0, 65536]:
+                # the cache holds 2 of the large files
+                operations = GitBareRepo(
+                    src_dir, b'master', 2 * self.large_file_size,
+                    lazy_tree=True, small_cache_entries=small_cache_entries)
+                rand = random.Random(0)
+                dt0 = time.time()
+                for i in range(self.requests):
+                    if i % self.large_every == 0:
+                        self._serve(operations, rand.choice(large_paths))
+                    else:
+                        # a few pages are requested often
+                        self._serve(operations, paths[int(
+                            len(paths) * rand.random() ** 3)])
+                duration = time.time() - dt0
+                print(f'  small_cache_entries {small_cache_entries}: '
+                      f'{self.requests / duration:.0f} requests/s, hit '
+                      f'ratio: {operations.repo.cache.hit_ratio():.3f}')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
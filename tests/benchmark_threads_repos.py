@@ -0,0 +1,118 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+stress benchmark of reads by many threads across different repositories
+of one mount (like "fuse_git_bare_fs tree -threads")
+
+This benchmark is not part of the normal tests. You can run this file
+directly::
+
+  env python3 benchmark_threads_repos.py
+
+  pytest-3 -s benchmark_threads_repos.py
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+class BenchmarkThreadsRepos(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # 16 repositories with 200 files of 16 kB
+    repos = 16
+    files_per_dir = 50
+    dirs = 4
+    file_size = 16384
+    reads = 40000
+    threads = [1, 4, 16, 64]
+
+    def _work(self, operations, paths, reads, seed, errors):
+        """
+        opens, reads and releases random files
+        """
+        rand = random.Random(seed)
+        try:
+            for _ in range(reads):
+                path = rand.choice(paths)
+                operations.getattr(path)
+                file_handler = operations.open(path, 'r')
+                operations.read(path, 4096,
+                                rand.randrange(0, self.file_size, 4096),
+                                file_handler)
+                operations.release(path, file_handler)
+        except Exception as err:  # pylint: disable=broad-except
+            errors.append(err)
+
+    def test_benchmark_threads_repos(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        env python3 benchmark_threads_repos.py BenchmarkThreadsRepos
+
+        Every thread does getattr, open, read and release of random files
+        in all repositories; the throughput is measured with a warm
+        cache ("cached") and without caching the content of the files
+        ("uncached", every read reads the repository).
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.git_bare_repo_tree import GitBareRepoTree
+
+        def file_content(path):
+            return (path.encode() * self.file_size)[:self.file_size]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repos')
+            os.mkdir(src_dir)
+            paths = []
+            for i in range(self.repos):
+                paths += [f'/repo{i}/{path}'
+                          for path in self._prepare_benchmark_repo(
+                              os.path.join(src_dir, f'repo{i}.git'),
+                              files_per_dir=self.files_per_dir,
+                              dirs=self.dirs, file_content=file_content)]
+            print(f'\n{self.repos} repositories, {len(paths)} files with '
+                  f'{self.file_size} bytes, {self.reads} reads of 4096 '
+                  'bytes')
+            for name, small_cache_entries in [('cached', 65536),
+                                              ('uncached', 0)]:
+                operations = GitBareRepoTree(
+                    src_dir, b'master', 1073741824, lazy_tree=True,
+                    small_cache_entries=small_cache_entries)
+                errors = []
+                self._work(operations, paths, 2 * len(paths), 0, errors)
+                for threads in self.threads:
+                    workers = [
+                        threading.Thread(
+                            target=self._work,
+                            args=(operations, paths, self.reads // threads,
+                                  i, errors))
+                        for i in range(threads)]
+                    dt0 = time.time()
+                    for worker in workers:
+                        worker.start()
+                    for worker in workers:
+                        worker.join()
+                    duration = time.time() - dt0
+                    print(f'  {name}, {threads} threads: '
+                          f'{self.reads / duration:.0f} reads/s')
+                self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -87,6 +87,23 @@ def module(suite):
         'tests.py_fuse_git_bare_fs_repotools_dulwich'))
     suite.addTest(loader.loadTestsFromName(
         'tests.py_fuse_git_bare_fs_repotools_git'))
+    suite.addTest(loader.loadTestsFromName(
+        'tests.py_fuse_git_bare_fs_repotools_native'))
+    # py_fuse_git_bare_fs.ref_resolver
+    suite.addTest(loader.loadTestsFromName(
+        'tests.py_fuse_git_bare_fs_ref_resolver'))
+    # py_fuse_git_bare_fs.blob_stream
+    suite.addTest(loader.loadTestsFromName(
+        'tests.py_fuse_git_bare_fs_blob_stream'))
+    # py_fuse_git_bare_fs.simple_file_cache
+    suite.addTest(loader.loadTestsFromName(
+        'tests.py_fuse_git_bare_fs_simple_file_cache'))
+    # py_fuse_git_bare_fs.disk_blob_cache
+    suite.addTest(loader.loadTestsFromName(
+        'tests.py_fuse_git_bare_fs_disk_blob_cache'))
+    # py_fuse_git_bare_fs.simple_file_handler
+    suite.addTest(loader.loadTestsFromName(
+        'tests.py_fuse_git_bare_fs_simple_file_handler'))
 
 
 def scripts(suite):
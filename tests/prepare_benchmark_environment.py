@@ -0,0 +1,74 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+"""
+
+import os
+import subprocess
+import time
+
+
+class PrepareBenchmarkEnvironment():
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+
+    use this as a mixin class
+    """
+    # pylint: disable=too-few-public-methods
+
+    def _prepare_benchmark_repo(
+            self, src_dir, files_per_dir=100, dirs=200, large_files=0,
+            large_file_size=33554432, file_content=None, max_dirs_per_dir=50):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        Creates the git bare repository src_dir with files_per_dir * dirs
+        small files and large_files files of the size large_file_size
+        (random content) using "git fast-import".
+
+        :param file_content: function (path) -> bytes to generate the
+                             content of the small files
+        :return: list of the paths of the files in the repository
+        """
+        # pylint: disable=too-many-arguments,no-self-use,too-many-locals
+        subprocess.run(
+            ['git', 'init', '--bare', '-q', src_dir],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            timeout=3, check=True)
+        if file_content is None:
+            def file_content(path):
+                return (path + '\n').encode()
+        paths = []
+        for i in range(dirs):
+            dirpath = f'd{i // max_dirs_per_dir}/d{i}'
+            for j in range(files_per_dir):
+                paths.append(f'{dirpath}/f{j}.txt')
+        large_paths = [f'large/l{i}.bin' for i in range(large_files)]
+        # pylint: disable=consider-using-with
+        cpi = subprocess.Popen(
+            ['git', 'fast-import', '--quiet'],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, cwd=src_dir)
+        commit = [b'commit refs/heads/master\n',
+                  f'committer a <a@b.c> {int(time.time())} +0000\n'.encode(),
+                  b'data 5\ninit\n']
+        for path in paths:
+            data = file_content(path)
+            commit.append(b'M 100644 inline ' + path.encode() + b'\n')
+            commit.append(
+                b'data ' + str(len(data)).encode() + b'\n' + data + b'\n')
+        cpi.stdin.write(b''.join(commit))
+        for path in large_paths:
+            cpi.stdin.write(b'M 100644 inline ' + path.encode() + b'\n')
+            cpi.stdin.write(b'data ' + str(large_file_size).encode() + b'\n')
+            for k in range(0, large_file_size, 1048576):
+                cpi.stdin.write(
+                    os.urandom(min(1048576, large_file_size - k)))
+            cpi.stdin.write(b'\n')
+        cpi.stdin.close()
+        cpi.wait(timeout=600)
+        return paths + large_paths
@@ -0,0 +1,227 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+tests the module py_fuse_git_bare_fs.blob_stream
+
+You can run this file directly:
+
+  env python3 py_fuse_git_bare_fs_blob_stream.py
+
+Or you can run only one test, e. g.:
+
+  env python3 py_fuse_git_bare_fs_blob_stream.py \
+    PyFuseGitBareFsBlobStream.test_blob_stream
+"""
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+try:
+    from .prepare_benchmark_environment import PrepareBenchmarkEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_benchmark_environment import PrepareBenchmarkEnvironment
+
+
+def _git(cmd, cwd, stdin=None):
+    return subprocess.run(
+        cmd, input=stdin,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, timeout=30, check=True).stdout
+
+
+class PyFuseGitBareFsBlobStream(
+        unittest.TestCase, PrepareBenchmarkEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+
+    def test_blob_stream(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test reads parts of a packed and of a loose blob by
+        py_fuse_git_bare_fs.blob_stream.
+
+        env python3 py_fuse_git_bare_fs_blob_stream.py \
+          PyFuseGitBareFsBlobStream.test_blob_stream
+        """
+        from py_fuse_git_bare_fs.blob_stream import open_blob_stream
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            # git fast-import stores the objects in a pack
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=2, dirs=1, large_files=1,
+                large_file_size=3145733)
+            packed_hash = _git(['git', 'rev-parse', 'master:large/l0.bin'],
+                               src_dir).strip()
+            packed_data = _git(['git', 'cat-file', 'blob', packed_hash],
+                               src_dir)
+            loose_data = os.urandom(1048579)
+            loose_hash = _git(['git', 'hash-object', '-w', '--stdin'],
+                              src_dir, stdin=loose_data).strip()
+            self.assertIsNone(open_blob_stream(src_dir, 40 * b'0'))
+            for blob_hash, data in [(packed_hash, packed_data),
+                                    (loose_hash, loose_data)]:
+                stream = open_blob_stream(src_dir, blob_hash,
+                                          chunk_size=65536)
+                self.assertEqual(stream.size, len(data))
+                # sequential reads
+                self.assertEqual(stream.read(0, 100), data[:100])
+                self.assertEqual(stream.read(100, 200000), data[100:200100])
+                self.assertEqual(stream.read(len(data) - 10, 100),
+                                 data[-10:])
+                self.assertEqual(stream.read(len(data), 100), b'')
+                self.assertEqual(stream.restarts, 0)
+                # read before the window
+                self.assertEqual(stream.read(5, 10), data[5:15])
+                self.assertEqual(stream.restarts, 1)
+                self.assertEqual(stream.read(0, None), data)
+                stream.close()
+
+    def test_read_ahead_stream(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test reads a blob sequentially and randomly by
+        py_fuse_git_bare_fs.blob_stream.ReadAheadStream.
+
+        env python3 py_fuse_git_bare_fs_blob_stream.py \
+          PyFuseGitBareFsBlobStream.test_read_ahead_stream
+        """
+        from py_fuse_git_bare_fs.blob_stream import \
+            open_blob_stream, ReadAheadStream
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=2, dirs=1, large_files=1,
+                large_file_size=3145733)
+            blob_hash = _git(['git', 'rev-parse', 'master:large/l0.bin'],
+                             src_dir).strip()
+            data = _git(['git', 'cat-file', 'blob', blob_hash], src_dir)
+            stream = ReadAheadStream(
+                open_blob_stream(src_dir, blob_hash, chunk_size=65536),
+                min_window=65536, max_window=524288)
+            self.assertEqual(stream.size, len(data))
+            # sequential reads are read ahead, the window grows
+            parts = []
+            for offset in range(0, len(data), 65536):
+                parts.append(stream.read(offset, 65536))
+            self.assertEqual(b''.join(parts), data)
+            self.assertEqual(stream.read(len(data), 65536), b'')
+            self.assertEqual(stream.window, 524288)
+            self.assertGreaterEqual(stream.hits, len(parts) - 2)
+            self.assertEqual(stream.stream.restarts, 0)
+            self.assertLessEqual(stream.buffer_start + len(stream.buffer),
+                                 len(data))
+            # a read at another offset resets the window
+            self.assertEqual(stream.read(5, 10), data[5:15])
+            self.assertEqual(stream.window, 65536)
+            self.assertEqual(stream.buffer, b'')
+            self.assertIsNone(stream.thread)
+            # a read larger than the data read ahead
+            self.assertEqual(stream.read(15, 100), data[15:115])
+            self.assertIsNotNone(stream.thread)
+            self.assertEqual(stream.read(115, 1048576),
+                             data[115:1048691])
+            self.assertEqual(stream.read(1048691, None), data[1048691:])
+            stream.close()
+            self.assertEqual(stream.buffer, b'')
+
+    def test_blob_stream_delta(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks, that deltified blobs are not streamed by
+        py_fuse_git_bare_fs.blob_stream.
+
+        env python3 py_fuse_git_bare_fs_blob_stream.py \
+          PyFuseGitBareFsBlobStream.test_blob_stream_delta
+        """
+        from py_fuse_git_bare_fs.blob_stream import open_blob_stream
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # non-bare repository
+            _git(['git', 'init', '-q', tmpdir], tmpdir)
+            data = os.urandom(262144)
+            blob_hashes = []
+            for i in range(2):
+                with open(os.path.join(tmpdir, 'f'), 'wb') as fd:
+                    fd.write(data + i * b'x')
+                _git(['git', 'add', 'f'], tmpdir)
+                _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                      'commit', '-q', '-m', str(i)], tmpdir)
+                blob_hashes.append(
+                    _git(['git', 'rev-parse', 'HEAD:f'], tmpdir).strip())
+            _git(['git', 'repack', '-q', '-a', '-d', '-f'], tmpdir)
+            streams = [open_blob_stream(tmpdir, blob_hash)
+                       for blob_hash in blob_hashes]
+            # one blob is stored as delta of the other one
+            self.assertEqual(
+                [stream is None for stream in streams].count(True), 1)
+            for i, stream in enumerate(streams):
+                if stream is not None:
+                    self.assertEqual(stream.read(0, None), data + i * b'x')
+                    stream.close()
+
+    def test_repo_class_stream(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test reads a file by py_fuse_git_bare_fs.repo_class using
+        a stream.
+
+        env python3 py_fuse_git_bare_fs_blob_stream.py \
+          PyFuseGitBareFsBlobStream.test_repo_class_stream
+        """
+        from py_fuse_git_bare_fs.blob_stream import ReadAheadStream
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            self._prepare_benchmark_repo(
+                src_dir, files_per_dir=2, dirs=1, large_files=1,
+                large_file_size=1048583)
+            data = _git(['git', 'cat-file', 'blob', 'master:large/l0.bin'],
+                        src_dir)
+            repo = RepoClass(src_dir, b'master', stream_min_size=1048576)
+            file_handler = repo.open('/large/l0.bin', 'r')
+            parts = []
+            for offset in range(0, len(data) + 65536, 65536):
+                parts.append(
+                    repo.read('/large/l0.bin', 65536, offset, file_handler))
+            self.assertEqual(b''.join(parts), data)
+            # pylint: disable=protected-access
+            self.assertIsInstance(repo._blob_streams[file_handler][1],
+                                  ReadAheadStream)
+            repo.release('/large/l0.bin', file_handler)
+            self.assertEqual(repo._blob_streams, {})
+            # without read-ahead
+            repo = RepoClass(src_dir, b'master', stream_min_size=1048576,
+                             read_ahead=0)
+            file_handler = repo.open('/large/l0.bin', 'r')
+            self.assertEqual(
+                repo.read('/large/l0.bin', 65536, 65536, file_handler),
+                data[65536:131072])
+            self.assertNotIsInstance(
+                repo._blob_streams[file_handler][1], ReadAheadStream)
+            repo.release('/large/l0.bin', file_handler)
+            # small files are not streamed
+            file_handler = repo.open('/d0/d0/f0.txt', 'r')
+            self.assertEqual(
+                repo.read('/d0/d0/f0.txt', None, 0, file_handler),
+                b'd0/d0/f0.txt\n')
+            self.assertEqual(repo._blob_streams, {})
+            repo.release('/d0/d0/f0.txt', file_handler)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,274 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+tests the module py_fuse_git_bare_fs.disk_blob_cache
+
+You can run this file directly:
+
+  env python3 py_fuse_git_bare_fs_disk_blob_cache.py
+
+Or you can run only one test, e. g.:
+
+  env python3 py_fuse_git_bare_fs_disk_blob_cache.py \
+    PyFuseGitBareFsDiskBlobCache.test_disk_blob_cache
+"""
+
+import os
+import stat
+import subprocess
+import tempfile
+import time
+import unittest
+
+
+def _git(cmd, cwd, stdin=None):
+    return subprocess.run(
+        cmd, input=stdin,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, timeout=30, check=True).stdout
+
+
+def _dead_pid():
+    """
+    :return: pid of a finished process
+    """
+    with subprocess.Popen(['true']) as process:
+        process.wait()
+    return process.pid
+
+
+class PyFuseGitBareFsDiskBlobCache(unittest.TestCase):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+
+    def test_disk_blob_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test stores and reads blobs, checks the eviction and the
+        recovery after a crash.
+
+        env python3 py_fuse_git_bare_fs_disk_blob_cache.py \
+          PyFuseGitBareFsDiskBlobCache.test_disk_blob_cache
+        """
+        from py_fuse_git_bare_fs.disk_blob_cache import DiskBlobCache
+        blob_hashes = [(f'{i:02x}' * 20).encode() for i in range(5)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, 'cache')
+            cache = DiskBlobCache(cache_dir, max_size=3072)
+            self.assertIsNone(cache.read(blob_hashes[0], None, 0))
+            content = bytes(range(256)) * 4
+            cache.store(blob_hashes[0], content)
+            self.assertEqual(cache.read(blob_hashes[0], None, 0), content)
+            self.assertEqual(cache.read(blob_hashes[0], 10, 100),
+                             content[100:110])
+            self.assertEqual(cache.read(blob_hashes[0], 10, 1020),
+                             content[1020:])
+            self.assertEqual(cache.read(blob_hashes[0], 10, 2000), b'')
+            self.assertEqual((cache.hits, cache.misses), (4, 1))
+            # eviction of the least recently used blob
+            cache.store(blob_hashes[1], content)
+            cache.store(blob_hashes[2], content)
+            cache.read(blob_hashes[0], 1, 0)
+            cache.store(blob_hashes[3], content)
+            self.assertEqual(set(cache.entries.keys()),
+                             {blob_hashes[0], blob_hashes[2],
+                              blob_hashes[3]})
+            self.assertEqual(cache.size, 3072)
+            self.assertIsNone(cache.read(blob_hashes[1], None, 0))
+            # a blob larger than the cache is not stored
+            cache.store(blob_hashes[4], 4000 * b'a')
+            self.assertIsNone(cache.read(blob_hashes[4], None, 0))
+            # recovery: temporary file of a crashed process
+            tmp_name = f'{_dead_pid()}.1.{blob_hashes[4].decode()}'
+            with open(os.path.join(cache_dir, 'tmp', tmp_name), 'wb') as fd:
+                fd.write(b'incomplete')
+            own_tmp_name = f'{os.getpid()}.1.{blob_hashes[4].decode()}'
+            with open(os.path.join(cache_dir, 'tmp', own_tmp_name),
+                      'wb') as fd:
+                fd.write(b'incomplete')
+            # the order of use is given by the modification time
+            for i, blob_hash in enumerate(
+                    [blob_hashes[3], blob_hashes[0], blob_hashes[2]]):
+                mtime = time.time() - 100 + i
+                os.utime(cache._object_path(blob_hash), (mtime, mtime))
+            cache = DiskBlobCache(cache_dir, max_size=2048)
+            self.assertEqual(os.listdir(os.path.join(cache_dir, 'tmp')),
+                             [own_tmp_name])
+            self.assertEqual(list(cache.entries.keys()),
+                             [blob_hashes[0], blob_hashes[2]])
+            self.assertFalse(os.path.exists(
+                cache._object_path(blob_hashes[3])))
+            # a second instance (another process) shares the stored blobs
+            other = DiskBlobCache(cache_dir, max_size=2048)
+            other.store(blob_hashes[1], b'abc')
+            self.assertEqual(cache.read(blob_hashes[1], None, 0), b'abc')
+            self.assertIn(blob_hashes[1], cache.entries)
+
+    def test_disk_blob_cache_fill(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test fills py_fuse_git_bare_fs.disk_blob_cache from a
+        repository and uses it as second tier of
+        py_fuse_git_bare_fs.simple_file_cache.
+
+        env python3 py_fuse_git_bare_fs_disk_blob_cache.py \
+          PyFuseGitBareFsDiskBlobCache.test_disk_blob_cache_fill
+        """
+        from py_fuse_git_bare_fs.disk_blob_cache import DiskBlobCache
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            cache_dir = os.path.join(tmpdir, 'cache')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            contents = {}
+            for i in range(3):
+                content = (str(i) * 100000).encode()
+                blob_hash = _git(
+                    ['git', 'hash-object', '-w', '--stdin'], src_dir,
+                    stdin=content).strip()
+                contents[blob_hash] = content
+            blob_hashes = list(contents.keys())
+            disk_cache = DiskBlobCache(cache_dir)
+            # fill
+            disk_cache.fill(src_dir, blob_hashes[0])
+            self.assertEqual(disk_cache.read(blob_hashes[0], None, 0),
+                             contents[blob_hashes[0]])
+            disk_cache.fill(src_dir, 40 * b'0')
+            self.assertIsNone(disk_cache.read(40 * b'0', None, 0))
+            self.assertEqual(
+                os.listdir(os.path.join(cache_dir, 'tmp')), [])
+            # fill_async
+            disk_cache.fill_async(src_dir, blob_hashes[1])
+            for _ in range(100):
+                if not disk_cache.filling:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(disk_cache.read(blob_hashes[1], 10, 5),
+                             contents[blob_hashes[1]][5:15])
+            # at most fill_workers threads store the blobs
+            bounded = DiskBlobCache(os.path.join(tmpdir, 'bounded'),
+                                    fill_workers=1, max_fill_queue=2)
+            for blob_hash in blob_hashes:
+                bounded.fill_async(src_dir, blob_hash)
+                self.assertLessEqual(bounded.fill_threads, 1)
+                self.assertLessEqual(len(bounded.fill_queue), 2)
+            for _ in range(100):
+                if not bounded.filling:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(bounded.fill_threads, 0)
+            self.assertGreaterEqual(len(bounded.entries), 2)
+            # an entry of objects/ removed by another process during a
+            # rescan does not stop the rescans
+            with open(os.path.join(cache_dir, 'objects', 'zz'), 'wb'):
+                pass
+            disk_cache.rescan_interval = 0
+            disk_cache.store(40 * b'a', b'abc')
+            self.assertEqual(disk_cache.read(40 * b'a', None, 0), b'abc')
+            self.assertLess(disk_cache.scanned, time.time() + 1)
+            # second tier of SimpleFileCache
+            cache = SimpleFileCache(min_file_size=0, disk_cache=disk_cache)
+            self.assertEqual(
+                cache.get(src_dir, blob_hashes[2], 100000, None, 0),
+                contents[blob_hashes[2]])
+            # after a restart the blobs are read without the repository
+            cache = SimpleFileCache(min_file_size=0,
+                                    disk_cache=DiskBlobCache(cache_dir))
+            os.rename(src_dir, src_dir + '.moved')
+            for blob_hash in blob_hashes:
+                self.assertEqual(
+                    cache.get_cached(blob_hash, 10, 1000),
+                    contents[blob_hash][1000:1010])
+            self.assertEqual(cache.hit_ratio(), 1)
+
+    def test_shared_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test uses py_fuse_git_bare_fs.disk_blob_cache by several
+        instances (like several mount processes) at the same time.
+
+        env python3 py_fuse_git_bare_fs_disk_blob_cache.py \
+          PyFuseGitBareFsDiskBlobCache.test_shared_cache
+        """
+        from py_fuse_git_bare_fs.disk_blob_cache import \
+            DiskBlobCache, shared_cache_path
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        self.assertEqual(shared_cache_path('www'),
+                         '/dev/shm/fuse_git_bare_fs_www')
+        for name in ['', '.', '..', 'a/b']:
+            with self.assertRaises(ValueError):
+                shared_cache_path(name)
+        blob_hashes = [(f'{i:02x}' * 20).encode() for i in range(4)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, 'shared')
+            caches = [DiskBlobCache(cache_dir, max_size=300, fsync=False,
+                                    rescan_interval=0)
+                      for _ in range(2)]
+            # the budget is kept for the files of all instances
+            for i, blob_hash in enumerate(blob_hashes):
+                caches[i % 2].store(blob_hash, 100 * b'x')
+            stored = [blob_hash for blob_hash in blob_hashes
+                      if os.path.exists(caches[0]._object_path(blob_hash))]
+            self.assertEqual(stored, blob_hashes[1:])
+            self.assertEqual(caches[1].size, 300)
+            # a read updates the modification time (order of use)
+            path = caches[0]._object_path(blob_hashes[1])
+            os.utime(path, (time.time() - 3600, time.time() - 3600))
+            self.assertEqual(caches[0].read(blob_hashes[1], 1, 0), b'x')
+            self.assertGreater(os.stat(path).st_mtime, time.time() - 60)
+            caches[1].store(blob_hashes[0], 100 * b'y')
+            self.assertEqual(
+                list(caches[1].entries.keys()),
+                [blob_hashes[3], blob_hashes[1], blob_hashes[0]])
+            # a blob is served by the shared cache to another instance
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            content = 1000 * b'z'
+            blob_hash = _git(['git', 'hash-object', '-w', '--stdin'],
+                             src_dir, stdin=content).strip()
+            memory_caches = [
+                SimpleFileCache(min_file_size=0, max_cache_size=0,
+                                disk_cache=DiskBlobCache(cache_dir))
+                for _ in range(2)]
+            self.assertEqual(
+                memory_caches[0].get(src_dir, blob_hash, 1000, 10, 0),
+                content[:10])
+            self.assertEqual(len(memory_caches[0].cache), 0)
+            self.assertEqual(
+                memory_caches[1].get_cached(blob_hash, 10, 990),
+                content[990:])
+            # a private directory is only accessible by the user
+            private_dir = os.path.join(tmpdir, 'private')
+            DiskBlobCache(private_dir, private=True)
+            self.assertEqual(stat.S_IMODE(os.stat(private_dir).st_mode) &
+                             (stat.S_IRWXG | stat.S_IRWXO), 0)
+            DiskBlobCache(private_dir, private=True)
+            # other users could change the content
+            link = os.path.join(tmpdir, 'link')
+            os.symlink(private_dir, link)
+            with self.assertRaises(PermissionError):
+                DiskBlobCache(link, private=True)
+            os.chmod(private_dir, 0o775)
+            with self.assertRaises(PermissionError):
+                DiskBlobCache(private_dir, private=True)
+            os.chmod(private_dir, 0o700)
+            if os.getuid() == 0:
+                os.chown(private_dir, 65534, -1)
+                with self.assertRaises(PermissionError):
+                    DiskBlobCache(private_dir, private=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
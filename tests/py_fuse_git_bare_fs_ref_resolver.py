@@ -0,0 +1,329 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+tests the module py_fuse_git_bare_fs.ref_resolver
+
+You can run this file directly:
+
+  env python3 py_fuse_git_bare_fs_ref_resolver.py
+
+Or you can run only one test, e. g.:
+
+  env python3 py_fuse_git_bare_fs_ref_resolver.py \
+    PyFuseGitBareFsRefResolver.test_ref_resolver
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+
+try:
+    from .prepare_simple_test_environment import PrepareSimpleTestEnvironment
+except (ModuleNotFoundError, ImportError):
+    from prepare_simple_test_environment import PrepareSimpleTestEnvironment
+
+
+def _git(cmd, cwd):
+    return subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, timeout=30, check=True).stdout.decode().strip()
+
+
+class PyFuseGitBareFsRefResolver(
+        unittest.TestCase, PrepareSimpleTestEnvironment):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+
+    def test_ref_resolver(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test resolves branches, symbolic references, annotated tags
+        and hashes by py_fuse_git_bare_fs.ref_resolver and compares the
+        results to "git rev-parse".
+
+        env python3 py_fuse_git_bare_fs_ref_resolver.py \
+          PyFuseGitBareFsRefResolver.test_ref_resolver
+        """
+        from py_fuse_git_bare_fs.ref_resolver import RefResolver
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            resolver = RefResolver()
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            with self.assertRaises(FileNotFoundError):
+                resolver.resolve(src_dir, b'master')
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            commit_hash = _git(['git', 'rev-parse', 'master'], src_dir)
+            _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                  'tag', '-a', '-m', 'v1', 'v1', 'master'], src_dir)
+            _git(['git', 'tag', 'v2', 'master'], src_dir)
+            _git(['git', 'symbolic-ref', 'refs/heads/sym',
+                  'refs/heads/master'], src_dir)
+            for name in [b'master', b'HEAD', b'v1', b'v2', b'sym',
+                         b'refs/heads/master', b'heads/master',
+                         _git(['git', 'rev-parse', 'v1'], src_dir).encode()]:
+                self.assertEqual(resolver.resolve(src_dir, name),
+                                 commit_hash)
+            self.assertEqual(resolver.resolve(src_dir, b'main'),
+                             'main missing')
+            # the results are cached
+            misses = resolver.misses
+            for name in [b'master', b'v1', b'main']:
+                resolver.resolve(src_dir, name)
+            self.assertEqual(resolver.misses, misses)
+            # packed references (with peeled tags)
+            _git(['git', 'pack-refs', '--all'], src_dir)
+            for name in [b'master', b'v1', b'v2']:
+                self.assertEqual(resolver.resolve(src_dir, name),
+                                 commit_hash)
+            self.assertEqual(resolver.misses, misses + 3)
+            # a changed and a new branch are detected
+            tree_hash = _git(['git', 'rev-parse', 'master^{tree}'], src_dir)
+            new_commit_hash = _git(
+                ['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                 'commit-tree', '-p', 'master', '-m', 'foo', tree_hash],
+                src_dir)
+            _git(['git', 'update-ref', 'refs/heads/master', new_commit_hash],
+                 src_dir)
+            _git(['git', 'branch', 'main', commit_hash], src_dir)
+            self.assertEqual(resolver.resolve(src_dir, b'master'),
+                             new_commit_hash)
+            self.assertEqual(resolver.resolve(src_dir, b'sym'),
+                             new_commit_hash)
+            self.assertEqual(resolver.resolve(src_dir, b'main'),
+                             commit_hash)
+            # revision expressions are resolved by the fallback
+            self.assertEqual(resolver.resolve(src_dir, b'master~1'),
+                             'master~1 missing')
+            self.assertEqual(
+                resolver.resolve(src_dir, b'master~1',
+                                 fallback=lambda src_dir, name: 'foo'),
+                'foo')
+
+    def test_repo_class_root_object(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test uses an annotated tag as root_object of
+        py_fuse_git_bare_fs.repo_class with all backends.
+
+        env python3 py_fuse_git_bare_fs_ref_resolver.py \
+          PyFuseGitBareFsRefResolver.test_repo_class_root_object
+        """
+        from py_fuse_git_bare_fs.ref_resolver import ref_resolver
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.repotools import set_backend
+        backends = ['git', 'native']
+        try:
+            import dulwich  # pylint: disable = unused-import
+            backends.append('dulwich')
+        except (ModuleNotFoundError, ImportError):
+            pass
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            commit_hash = _git(['git', 'rev-parse', 'master'], src_dir)
+            _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                  'tag', '-a', '-m', 'v1', 'v1', 'master'], src_dir)
+            try:
+                for backend in backends:
+                    set_backend(backend)
+                    repo = RepoClass(src_dir, b'v1')
+                    self.assertEqual(repo.commit_hash, commit_hash)
+                    self.assertEqual(repo.readdir('/'),
+                                     ['.', '..', 'a', 'b', 'd', 'l'])
+                    # the reference is not read again, if unchanged
+                    misses = ref_resolver.misses
+                    repo.readdir('/d')
+                    self.assertEqual(ref_resolver.misses, misses)
+            finally:
+                set_backend()
+
+    def test_ref_watcher(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the notification about changed references by
+        py_fuse_git_bare_fs.ref_watcher.
+
+        env python3 py_fuse_git_bare_fs_ref_resolver.py \
+          PyFuseGitBareFsRefResolver.test_ref_watcher
+        """
+        from py_fuse_git_bare_fs.ref_watcher import RefWatcher
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            watcher = RefWatcher()
+            generation = watcher.get_generation(src_dir)
+            if generation is None:
+                self.skipTest('inotify not available')
+                return
+            self.assertEqual(watcher.get_generation(src_dir), generation)
+            tree_hash = _git(['git', 'rev-parse', 'master^{tree}'], src_dir)
+            new_commit_hash = _git(
+                ['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                 'commit-tree', '-p', 'master', '-m', 'foo', tree_hash],
+                src_dir)
+            for cmd in [['git', 'branch', 'main', 'master'],
+                        # new subdirectory
+                        ['git', 'branch', 'feature/a', 'master'],
+                        ['git', 'update-ref', 'refs/heads/feature/a',
+                         new_commit_hash],
+                        ['git', 'pack-refs', '--all'],
+                        ['git', 'symbolic-ref', 'HEAD', 'refs/heads/main']]:
+                _git(cmd, src_dir)
+                new_generation = watcher.get_generation(src_dir)
+                self.assertGreater(new_generation, generation)
+                generation = new_generation
+            # other files are not relevant
+            _git(['git', 'config', 'foo.bar', 'baz'], src_dir)
+            self.assertEqual(watcher.get_generation(src_dir), generation)
+            # fallback to polling
+            self.assertIsNone(
+                RefWatcher(enabled=False).get_generation(src_dir))
+            self.assertIsNone(
+                RefWatcher(max_watches=2).get_generation(src_dir))
+
+    def test_replaced_repo(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test replaces a repository by another repository at the same
+        path and checks, that the reference is resolved again (a watched
+        repository gets a new generation, if it is watched again).
+
+        env python3 py_fuse_git_bare_fs_ref_resolver.py \
+          PyFuseGitBareFsRefResolver.test_replaced_repo
+        """
+        from py_fuse_git_bare_fs.ref_resolver import RefResolver
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame,
+                add_git=True)
+            src_dir = os.path.join(tmpdir, serverdir, reponame + '.git')
+            other_dir = os.path.join(tmpdir, serverdir, 'other.git')
+            _git(['git', 'clone', '-q', '--bare', src_dir, other_dir],
+                 tmpdir)
+            tree_hash = _git(['git', 'rev-parse', 'master^{tree}'],
+                             other_dir)
+            new_commit_hash = _git(
+                ['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                 'commit-tree', '-p', 'master', '-m', 'foo', tree_hash],
+                other_dir)
+            _git(['git', 'update-ref', 'refs/heads/master',
+                  new_commit_hash], other_dir)
+            resolver = RefResolver()
+            commit_hash = _git(['git', 'rev-parse', 'master'], src_dir)
+            self.assertEqual(resolver.resolve(src_dir, b'master'),
+                             commit_hash)
+            self.assertEqual(resolver.resolve(src_dir, b'master'),
+                             commit_hash)
+            shutil.rmtree(src_dir)
+            os.rename(other_dir, src_dir)
+            self.assertEqual(resolver.resolve(src_dir, b'master'),
+                             new_commit_hash)
+
+    def test_ref_check_window(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the freshness window
+        py_fuse_git_bare_fs.ref_resolver.RefCheckWindow and its use by
+        py_fuse_git_bare_fs.repo_class.
+
+        env python3 py_fuse_git_bare_fs_ref_resolver.py \
+          PyFuseGitBareFsRefResolver.test_ref_check_window
+        """
+        from py_fuse_git_bare_fs.ref_resolver import RefCheckWindow
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        # without interval every call checks
+        window = RefCheckWindow()
+        for i in range(3):
+            self.assertEqual(window.get(lambda i=i: i), i)
+        # within the interval the last result is used
+        window = RefCheckWindow(3600)
+        self.assertEqual(window.get(lambda: 'a'), 'a')
+        self.assertEqual(window.get(lambda: 'b'), 'a')
+        self.assertEqual(window.checks, 1)
+        # after the interval only one caller checks (single-flight)
+        window.invalidate()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_check():
+            started.set()
+            release.wait(30)
+            return 'c'
+        thread = threading.Thread(target=window.get, args=(slow_check,))
+        thread.start()
+        self.assertTrue(started.wait(30))
+        self.assertEqual(window.get(lambda: 'd'), 'a')
+        release.set()
+        thread.join()
+        self.assertEqual(window.get(lambda: 'e'), 'c')
+        self.assertEqual(window.checks, 2)
+        # RepoClass
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            commit_hash = _git(['git', 'rev-parse', 'master'], src_dir)
+            repo = RepoClass(src_dir, b'master', ref_check_interval=3600)
+            tree_hash = _git(['git', 'rev-parse', 'master:d'], src_dir)
+            new_commit_hash = _git(
+                ['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                 'commit-tree', '-p', 'master', '-m', 'foo', tree_hash],
+                src_dir)
+            _git(['git', 'update-ref', 'refs/heads/master', new_commit_hash],
+                 src_dir)
+            # the change is not seen within the interval
+            self.assertEqual(repo.readdir('/'),
+                             ['.', '..', 'a', 'b', 'd', 'l'])
+            self.assertEqual(repo.commit_hash, commit_hash)
+            # pylint: disable = protected-access
+            repo._ref_check.invalidate()
+            self.assertEqual(repo.readdir('/'),
+                             ['.', '..'] + _git(
+                                 ['git', 'ls-tree', '--name-only', 'master'],
+                                 src_dir).split())
+            self.assertEqual(repo.commit_hash, new_commit_hash)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
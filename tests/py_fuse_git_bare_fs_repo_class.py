@@ -1,7 +1,7 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2023-03-31
+:Date: 2023-03-31, 2026-10-18
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 
 tests the class RepoClass in the module py_fuse_git_bare_fs
@@ -112,6 +112,8 @@ class PyFuseGitBareFsRepoClass(
                 import fuse as fusepy
             with self.assertRaises(fusepy.FuseOSError):
                 file_status = repo.getattr('/foo')
+            with self.assertRaises(fusepy.FuseOSError):
+                file_status = repo.getattr('/foo/bar')
             # adapt data
             subprocess.run(
                 ['ln -s d/c foo; git add foo; git commit -m foo; git push'],
@@ -152,6 +154,293 @@ class PyFuseGitBareFsRepoClass(
             repo.release(filename, file_handler)
             self.assertEqual(data, b'abc..xyz\n')
 
+    def test_repo_class_lazy_tree(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test creates a repo, put some files in and
+        check how it is handled by py_fuse_git_bare_fs.repo_class
+        with the parameters lazy_tree and keep_subtrees.
+
+        env python3 py_fuse_git_bare_fs_repo_class.py \
+          PyFuseGitBareFsRepoClass.test_repo_class_lazy_tree
+
+        pytest-3 -k test_repo_class_lazy_tree py_fuse_git_bare_fs_repo_class.py
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.object_cache import blob_size_cache
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        try:
+            # pylint: disable = bad-option-value, import-outside-toplevel
+            import fusepy
+        except (ModuleNotFoundError, ImportError):
+            # pylint: disable = bad-option-value, import-outside-toplevel
+            import fuse as fusepy
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            for keep_subtrees in [False, True]:
+                blob_size_cache.clear()
+                repo = RepoClass(
+                    os.path.join(tmpdir, serverdir, reponame), b'master',
+                    lazy_tree=True, keep_subtrees=keep_subtrees)
+                # only the root directory is read
+                self.assertEqual(set(repo.tree.keys()), {'/'})
+                self.assertEqual(set(repo.readdir('/')),
+                                 {'.', '..', 'a', 'b', 'd', 'l'})
+                self.assertEqual(set(repo.tree.keys()), {'/'})
+                # the sizes of the files are read by readdir
+                self.assertEqual(
+                    blob_size_cache.get_many(
+                        [b'78981922613b2afb6025042ff6bd878ac1994e85',
+                         b'2e65efe2a145dda7ee51d1741299f848e5bf752e']),
+                    [2, 1])
+                self.assertEqual(repo.getattr('/d')['st_mode'], 16877)
+                file_status = repo.getattr('/d/c')
+                self.assertEqual(file_status['st_mode'], 33188)
+                self.assertEqual(file_status['st_size'], 4)
+                self.assertEqual(set(repo.readdir('/d')), {'.', '..', 'c'})
+                with self.assertRaises(fusepy.FuseOSError):
+                    repo.getattr('/d/foo')
+                with self.assertRaises(fusepy.FuseOSError):
+                    repo.getattr('/foo/bar')
+                with self.assertRaises(fusepy.FuseOSError):
+                    repo.getattr('/a/bar')
+                self.assertEqual(set(repo.readdir('/foo')), {'.', '..'})
+            # adapt data
+            subprocess.run(
+                ['mkdir e; echo xyz>e/f; git add e; '
+                 'git commit -m e; git push'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                shell=True, cwd=os.path.join(tmpdir, clientdir, reponame),
+                timeout=3, check=True)
+            # further tests: the unchanged directory d is kept
+            self.assertEqual(set(repo.readdir('/')),
+                             {'.', '..', 'a', 'b', 'd', 'e', 'l'})
+            self.assertEqual(set(repo.tree.keys()), {'/', '/d'})
+            self.assertEqual(set(repo.readdir('/d')), {'.', '..', 'c'})
+            # pylint: disable=protected-access
+            self.assertEqual(len(repo._old_tree_levels), 2)
+            file_handler = repo.open('/e/f', 'r')
+            data = repo.read('/e/f', None, 0, file_handler)
+            repo.release('/e/f', file_handler)
+            self.assertEqual(data, b'xyz\n')
+            file_handler = repo.open('/d/c', 'r')
+            data = repo.read('/d/c', None, 0, file_handler)
+            repo.release('/d/c', file_handler)
+            self.assertEqual(data, b'abc\n')
+            # an error of the backend does not keep the lock
+            repo = RepoClass(
+                os.path.join(tmpdir, serverdir, reponame), b'master',
+                lazy_tree=True)
+
+            def failing_get_tree_level(tree_hash):
+                raise OSError(tree_hash)
+            repo._get_tree_level = failing_get_tree_level
+            file_handler = repo.open('/a', 'r')
+            for method, args in [(repo.getattr, ('/d/c',)),
+                                 (repo.read, ('/d/c', 1, 0, file_handler))]:
+                with self.assertRaises(OSError):
+                    method(*args)
+                self.assertEqual(repo.lock.value, 0)
+            repo.release('/a', file_handler)
+            repo.lock.acquire_write()
+            repo.lock.release_write()
+
+    def _walk_repo(self, repo, path='/'):
+        """
+        :return: {path: (st_mode, st_size, content)} for all paths in repo
+        """
+        ret = {}
+        for name in repo.readdir(path):
+            if name in ['.', '..']:
+                continue
+            subpath = os.path.join(path, name)
+            file_status = repo.getattr(subpath)
+            content = None
+            if file_status['st_mode'] == 16877:
+                ret.update(self._walk_repo(repo, subpath))
+            else:
+                file_handler = repo.open(subpath, 'r')
+                content = repo.read(subpath, None, 0, file_handler)
+                repo.release(subpath, file_handler)
+            ret[subpath] = (
+                file_status['st_mode'], file_status['st_size'], content)
+        return ret
+
+    def test_repo_class_incremental_refresh(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test creates a repo, put some files in and change the repo
+        several times. The incrementally refreshed trees of
+        py_fuse_git_bare_fs.repo_class are compared to new instances.
+
+        env python3 py_fuse_git_bare_fs_repo_class.py \
+          PyFuseGitBareFsRepoClass.test_repo_class_incremental_refresh
+
+        pytest-3 -k test_repo_class_incremental_refresh \
+          py_fuse_git_bare_fs_repo_class.py
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            repos = [RepoClass(src_dir, b'master'),
+                     RepoClass(src_dir, b'master', lazy_tree=True),
+                     RepoClass(src_dir, b'master', lazy_tree=True,
+                               keep_subtrees=True)]
+            for repo in repos:
+                self._walk_repo(repo)
+            for cmd in [
+                    # new directories
+                    'mkdir -p e/f/g; echo 1>e/f/g/h; echo 2>e/i; git add e',
+                    # changed file in a subdirectory
+                    'echo 3>e/f/g/h; git add e',
+                    # file replaced by directory
+                    'git rm -q a; mkdir a; echo 4>a/j; git add a',
+                    # directory replaced by file and removed directory
+                    'git rm -q -r d e/f; echo 5>d; git add d',
+                    # submodule
+                    'git update-index --add --cacheinfo '
+                    '160000,78981922613b2afb6025042ff6bd878ac1994e85,a/sub',
+                    # directory replaced by submodule
+                    'git rm -q -r a; git update-index --add --cacheinfo '
+                    '160000,78981922613b2afb6025042ff6bd878ac1994e85,a']:
+                subprocess.run(
+                    [cmd + '; git commit -q -m foo; git push -q'],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                    shell=True, cwd=os.path.join(tmpdir, clientdir, reponame),
+                    timeout=3, check=True)
+                expected = self._walk_repo(RepoClass(src_dir, b'master'))
+                for repo in repos:
+                    self.assertEqual(self._walk_repo(repo), expected)
+                self.assertEqual(set(repos[0].tree.keys()),
+                                 {'/'} | {path for path, value in
+                                          expected.items()
+                                          if value[0] == 16877})
+                self.assertEqual(set(repos[0].tree.keys()),
+                                 set(repos[0].tree_hashes.keys()))
+
+    def test_repo_class_backends(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test compares the content of a repo provided by
+        py_fuse_git_bare_fs.repo_class using the different backends
+        selected by py_fuse_git_bare_fs.repotools.
+
+        env python3 py_fuse_git_bare_fs_repo_class.py \
+          PyFuseGitBareFsRepoClass.test_repo_class_backends
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.object_cache import \
+            blob_size_cache, tree_cache
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.repotools import get_backend, set_backend
+        backends = ['git', 'native']
+        try:
+            import dulwich  # pylint: disable = unused-import
+            backends.append('dulwich')
+        except (ModuleNotFoundError, ImportError):
+            pass
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            contents = []
+            try:
+                for backend in backends:
+                    set_backend(backend)
+                    self.assertEqual(get_backend(), backend)
+                    tree_cache.clear()
+                    blob_size_cache.clear()
+                    repo = RepoClass(src_dir, b'master')
+                    contents.append(self._walk_repo(repo))
+            finally:
+                set_backend()
+            for content in contents[1:]:
+                self.assertEqual(content, contents[0])
+            with self.assertRaises(ValueError):
+                set_backend('foo')
+
+    def test_repo_class_blob_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the content cache by the hash of the blobs
+        shared by several repositories (a repository and its fork).
+
+        env python3 py_fuse_git_bare_fs_repo_class.py \
+          PyFuseGitBareFsRepoClass.test_repo_class_blob_cache
+        """
+        # pylint: disable = bad-option-value, import-outside-toplevel
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            fork_dir = os.path.join(tmpdir, serverdir, 'fork')
+            subprocess.run(
+                ['git', 'clone', '-q', '--bare', src_dir, fork_dir],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                timeout=30, check=True)
+            cache = SimpleFileCache(min_file_size=0, maxage=3600)
+            repo = RepoClass(src_dir, b'master', cache=cache)
+            fork = RepoClass(fork_dir, b'master', cache=cache)
+            contents = [self._walk_repo(repo), self._walk_repo(fork)]
+            self.assertEqual(contents[0], contents[1])
+            # every blob is stored once for both repositories
+            blob_hashes = {blob['hash'].encode()
+                           for level in repo.tree.values()
+                           for blob in level['blobs'].values()}
+            self.assertEqual(set(cache.cache.keys()), blob_hashes)
+            cache_size = cache.actual_cache_size
+            self.assertEqual(
+                cache_size, sum(entry[2] for entry in cache.cache.values()))
+            # a changed file is read from the new blob
+            subprocess.run(
+                ['echo xyz>a; git add a; git commit -q -m foo; git push -q'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                shell=True, cwd=os.path.join(tmpdir, clientdir, reponame),
+                timeout=30, check=True)
+            file_handler = repo.open('/a', 'r')
+            self.assertEqual(repo.read('/a', None, 0, file_handler),
+                             b'xyz\n')
+            repo.release('/a', file_handler)
+            file_handler = fork.open('/a', 'r')
+            self.assertEqual(fork.read('/a', None, 0, file_handler),
+                             contents[1]['/a'][2])
+            fork.release('/a', file_handler)
+            self.assertEqual(len(cache.cache), len(blob_hashes) + 1)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -1,7 +1,7 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-10-12, 2023-04-04
+:Date: 2021-10-12, 2023-04-04, 2026-10-18
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 
 tests the tools in the module py_fuse_git_bare_fs.repotools_dulwich
@@ -19,7 +19,11 @@ Or you can run only one test, e. g.:
     PyFuseGitBareFsRepotoolsDulwich.test_repotools_dulwich_get_ref
 """
 
+import os
+import subprocess
+import tempfile
 import unittest
+import unittest.mock
 
 try:
     from .py_fuse_git_bare_fs_repotools_dulwich_git import \
@@ -112,6 +116,221 @@ class PyFuseGitBareFsRepotoolsDulwich(
         """
         self._test_get_tree('dulwich')
 
+    def test_get_tree_submodule(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This tests runs only if the python module dulwich is available.
+        It tests the tool/function get_tree from the module
+        py_fuse_git_bare_fs.repotools_dulwich for a submodule
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_dulwich.py \
+            PyFuseGitBareFsRepotoolsDulwich.test_get_tree_submodule
+        """
+        self._test_get_tree_submodule('dulwich')
+
+    def test_tree_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the cache of tree objects used by the function get_tree
+        from the module py_fuse_git_bare_fs.repotools_dulwich
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_dulwich.py \
+            PyFuseGitBareFsRepotoolsDulwich.test_tree_cache
+        """
+        self._test_tree_cache('dulwich')
+
+    def test_get_sizes_of_blobs(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_sizes_of_blobs from the module
+        py_fuse_git_bare_fs.repotools_dulwich
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_dulwich.py \
+            PyFuseGitBareFsRepotoolsDulwich.test_get_sizes_of_blobs
+        """
+        self._test_get_sizes_of_blobs('dulwich')
+
+    def test_dulwich_repo_registry(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This tests runs only if the python module dulwich is available.
+        It tests the registry of opened repositories from the module
+        py_fuse_git_bare_fs.repotools_dulwich
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_dulwich.py \
+            PyFuseGitBareFsRepotoolsDulwich.test_dulwich_repo_registry
+        """
+        # pylint: disable = unused-variable, unused-import
+        try:
+            import dulwich
+        except (ModuleNotFoundError, ImportError):
+            self.skipTest('python module dulwich not available')
+            return
+        from py_fuse_git_bare_fs.repotools_dulwich import \
+            dulwich_repo_registry, get_blob_data, get_ref
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            commit_hash = get_ref(src_dir, b'master')
+            with dulwich_repo_registry.repo_locked(src_dir) as repo1:
+                pass
+            with dulwich_repo_registry.repo_locked(src_dir) as repo2:
+                pass
+            self.assertIs(repo1, repo2)  # the repository is reused
+            # after packing the repository is opened again
+            subprocess.run(
+                ['git gc'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                shell=True, cwd=src_dir, timeout=3, check=True)
+            self.assertEqual(get_ref(src_dir, b'master'), commit_hash)
+            with dulwich_repo_registry.repo_locked(src_dir) as repo3:
+                pass
+            self.assertIsNot(repo1, repo3)
+            self.assertEqual(
+                get_blob_data(src_dir,
+                              b'78981922613b2afb6025042ff6bd878ac1994e85'),
+                b'78981922613b2afb6025042ff6bd878ac1994e85 blob 2\na\n\n')
+            dulwich_repo_registry.remove(src_dir)
+
+    def test_sizes_from_headers(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This tests runs only if the python module dulwich is available.
+        It tests, that the sizes of blobs are read by
+        py_fuse_git_bare_fs.repotools_dulwich without inflating the
+        blobs and that readdir of py_fuse_git_bare_fs.repo_class only
+        reads the sizes not cached yet.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_dulwich.py \
+            PyFuseGitBareFsRepotoolsDulwich.test_sizes_from_headers
+        """
+        # pylint: disable = unused-variable, unused-import
+        try:
+            import dulwich
+        except (ModuleNotFoundError, ImportError):
+            self.skipTest('python module dulwich not available')
+            return
+        from py_fuse_git_bare_fs.object_cache import blob_size_cache
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.repotools import set_backend
+        from py_fuse_git_bare_fs.repotools_dulwich import \
+            dulwich_repo_registry, get_size_of_blob, get_sizes_of_blobs
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        blob_hashes = [b'78981922613b2afb6025042ff6bd878ac1994e85',
+                       b'2e65efe2a145dda7ee51d1741299f848e5bf752e',
+                       b'61780798228d17af2d34fce4cfbdf35556832472']
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            for packed in [False, True]:
+                if packed:
+                    subprocess.run(
+                        ['git', 'gc', '-q'],
+                        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                        cwd=src_dir, timeout=30, check=True)
+                blob_size_cache.clear()
+                with unittest.mock.patch.object(
+                        dulwich.repo.Repo, 'get_object',
+                        side_effect=AssertionError('inflated')):
+                    self.assertEqual(
+                        get_sizes_of_blobs(src_dir, blob_hashes), [2, 1, 2])
+                    blob_size_cache.clear()
+                    self.assertEqual(
+                        get_size_of_blob(src_dir, blob_hashes[2]), 2)
+            try:
+                set_backend('dulwich')
+                repo = RepoClass(src_dir, b'master')
+                blob_size_cache.clear()
+                with unittest.mock.patch(
+                        'py_fuse_git_bare_fs.repo_class.get_sizes_of_blobs',
+                        wraps=get_sizes_of_blobs) as read_sizes:
+                    repo.readdir('/')
+                    self.assertEqual(read_sizes.call_count, 1)
+                    repo.readdir('/')
+                    self.assertEqual(read_sizes.call_count, 1)
+            finally:
+                set_backend()
+            dulwich_repo_registry.remove(src_dir)
+
+    def test_legacy_modes(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This tests runs only if the python module dulwich is available.
+        It tests, that the module py_fuse_git_bare_fs.repotools_dulwich
+        gives the same modes as py_fuse_git_bare_fs.repotools_git for
+        modes stored by old versions of git.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_dulwich.py \
+            PyFuseGitBareFsRepotoolsDulwich.test_legacy_modes
+        """
+        # pylint: disable = unused-variable, unused-import
+        try:
+            import dulwich
+        except (ModuleNotFoundError, ImportError):
+            self.skipTest('python module dulwich not available')
+            return
+        from py_fuse_git_bare_fs.object_cache import tree_cache
+        from py_fuse_git_bare_fs.repotools_dulwich import \
+            dulwich_repo_registry, get_tree_level
+
+        def git(cmd, src_dir, stdin=None):
+            return subprocess.run(
+                cmd, input=stdin, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, cwd=src_dir, timeout=3,
+                check=True).stdout.strip()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            blob_hash = git(['git', 'hash-object', '-w', '--stdin'],
+                            src_dir, stdin=b'a\n')
+            tree_data = b''.join(
+                mode + b' ' + name + b'\0' + bytes.fromhex(blob_hash.decode())
+                for mode, name in [(b'100664', b'a'), (b'100775', b'b'),
+                                   (b'100755', b'c')])
+            tree_hash = git(['git', 'hash-object', '-t', 'tree', '-w',
+                             '--literally', '--stdin'],
+                            src_dir, stdin=tree_data).decode()
+            tree_cache.clear()
+            level = get_tree_level(src_dir, tree_hash)
+            self.assertEqual(
+                {name: blob['mode'] for name, blob in level['blobs'].items()},
+                {'a': '100644', 'b': '100755', 'c': '100755'})
+            tree_cache.clear()
+            dulwich_repo_registry.remove(src_dir)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
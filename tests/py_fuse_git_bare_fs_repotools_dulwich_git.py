@@ -1,11 +1,12 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2023-04-04
+:Date: 2023-04-04, 2026-10-18
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 """
 
 import os
+import subprocess
 import tempfile
 
 try:
@@ -46,6 +47,8 @@ class PyFuseGitBareFsRepotoolsDulwichGitMixIn(PrepareSimpleTestEnvironment):
             from py_fuse_git_bare_fs.repotools_dulwich import get_ref
         elif backend == 'git':
             from py_fuse_git_bare_fs.repotools_git import get_ref
+        elif backend == 'native':
+            from py_fuse_git_bare_fs.repotools_native import get_ref
         serverdir = 'server'
         clientdir = 'client'
         mountpointdir = 'mountpoint'
@@ -90,6 +93,9 @@ class PyFuseGitBareFsRepotoolsDulwichGitMixIn(PrepareSimpleTestEnvironment):
         elif backend == 'git':
             import re
             from py_fuse_git_bare_fs.repotools_git import get_blob_data
+        elif backend == 'native':
+            import re
+            from py_fuse_git_bare_fs.repotools_native import get_blob_data
         serverdir = 'server'
         clientdir = 'client'
         mountpointdir = 'mountpoint'
@@ -137,6 +143,10 @@ class PyFuseGitBareFsRepotoolsDulwichGitMixIn(PrepareSimpleTestEnvironment):
             import re
             import time
             from py_fuse_git_bare_fs.repotools_git import get_repo_data
+        elif backend == 'native':
+            import re
+            import time
+            from py_fuse_git_bare_fs.repotools_native import get_repo_data
         serverdir = 'server'
         clientdir = 'client'
         mountpointdir = 'mountpoint'
@@ -188,6 +198,8 @@ class PyFuseGitBareFsRepotoolsDulwichGitMixIn(PrepareSimpleTestEnvironment):
             from py_fuse_git_bare_fs.repotools_dulwich import get_size_of_blob
         elif backend == 'git':
             from py_fuse_git_bare_fs.repotools_git import get_size_of_blob
+        elif backend == 'native':
+            from py_fuse_git_bare_fs.repotools_native import get_size_of_blob
         serverdir = 'server'
         clientdir = 'client'
         mountpointdir = 'mountpoint'
@@ -230,6 +242,9 @@ class PyFuseGitBareFsRepotoolsDulwichGitMixIn(PrepareSimpleTestEnvironment):
         elif backend == 'git':
             import re
             from py_fuse_git_bare_fs.repotools_git import get_tree
+        elif backend == 'native':
+            import re
+            from py_fuse_git_bare_fs.repotools_native import get_tree
         serverdir = 'server'
         clientdir = 'client'
         mountpointdir = 'mountpoint'
@@ -271,3 +286,185 @@ class PyFuseGitBareFsRepotoolsDulwichGitMixIn(PrepareSimpleTestEnvironment):
                                  hashstr)
                 self.assertEqual(tree['/']['blobs'][filename]['mode'],
                                  mode)
+
+    def _test_get_tree_submodule(self, backend):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_tree from the module
+        py_fuse_git_bare_fs.repotools_dulwich or from the module
+        py_fuse_git_bare_fs.repotools_git depending on the choosen backend
+        for a tree with a submodule (gitlink).
+
+        It is used from `py_fuse_git_bare_fs_repotools_dulwich.py` and from
+        `py_fuse_git_bare_fs_repotools_git.py`.
+        """
+        if backend == 'dulwich':
+            # pylint: disable = unused-variable, unused-import
+            try:
+                import dulwich
+            except (ModuleNotFoundError, ImportError):
+                self.skipTest('python module dulwich not available')
+                return
+            import re
+            from py_fuse_git_bare_fs.repotools_dulwich import \
+                get_repo_data, get_tree
+        elif backend == 'git':
+            import re
+            from py_fuse_git_bare_fs.repotools_git import \
+                get_repo_data, get_tree
+        elif backend == 'native':
+            import re
+            from py_fuse_git_bare_fs.repotools_native import \
+                get_repo_data, get_tree
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            subprocess.run(
+                ['git update-index --add --cacheinfo '
+                 '160000,78981922613b2afb6025042ff6bd878ac1994e85,d/sub; '
+                 'git commit -m sub; git push'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                shell=True, cwd=os.path.join(tmpdir, clientdir, reponame),
+                timeout=3, check=True)
+            # run tests
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            tree = get_tree(
+                src_dir,
+                get_repo_data(src_dir, b'master',
+                              re.compile(r' ([0-9]+) [0-9+-]+$'))[1],
+                re.compile(
+                    r'^([0-9]+) (commit|tree|blob|tag) ([0-9a-f]+)\t(.+)$'))
+            self.assertEqual(set(tree.keys()), {'/', '/d', '/d/sub'})
+            self.assertEqual(set(tree['/d']['listdir']), {'c', 'sub'})
+            self.assertEqual(set(tree['/d']['blobs'].keys()), {'c'})
+            self.assertEqual(tree['/d/sub']['listdir'], [])
+            self.assertEqual(tree['/d/sub']['blobs'], {})
+
+    def _test_tree_cache(self, backend):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the usage of the process-wide cache tree_cache from the
+        module py_fuse_git_bare_fs.object_cache by the tool/function get_tree
+        from the module py_fuse_git_bare_fs.repotools_dulwich or from the
+        module py_fuse_git_bare_fs.repotools_git depending on the choosen
+        backend: The parsed tree objects are shared between a repository
+        and its fork.
+
+        It is used from `py_fuse_git_bare_fs_repotools_dulwich.py` and from
+        `py_fuse_git_bare_fs_repotools_git.py`.
+        """
+        if backend == 'dulwich':
+            # pylint: disable = unused-variable, unused-import
+            try:
+                import dulwich
+            except (ModuleNotFoundError, ImportError):
+                self.skipTest('python module dulwich not available')
+                return
+            from py_fuse_git_bare_fs.repotools_dulwich import \
+                get_size_of_blob, get_tree
+        elif backend == 'git':
+            from py_fuse_git_bare_fs.repotools_git import \
+                get_size_of_blob, get_tree
+        elif backend == 'native':
+            from py_fuse_git_bare_fs.repotools_native import \
+                get_size_of_blob, get_tree
+        from py_fuse_git_bare_fs.object_cache import tree_cache
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            fork_dir = os.path.join(tmpdir, serverdir, 'fork')
+            subprocess.run(
+                ['git', 'clone', '--bare', '-q', src_dir, fork_dir],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                timeout=3, check=True)
+            # run tests
+            tree_cache.clear()
+            tree = get_tree(
+                src_dir, 'b213332fda65de4d2848a98e01f43d689cccbe6d')
+            self.assertEqual(len(tree_cache), 2)
+            misses = tree_cache.misses
+            fork_tree = get_tree(
+                fork_dir, 'b213332fda65de4d2848a98e01f43d689cccbe6d')
+            self.assertEqual(tree_cache.misses, misses)
+            self.assertGreaterEqual(tree_cache.hits, 2)
+            for path in ['/', '/d']:
+                self.assertIs(tree[path]['blobs'], fork_tree[path]['blobs'])
+            self.assertEqual(
+                set(tree['/']['blobs']['l'].keys()), {'hash', 'mode'})
+            self.assertEqual(
+                get_size_of_blob(fork_dir,
+                                 b'2e65efe2a145dda7ee51d1741299f848e5bf752e'),
+                1)
+            # a missing repository is detected in spite of the cache
+            with self.assertRaises(FileNotFoundError):
+                get_tree(os.path.join(tmpdir, 'foo'),
+                         'b213332fda65de4d2848a98e01f43d689cccbe6d')
+            with self.assertRaises(FileNotFoundError):
+                get_size_of_blob(os.path.join(tmpdir, 'foo'),
+                                 b'2e65efe2a145dda7ee51d1741299f848e5bf752e')
+
+    def _test_get_sizes_of_blobs(self, backend):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_sizes_of_blobs from the module
+        py_fuse_git_bare_fs.repotools_dulwich or from the module
+        py_fuse_git_bare_fs.repotools_git depending on the choosen backend.
+
+        It is used from `py_fuse_git_bare_fs_repotools_dulwich.py` and from
+        `py_fuse_git_bare_fs_repotools_git.py`.
+        """
+        if backend == 'dulwich':
+            # pylint: disable = unused-variable, unused-import
+            try:
+                import dulwich
+            except (ModuleNotFoundError, ImportError):
+                self.skipTest('python module dulwich not available')
+                return
+            from py_fuse_git_bare_fs.repotools_dulwich import \
+                get_sizes_of_blobs
+        elif backend == 'git':
+            from py_fuse_git_bare_fs.repotools_git import get_sizes_of_blobs
+        elif backend == 'native':
+            from py_fuse_git_bare_fs.repotools_native import get_sizes_of_blobs
+        from py_fuse_git_bare_fs.object_cache import blob_size_cache
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        blob_hashes = [b'78981922613b2afb6025042ff6bd878ac1994e85',
+                       b'2e65efe2a145dda7ee51d1741299f848e5bf752e',
+                       b'61780798228d17af2d34fce4cfbdf35556832472']
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(FileNotFoundError):
+                get_sizes_of_blobs(
+                    os.path.join(tmpdir, serverdir, reponame), blob_hashes)
+            # prepare test environment
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            # run tests
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            blob_size_cache.clear()
+            self.assertEqual(get_sizes_of_blobs(src_dir, blob_hashes[:1]),
+                             [2])
+            self.assertEqual(get_sizes_of_blobs(src_dir, blob_hashes),
+                             [2, 1, 2])
+            self.assertEqual(blob_size_cache.hits, 1)
+            self.assertEqual(len(blob_size_cache), 3)
+            self.assertEqual(get_sizes_of_blobs(src_dir, []), [])
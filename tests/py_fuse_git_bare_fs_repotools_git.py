@@ -1,7 +1,7 @@
 """
 :Author: Daniel Mohr
 :Email: daniel.mohr@dlr.de
-:Date: 2021-10-12, 2023-04-04
+:Date: 2021-10-12, 2023-04-04, 2026-10-18
 :License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
 
 tests the tools in the module py_fuse_git_bare_fs.repotools_git
@@ -16,6 +16,8 @@ Or you can run only one test, e. g.:
     PyFuseGitBareFsRepotoolsGit.test_repotools_git_get_ref
 """
 
+import os
+import tempfile
 import unittest
 
 try:
@@ -104,6 +106,302 @@ class PyFuseGitBareFsRepotoolsGit(
         """
         self._test_get_tree('git')
 
+    def test_get_tree_submodule(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_tree from the module
+        py_fuse_git_bare_fs.repotools_git for a submodule
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_get_tree_submodule
+        """
+        self._test_get_tree_submodule('git')
+
+    def test_tree_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the cache of tree objects used by the function get_tree
+        from the module py_fuse_git_bare_fs.repotools_git
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_tree_cache
+        """
+        self._test_tree_cache('git')
+
+    def test_get_sizes_of_blobs(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_sizes_of_blobs from the module
+        py_fuse_git_bare_fs.repotools_git
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_get_sizes_of_blobs
+        """
+        self._test_get_sizes_of_blobs('git')
+
+    def test_git_cat_file_pool(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the long-lived coprocesses from the module
+        py_fuse_git_bare_fs.git_cat_file_pool used by
+        py_fuse_git_bare_fs.repotools_git
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_git_cat_file_pool
+        """
+        import subprocess
+        from py_fuse_git_bare_fs.git_cat_file_pool import \
+            GitCatFileProcess, git_cat_file_pool
+        from py_fuse_git_bare_fs.repotools_git import \
+            get_blob_data, get_ref, get_size_of_blob
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            commit_hash = get_ref(src_dir, b'master')
+            blob_data = get_blob_data(
+                src_dir, b'78981922613b2afb6025042ff6bd878ac1994e85')
+            # pipelined requests
+            process = git_cat_file_pool.get(src_dir, 'info')
+            prefix = b''
+            if process.batch_option == '--batch-command':
+                prefix = b'info '
+            headers = process.request(
+                [prefix + b'master', prefix + b'main',
+                 prefix + b'78981922613b2afb6025042ff6bd878ac1994e85'])
+            self.assertEqual(len(headers), 3)
+            self.assertTrue(headers[0][0].startswith(commit_hash.encode()))
+            self.assertEqual(headers[1][0], b'main missing\n')
+            self.assertEqual(
+                headers[2][0],
+                b'78981922613b2afb6025042ff6bd878ac1994e85 blob 2\n')
+            # the coprocesses are restarted, if they die
+            for channel in ['contents', 'info']:
+                process = git_cat_file_pool.get(src_dir, channel)
+                process.process.kill()
+                process.process.wait()
+            self.assertEqual(get_ref(src_dir, b'master'), commit_hash)
+            self.assertEqual(
+                get_size_of_blob(src_dir,
+                                 b'78981922613b2afb6025042ff6bd878ac1994e85'),
+                2)
+            self.assertEqual(
+                get_blob_data(src_dir,
+                              b'78981922613b2afb6025042ff6bd878ac1994e85'),
+                blob_data)
+            self.assertEqual(
+                blob_data,
+                b'78981922613b2afb6025042ff6bd878ac1994e85 blob 2\na\n\n')
+            # a name with a newline can not inject another request
+            process = git_cat_file_pool.get(src_dir, 'contents')
+            with self.assertRaises(ValueError):
+                process.request(
+                    [b'main\n78981922613b2afb6025042ff6bd878ac1994e85'])
+            with self.assertRaises(ValueError):
+                get_ref(src_dir, b'main\nmaster')
+            self.assertEqual(get_ref(src_dir, b'master'), commit_hash)
+            git_cat_file_pool.remove(src_dir)
+            # a hanging coprocess is killed after the timeout
+            process = GitCatFileProcess(src_dir, '--batch', timeout=0.5)
+            cmd = process.cmd
+            process.cmd = ['sh', '-c', 'cat >/dev/null']
+            with self.assertRaises(subprocess.TimeoutExpired):
+                process.request([b'master'])
+            self.assertIsNone(process.process)
+            # the next request starts a new coprocess
+            process.cmd = cmd
+            self.assertEqual(
+                process.request(
+                    [b'78981922613b2afb6025042ff6bd878ac1994e85'])[0][1],
+                b'a\n')
+            process.close()
+
+    def test_get_tree_ls_tree(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_tree from the module
+        py_fuse_git_bare_fs.repotools_git reading the complete tree by
+        "git ls-tree" (not cached tree) compared to reading the cached
+        tree objects.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_get_tree_ls_tree
+        """
+        import subprocess
+        from py_fuse_git_bare_fs.object_cache import \
+            blob_size_cache, tree_cache
+        from py_fuse_git_bare_fs.repotools_git import get_tree
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            subprocess.run(
+                ['mkdir -p e/f; echo xyz>e/f/g; git add e; '
+                 'git update-index --add --cacheinfo '
+                 '160000,78981922613b2afb6025042ff6bd878ac1994e85,d/sub; '
+                 'git commit -m e; git push'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                shell=True, cwd=os.path.join(tmpdir, clientdir, reponame),
+                timeout=3, check=True)
+            cpi = subprocess.run(
+                ['git', 'rev-parse', 'master^{tree}'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=src_dir, timeout=3, check=True)
+            tree_hash = cpi.stdout.decode().strip()
+            tree_cache.clear()
+            blob_size_cache.clear()
+            tree_hashes = {}
+            tree = get_tree(src_dir, tree_hash, tree_hashes=tree_hashes)
+            self.assertEqual(len(tree_cache), 4)
+            self.assertEqual(tree_cache.hits, 0)
+            # the sizes of the blobs are read at once
+            self.assertEqual(len(blob_size_cache), 5)
+            self.assertEqual(
+                blob_size_cache.get(
+                    b'2e65efe2a145dda7ee51d1741299f848e5bf752e'), 1)
+            # read the cached tree objects
+            cached_tree_hashes = {}
+            cached_tree = get_tree(src_dir, tree_hash,
+                                   tree_hashes=cached_tree_hashes)
+            self.assertGreater(tree_cache.hits, 0)
+            self.assertEqual(tree, cached_tree)
+            self.assertEqual(tree_hashes, cached_tree_hashes)
+            self.assertEqual(set(tree.keys()),
+                             {'/', '/d', '/d/sub', '/e', '/e/f'})
+            self.assertEqual(tree['/e']['listdir'], ['f'])
+            self.assertEqual(tree['/e']['blobs'], {})
+            self.assertEqual(tree['/d']['listdir'], ['c', 'sub'])
+            self.assertEqual(tree['/d/sub'], {'listdir': [], 'blobs': {}})
+            self.assertIsNone(tree_hashes['/d/sub'])
+            self.assertEqual(tree_hashes['/'], tree_hash)
+
+    def test_read_nul_records(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the streaming of the output of "git ls-tree" in the module
+        py_fuse_git_bare_fs.repotools_git: records split over several
+        reads, a stalled command and a failing command.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_read_nul_records
+        """
+        import subprocess
+        import time
+        # pylint: disable=protected-access
+        from py_fuse_git_bare_fs.repotools_git import _read_nul_records
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # records split over several reads
+            self.assertEqual(
+                list(_read_nul_records(
+                    ['sh', '-c',
+                     'printf "ab"; sleep 0.2; printf "c\\0d\\0"; '
+                     'sleep 0.2; printf "e"'],
+                    tmpdir, 3)),
+                [b'abc', b'd', b'e'])
+            # a stalled command is killed
+            records = []
+            start = time.time()
+            with self.assertRaises(subprocess.TimeoutExpired):
+                for record in _read_nul_records(
+                        ['sh', '-c', 'printf "a\\0"; exec sleep 30'],
+                        tmpdir, 0.5):
+                    records.append(record)
+            self.assertEqual(records, [b'a'])
+            self.assertLess(time.time() - start, 10)
+            # a failing command
+            with self.assertRaises(subprocess.CalledProcessError):
+                list(_read_nul_records(
+                    ['git', 'ls-tree', '-r', '-t', '-l', '-z', 'master'],
+                    tmpdir, 3))
+
+    def test_legacy_modes(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests, that the functions get_tree_level and get_tree from the
+        module py_fuse_git_bare_fs.repotools_git give the canonical modes
+        (like "git cat-file -p") for modes stored by old versions of git.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_git.py \
+            PyFuseGitBareFsRepotoolsGit.test_legacy_modes
+        """
+        import subprocess
+        from py_fuse_git_bare_fs.object_cache import tree_cache
+        from py_fuse_git_bare_fs.repotools_git import \
+            canon_mode, get_tree, get_tree_level
+
+        def git(cmd, src_dir, stdin=None):
+            return subprocess.run(
+                cmd, input=stdin, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, cwd=src_dir, timeout=3,
+                check=True).stdout.strip()
+        self.assertEqual(
+            [canon_mode(mode) for mode in
+             ['100664', '100775', '100600', '100744', '040000', '40000',
+              '120000', '160000', '100644', '100755']],
+            ['100644', '100755', '100644', '100755', '40000', '40000',
+             '120000', '160000', '100644', '100755'])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            blob_hash = git(['git', 'hash-object', '-w', '--stdin'],
+                            src_dir, stdin=b'a\n')
+            subtree_hash = git(['git', 'mktree'], src_dir,
+                               stdin=b'100644 blob ' + blob_hash + b'\tc\n')
+            entries = [(b'100664', b'a', blob_hash),
+                       (b'100775', b'b', blob_hash),
+                       (b'40000', b'd', subtree_hash)]
+            tree_data = b''.join(
+                mode + b' ' + name + b'\0' + bytes.fromhex(obj.decode())
+                for mode, name, obj in entries)
+            tree_hash = git(['git', 'hash-object', '-t', 'tree', '-w',
+                             '--literally', '--stdin'],
+                            src_dir, stdin=tree_data).decode()
+            tree_cache.clear()
+            level = get_tree_level(src_dir, tree_hash)
+            self.assertEqual(level['blobs']['a']['mode'], '100644')
+            self.assertEqual(level['blobs']['b']['mode'], '100755')
+            self.assertEqual(level['trees'], {'d': subtree_hash.decode()})
+            # "git ls-tree" (not cached tree) gives the same modes
+            tree_cache.clear()
+            tree = get_tree(src_dir, tree_hash)
+            self.assertEqual(tree['/']['blobs'], level['blobs'])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
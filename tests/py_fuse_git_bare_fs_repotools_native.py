@@ -0,0 +1,417 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+tests the tools in the module py_fuse_git_bare_fs.repotools_native
+
+You can run this file directly:
+
+  env python3 py_fuse_git_bare_fs_repotools_native.py
+
+Or you can run only one test, e. g.:
+
+  env python3 py_fuse_git_bare_fs_repotools_native.py \
+    PyFuseGitBareFsRepotoolsNative.test_repotools_native_get_ref
+"""
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+try:
+    from .py_fuse_git_bare_fs_repotools_dulwich_git import \
+        PyFuseGitBareFsRepotoolsDulwichGitMixIn
+except (ModuleNotFoundError, ImportError):
+    from py_fuse_git_bare_fs_repotools_dulwich_git import \
+        PyFuseGitBareFsRepotoolsDulwichGitMixIn
+
+
+def _git(cmd, cwd, stdin=None):
+    return subprocess.run(
+        cmd, input=stdin,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, timeout=30, check=True).stdout
+
+
+def _git_objects(src_dir):
+    """
+    :return: dict {hash: (type, data)} of all objects read by git
+    """
+    objects = {}
+    for line in _git(['git', 'cat-file', '--batch-all-objects',
+                      '--batch-check'], src_dir).splitlines():
+        obj_hash, obj_type, _ = line.split()
+        objects[obj_hash] = (
+            obj_type,
+            _git(['git', 'cat-file', obj_type.decode(), obj_hash], src_dir))
+    return objects
+
+
+class PyFuseGitBareFsRepotoolsNative(
+        unittest.TestCase, PyFuseGitBareFsRepotoolsDulwichGitMixIn):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+
+    def test_get_ref(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_ref from the module
+        py_fuse_git_bare_fs.repotools_native
+        """
+        self._test_get_ref('native')
+
+    def test_get_blob_data(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_blob_data from the module
+        py_fuse_git_bare_fs.repotools_native
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_repotools_native_get_blob_data
+        """
+        self._test_get_blob_data('native')
+
+    def test_get_repo_data(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_repo_data from the module
+        py_fuse_git_bare_fs.repotools_native
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_repotools_native_get_repo_data
+        """
+        self._test_get_repo_data('native')
+
+    def test_get_size_of_blob(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_size_of_blob from the module
+        py_fuse_git_bare_fs.repotools_native
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_get_size_of_blob
+        """
+        self._test_get_size_of_blob('native')
+
+    def test_get_tree(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_tree from the module
+        py_fuse_git_bare_fs.repotools_native
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_get_tree
+        """
+        self._test_get_tree('native')
+
+    def test_get_tree_submodule(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_tree from the module
+        py_fuse_git_bare_fs.repotools_native for a submodule
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_get_tree_submodule
+        """
+        self._test_get_tree_submodule('native')
+
+    def test_tree_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the cache of tree objects used by the function get_tree
+        from the module py_fuse_git_bare_fs.repotools_native
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_tree_cache
+        """
+        self._test_tree_cache('native')
+
+    def test_get_sizes_of_blobs(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the tool/function get_sizes_of_blobs from the module
+        py_fuse_git_bare_fs.repotools_native
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_get_sizes_of_blobs
+        """
+        self._test_get_sizes_of_blobs('native')
+
+    def test_native_object_store(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the module py_fuse_git_bare_fs.native_object_store:
+        loose objects, packs with deltas (OBJ_OFS_DELTA and OBJ_REF_DELTA)
+        and the multi-pack-index are compared to the output of git.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_native_object_store
+        """
+        from py_fuse_git_bare_fs.native_object_store import \
+            NativeObjectStore
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _git(['git', 'init', '-q', tmpdir], tmpdir)
+            data = os.urandom(65536)
+            for i in range(3):
+                with open(os.path.join(tmpdir, 'f'), 'wb') as fd:
+                    fd.write(data + i * b'x')
+                with open(os.path.join(tmpdir, 'g'), 'w',
+                          encoding='utf-8') as fd:
+                    fd.write(i * 'foo\n')
+                _git(['git', 'add', 'f', 'g'], tmpdir)
+                _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                      'commit', '-q', '-m', str(i)], tmpdir)
+            objects = _git_objects(tmpdir)
+            objects_dir = os.path.join(tmpdir, '.git', 'objects')
+            # loose objects, pack with OBJ_OFS_DELTA, pack with OBJ_REF_DELTA
+            for repack in [
+                    [],
+                    ['git', 'repack', '-q', '-a', '-d', '-f'],
+                    ['git', '-c', 'repack.useDeltaBaseOffset=false',
+                     'repack', '-q', '-a', '-d', '-f'],
+                    ['git', 'multi-pack-index', 'write']]:
+                if repack:
+                    _git(repack, tmpdir)
+                store = NativeObjectStore(objects_dir)
+                for obj_hash, (obj_type, obj_data) in objects.items():
+                    sha = bytes.fromhex(obj_hash.decode())
+                    self.assertEqual(store.get_object(sha),
+                                     (obj_type, obj_data))
+                    self.assertEqual(store.get_size(sha), len(obj_data))
+                with self.assertRaises(KeyError):
+                    store.get_object(20 * b'\0')
+            self.assertIsNotNone(store.midx)
+            self.assertEqual(store.indexes, [])
+
+    def test_native_repack(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the detection of a repack by the tools/functions from
+        the module py_fuse_git_bare_fs.repotools_native.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_native_repack
+        """
+        import re
+        from py_fuse_git_bare_fs.native_object_store import \
+            native_object_store_registry
+        from py_fuse_git_bare_fs.repotools_native import \
+            get_blob_data, get_ref, get_repo_data
+        serverdir = 'server'
+        clientdir = 'client'
+        mountpointdir = 'mountpoint'
+        reponame = 'repo1'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._prepare_simple_test_environment1(
+                tmpdir, serverdir, clientdir, mountpointdir, reponame)
+            src_dir = os.path.join(tmpdir, serverdir, reponame)
+            clientpath = os.path.join(tmpdir, clientdir, reponame)
+            commit_hash = get_ref(src_dir, b'master')
+            store = native_object_store_registry.get(src_dir)
+            # new objects are pushed and the repository is repacked
+            with open(os.path.join(clientpath, 'new'), 'w',
+                      encoding='utf-8') as fd:
+                fd.write('new\n')
+            _git(['git', 'add', 'new'], clientpath)
+            _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                  'commit', '-q', '-m', 'new'], clientpath)
+            _git(['git', 'push', '-q'], clientpath)
+            _git(['git', 'repack', '-q', '-a', '-d'], src_dir)
+            _git(['git', 'pack-refs', '--all'], src_dir)
+            new_commit_hash = get_ref(src_dir, b'master')
+            self.assertNotEqual(new_commit_hash, commit_hash)
+            repo_data = get_repo_data(
+                src_dir, b'master', re.compile(r' ([0-9]+) [0-9+-]+$'))
+            self.assertEqual(repo_data[0], new_commit_hash)
+            self.assertEqual(
+                get_blob_data(src_dir,
+                              b'3e757656cf36eca53338e520d134963a44f793f8'),
+                b'3e757656cf36eca53338e520d134963a44f793f8 blob 4\n'
+                b'new\n\n')
+            self.assertGreaterEqual(store.reloads, 1)
+            self.assertEqual(
+                get_blob_data(src_dir, 40 * b'0'), 40 * b'0' + b' missing\n')
+            # the pack is removed after its index was read
+            native_object_store_registry.remove(src_dir)
+            store = native_object_store_registry.get(src_dir)
+            with open(os.path.join(clientpath, 'new2'), 'w',
+                      encoding='utf-8') as fd:
+                fd.write('new2\n')
+            _git(['git', 'add', 'new2'], clientpath)
+            _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                  'commit', '-q', '-m', 'new2'], clientpath)
+            _git(['git', 'push', '-q'], clientpath)
+            _git(['git', 'repack', '-q', '-a', '-d'], src_dir)
+            self.assertEqual(
+                store.get_object(bytes.fromhex(
+                    '3e757656cf36eca53338e520d134963a44f793f8')),
+                (b'blob', b'new\n'))
+            self.assertEqual(store.reloads, 1)
+            # annotated tag
+            _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                  'tag', '-a', '-m', 'tag', 'v1', commit_hash], src_dir)
+            self.assertEqual(
+                get_repo_data(src_dir, b'v1',
+                              re.compile(r' ([0-9]+) [0-9+-]+$'))[0],
+                commit_hash)
+            native_object_store_registry.remove(src_dir)
+
+    def test_legacy_modes(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests, that the module py_fuse_git_bare_fs.repotools_native
+        gives the canonical modes (like "git cat-file -p") for modes
+        stored by old versions of git.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_legacy_modes
+        """
+        from py_fuse_git_bare_fs.native_object_store import \
+            native_object_store_registry
+        from py_fuse_git_bare_fs.object_cache import tree_cache
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        from py_fuse_git_bare_fs.repotools import set_backend
+        from py_fuse_git_bare_fs.repotools_native import \
+            get_tree, get_tree_level
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            blob_hash = _git(['git', 'hash-object', '-w', '--stdin'],
+                             src_dir, stdin=b'a\n').strip()
+            subtree_hash = _git(
+                ['git', 'mktree'], src_dir,
+                stdin=b'100644 blob ' + blob_hash + b'\tc\n').strip()
+            entries = [(b'100664', b'a', blob_hash),
+                       (b'100775', b'b', blob_hash),
+                       (b'40000', b'd', subtree_hash)]
+            tree_data = b''.join(
+                mode + b' ' + name + b'\0' + bytes.fromhex(obj.decode())
+                for mode, name, obj in entries)
+            tree_hash = _git(['git', 'hash-object', '-t', 'tree', '-w',
+                              '--literally', '--stdin'],
+                             src_dir, stdin=tree_data).strip()
+            commit_hash = _git(['git', '-c', 'user.name=a',
+                                '-c', 'user.email=a@b.c', 'commit-tree',
+                                '-m', 'legacy', tree_hash.decode()],
+                               src_dir).strip()
+            _git(['git', 'update-ref', 'refs/heads/master', commit_hash],
+                 src_dir)
+            tree_cache.clear()
+            level = get_tree_level(src_dir, tree_hash.decode())
+            self.assertEqual(level['blobs']['a']['mode'], '100644')
+            self.assertEqual(level['blobs']['b']['mode'], '100755')
+            self.assertEqual(level['trees'], {'d': subtree_hash.decode()})
+            tree_cache.clear()
+            tree = get_tree(src_dir, tree_hash.decode())
+            self.assertEqual(tree['/']['blobs'], level['blobs'])
+            try:
+                set_backend('native')
+                repo = RepoClass(src_dir, b'master')
+                self.assertEqual(repo.getattr('/a')['st_mode'], 33188)
+                self.assertEqual(repo.getattr('/b')['st_mode'], 33261)
+            finally:
+                set_backend()
+            native_object_store_registry.remove(src_dir)
+
+    def test_delta_base_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        It tests the cache delta_base_cache of resolved bases of deltas
+        used by the module py_fuse_git_bare_fs.native_object_store and the
+        limit of the size of a cache from py_fuse_git_bare_fs.object_cache.
+
+        you can run only one test, e. g.:
+
+          env python3 py_fuse_git_bare_fs_repotools_native.py \
+            PyFuseGitBareFsRepotoolsNative.test_delta_base_cache
+        """
+        from py_fuse_git_bare_fs.native_object_store import \
+            NativeObjectStore, delta_base_cache
+        from py_fuse_git_bare_fs.object_cache import ObjectCache
+        cache = ObjectCache(max_entries=3, max_bytes=10)
+        cache.put_many([('a', b'1234'), ('b', b'1234'), ('c', b'1234')])
+        self.assertEqual((list(cache.entries.keys()), cache.size),
+                         (['b', 'c'], 8))
+        cache.put('b', b'12')
+        cache.put('d', 11 * b'1')  # too large
+        self.assertEqual((list(cache.entries.keys()), cache.size),
+                         (['c', 'b'], 6))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _git(['git', 'init', '-q', tmpdir], tmpdir)
+            data = os.urandom(262144)
+            blob_hashes = []
+            for i in range(5):
+                with open(os.path.join(tmpdir, 'f'), 'wb') as fd:
+                    fd.write(data + i * b'x')
+                _git(['git', 'add', 'f'], tmpdir)
+                _git(['git', '-c', 'user.name=a', '-c', 'user.email=a@b.c',
+                      'commit', '-q', '-m', str(i)], tmpdir)
+                blob_hashes.append(
+                    _git(['git', 'rev-parse', 'HEAD:f'], tmpdir).strip())
+            _git(['git', 'repack', '-q', '-a', '-d', '-f'], tmpdir)
+            store = NativeObjectStore(os.path.join(tmpdir, '.git', 'objects'))
+            delta_base_cache.clear()
+            for _ in range(2):
+                for i, blob_hash in enumerate(blob_hashes):
+                    self.assertEqual(
+                        store.get_object(bytes.fromhex(blob_hash.decode())),
+                        (b'blob', data + i * b'x'))
+            # 4 of the 5 blobs are deltas; only the first read base
+            # is not in the cache
+            self.assertGreaterEqual(len(delta_base_cache), 1)
+            self.assertGreaterEqual(delta_base_cache.hits, 7)
+            self.assertLessEqual(delta_base_cache.misses, 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
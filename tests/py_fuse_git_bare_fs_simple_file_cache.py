@@ -0,0 +1,525 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+tests the modules py_fuse_git_bare_fs.simple_file_cache and
+py_fuse_git_bare_fs.cache_policy
+
+You can run this file directly:
+
+  env python3 py_fuse_git_bare_fs_simple_file_cache.py
+
+Or you can run only one test, e. g.:
+
+  env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+    PyFuseGitBareFsSimpleFileCache.test_cache_policies
+"""
+
+import ctypes
+import gc
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+
+
+def _git(cmd, cwd, stdin=None):
+    return subprocess.run(
+        cmd, input=stdin,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, timeout=30, check=True).stdout
+
+
+class PyFuseGitBareFsSimpleFileCache(unittest.TestCase):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+
+    def test_cache_policies(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the eviction policies of
+        py_fuse_git_bare_fs.cache_policy.
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_cache_policies
+        """
+        from py_fuse_git_bare_fs.cache_policy import \
+            ARCPolicy, CACHE_POLICIES, LRUPolicy
+        self.assertEqual(set(CACHE_POLICIES.keys()), {'lru', 'arc'})
+        # lru
+        policy = LRUPolicy(30)
+        for key in ['a', 'b', 'c']:
+            policy.insert(key, 10)
+        policy.hit('a')
+        self.assertEqual(policy.victim(), 'b')
+        self.assertEqual([policy.evict(), policy.evict()], ['b', 'c'])
+        policy.remove('a')
+        self.assertIsNone(policy.evict())
+        # arc: an entry used twice survives a scan of entries used once
+        policy = ARCPolicy(30)
+        policy.insert('hot', 10)
+        policy.hit('hot')
+        cached = {'hot'}
+        for i in range(10):
+            key = f'scan{i}'
+            policy.insert(key, 10)
+            cached.add(key)
+            while len(cached) > 3:
+                cached.remove(policy.evict())
+        self.assertIn('hot', cached)
+        self.assertEqual(policy.t1_bytes + policy.t2_bytes, 30)
+        # victim returns the key evict returns next
+        key = policy.victim()
+        self.assertEqual(policy.evict(), key)
+        cached.remove(key)
+        self.assertEqual(len(cached), 2)
+        # a recently evicted entry increases the target size of t1
+        key = next(reversed(policy.b1))
+        policy.insert(key, 10)
+        self.assertGreater(policy.target, 0)
+        self.assertIn(key, policy.t2)
+        policy.clear()
+        self.assertIsNone(policy.evict())
+
+    def test_simple_file_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test fills py_fuse_git_bare_fs.simple_file_cache with blobs
+        of a repository with the policies lru and arc.
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_simple_file_cache
+        """
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            contents = {}
+            for i in range(8):
+                content = (str(i) * 1000).encode()
+                blob_hash = _git(
+                    ['git', 'hash-object', '-w', '--stdin'], src_dir,
+                    stdin=content).strip()
+                contents[blob_hash] = content
+            blob_hashes = list(contents.keys())
+            for policy in ['lru', 'arc']:
+                # space for about 4 blobs (each with a header)
+                cache = SimpleFileCache(
+                    min_file_size=0, max_cache_size=4300, policy=policy)
+                self.assertIsNone(cache.hit_ratio())
+                for blob_hash in blob_hashes:
+                    self.assertEqual(
+                        cache.get(src_dir, blob_hash, 1000, None, 0),
+                        contents[blob_hash])
+                    self.assertLessEqual(cache.actual_cache_size, 4300)
+                self.assertEqual(len(cache.cache), 4)
+                self.assertEqual(
+                    cache.actual_cache_size,
+                    sum(entry[2] for entry in cache.cache.values()))
+                # the last used blobs are cached
+                self.assertEqual(set(cache.cache.keys()),
+                                 set(blob_hashes[4:]))
+                self.assertEqual(
+                    cache.get(src_dir, blob_hashes[7], 1000, 10, 100),
+                    contents[blob_hashes[7]][100:110])
+                self.assertEqual(cache.hit_ratio(), 1 / 9)
+                # a blob larger than the cache is not stored
+                cache = SimpleFileCache(
+                    min_file_size=0, max_cache_size=100, policy=policy)
+                cache.get(src_dir, blob_hashes[0], 1000, None, 0)
+                self.assertEqual(len(cache.cache), 0)
+                self.assertEqual(cache.actual_cache_size, 0)
+            # maxage
+            cache = SimpleFileCache(min_file_size=0, maxage=3600)
+            for blob_hash in blob_hashes[:2]:
+                cache.get(src_dir, blob_hash, 1000, None, 0)
+            cache.cache[blob_hashes[0]][0] -= 7200
+            cache.clear_old()
+            self.assertEqual(set(cache.cache.keys()), {blob_hashes[1]})
+            self.assertEqual(cache.actual_cache_size,
+                             cache.cache[blob_hashes[1]][2])
+            # the janitor removes expired entries in the background
+            cache = SimpleFileCache(min_file_size=0, maxage=0.2)
+            cache.get(src_dir, blob_hashes[0], 1000, None, 0)
+            for _ in range(100):
+                if not cache.cache:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(len(cache.cache), 0)
+            self.assertEqual(cache.actual_cache_size, 0)
+            # the janitor does not keep the cache alive
+            cache_ref = weakref.ref(cache)
+            del cache
+            gc.collect()
+            self.assertIsNone(cache_ref())
+
+    def test_small_file_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the tier for small blobs of
+        py_fuse_git_bare_fs.simple_file_cache.
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_small_file_cache
+        """
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            contents = {}
+            for i in range(4):
+                for size in [100, 2000]:
+                    content = (str(i) * size).encode()
+                    blob_hash = _git(
+                        ['git', 'hash-object', '-w', '--stdin'], src_dir,
+                        stdin=content).strip()
+                    contents[blob_hash] = content
+            small = [blob_hash for blob_hash, content in contents.items()
+                     if len(content) == 100]
+            large = [blob_hash for blob_hash, content in contents.items()
+                     if len(content) == 2000]
+            cache = SimpleFileCache(
+                min_file_size=1000, max_cache_size=2000,
+                small_cache_entries=3, small_cache_size=1000)
+            for blob_hash in small:
+                self.assertEqual(
+                    cache.get(src_dir, blob_hash, 100, 10, 5),
+                    contents[blob_hash][5:15])
+            # at most small_cache_entries small blobs
+            self.assertEqual(list(cache.small.entries.keys()), small[1:])
+            self.assertEqual(cache.small.size, 300)
+            self.assertEqual(len(cache.cache), 0)
+            # reading large blobs does not remove small blobs
+            for blob_hash in large:
+                cache.get(src_dir, blob_hash, 2000, None, 0)
+            self.assertEqual(set(cache.cache.keys()), {large[-1]})
+            self.assertEqual(list(cache.small.entries.keys()), small[1:])
+            for blob_hash in small[1:]:
+                data = cache.get_cached(blob_hash, None, 50)
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(data, contents[blob_hash][50:])
+            self.assertIsNone(cache.get_cached(small[0], None, 0))
+            self.assertEqual(cache.hit_ratio(), 3 / 11)
+            # at most small_cache_size bytes
+            cache = SimpleFileCache(
+                min_file_size=1000, small_cache_size=250)
+            for blob_hash in small:
+                cache.get(src_dir, blob_hash, 100, None, 0)
+            self.assertEqual(list(cache.small.entries.keys()), small[2:])
+            cache.clear()
+            self.assertEqual(len(cache.small), 0)
+            # without the tier for small blobs
+            cache = SimpleFileCache(
+                min_file_size=1000, small_cache_entries=0)
+            self.assertEqual(cache.get(src_dir, small[0], 100, None, 0),
+                             contents[small[0]])
+            self.assertEqual(len(cache.small), 0)
+
+    def test_compressed_file_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the compressed tier of
+        py_fuse_git_bare_fs.simple_file_cache.
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_compressed_file_cache
+        """
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            contents = [(str(i) * 2000).encode() for i in range(4)]
+            contents += [os.urandom(2000), 5000 * b'l']
+            blob_hashes = [
+                _git(['git', 'hash-object', '-w', '--stdin'], src_dir,
+                     stdin=content).strip()
+                for content in contents]
+            # hot tier: 4000 bytes, cold tier: 12000 bytes
+            cache = SimpleFileCache(
+                min_file_size=0, max_cache_size=16000, compression=True)
+            self.assertEqual(cache.max_cache_size, 4000)
+            for blob_hash, content in zip(blob_hashes[:4], contents[:4]):
+                cache.get(src_dir, blob_hash, len(content), None, 0)
+            self.assertEqual(set(cache.cache.keys()), set(blob_hashes[2:4]))
+            self.assertEqual(list(cache.compressed.entries.keys()),
+                             blob_hashes[:2])
+            self.assertLess(cache.compressed.size, 200)
+            # a read decompresses the blob to the hot tier
+            self.assertEqual(cache.get_cached(blob_hashes[0], 10, 100),
+                             contents[0][100:110])
+            self.assertEqual(set(cache.cache.keys()),
+                             {blob_hashes[0], blob_hashes[3]})
+            self.assertEqual(set(cache.compressed.entries.keys()),
+                             set(blob_hashes[:3]))
+            compressed = cache.compressed.entries[blob_hashes[0]]
+            cache.get(src_dir, blob_hashes[2], 2000, None, 0)
+            cache.get(src_dir, blob_hashes[3], 2000, None, 0)
+            # the kept compressed blob is not compressed again
+            self.assertNotIn(blob_hashes[0], cache.cache)
+            self.assertIs(cache.compressed.entries[blob_hashes[0]],
+                          compressed)
+            self.assertEqual(cache.hit_ratio(), 3 / 7)
+            # a blob not compressible is not stored compressed
+            cache.get(src_dir, blob_hashes[4], 2000, None, 0)
+            cache.get(src_dir, blob_hashes[1], 2000, None, 0)
+            cache.get(src_dir, blob_hashes[2], 2000, None, 0)
+            self.assertNotIn(blob_hashes[4], cache.cache)
+            self.assertNotIn(blob_hashes[4], cache.compressed.entries)
+            # a blob too large for the hot tier stays compressed
+            self.assertEqual(
+                cache.get(src_dir, blob_hashes[5], 5000, None, 0),
+                contents[5])
+            self.assertIn(blob_hashes[5], cache.compressed.entries)
+            self.assertEqual(cache.get_cached(blob_hashes[5], 10, 4995),
+                             contents[5][4995:])
+            self.assertIn(blob_hashes[5], cache.compressed.entries)
+            self.assertNotIn(blob_hashes[5], cache.cache)
+            self.assertLessEqual(cache.actual_cache_size, 4000)
+            cache.clear()
+            self.assertEqual(len(cache.compressed), 0)
+            # without compression the complete size is used for the blobs
+            cache = SimpleFileCache(min_file_size=0, max_cache_size=16000)
+            self.assertEqual(cache.max_cache_size, 16000)
+            self.assertIsNone(cache.compressed)
+
+    def test_sharded_cache(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test reads blobs by many threads from a
+        py_fuse_git_bare_fs.simple_file_cache with several shards.
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_sharded_cache
+        """
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        self.assertEqual(len(SimpleFileCache().shards), 16)
+        self.assertEqual(len(SimpleFileCache(max_cache_size=1000).shards), 1)
+        self.assertEqual(
+            len(SimpleFileCache(max_cache_size=134217728).shards), 2)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            contents = {}
+            for i in range(16):
+                content = (f'{i:x}' * 1000).encode()
+                blob_hash = _git(
+                    ['git', 'hash-object', '-w', '--stdin'], src_dir,
+                    stdin=content).strip()
+                contents[blob_hash] = content
+            blob_hashes = list(contents.keys())
+            for policy in ['lru', 'arc']:
+                cache = SimpleFileCache(
+                    min_file_size=0, max_cache_size=10000, policy=policy,
+                    maxage=60, shards=4)
+                errors = []
+
+                def read(seed, cache, errors):
+                    for i in range(200):
+                        blob_hash = blob_hashes[(seed * 7 + i) % 16]
+                        data = cache.get(src_dir, blob_hash, 1000, 10, i)
+                        if data != contents[blob_hash][i:i + 10]:
+                            errors.append((blob_hash, i))
+                workers = [threading.Thread(target=read,
+                                            args=(i, cache, errors))
+                           for i in range(8)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                self.assertEqual(errors, [])
+                for shard in cache.shards:
+                    self.assertLessEqual(shard.actual_cache_size, 2500)
+                    self.assertEqual(
+                        shard.actual_cache_size,
+                        sum(entry[2] for entry in shard.cache.values()))
+                    self.assertEqual(set(shard.last_used.keys()),
+                                     set(shard.cache.keys()))
+                self.assertEqual(cache.actual_cache_size,
+                                 1000 * len(cache.cache))
+                self.assertGreater(cache.hit_ratio(), 0)
+                cache.clear()
+                self.assertEqual(cache.actual_cache_size, 0)
+            # a blob larger than the part of a shard is stored, too
+            large = {}
+            for size in [6000, 11000]:
+                content = size * b'l'
+                large[_git(['git', 'hash-object', '-w', '--stdin'],
+                           src_dir, stdin=content).strip()] = content
+            for policy in ['lru', 'arc']:
+                cache = SimpleFileCache(
+                    min_file_size=0, max_cache_size=10000, policy=policy,
+                    shards=4)
+                for blob_hash in blob_hashes:
+                    cache.get(src_dir, blob_hash, 1000, None, 0)
+                self.assertGreater(cache.actual_cache_size, 5000)
+                for blob_hash, content in large.items():
+                    self.assertEqual(
+                        bytes(cache.get(src_dir, blob_hash, len(content),
+                                        10, 100)),
+                        content[100:110])
+                    self.assertLessEqual(cache.actual_cache_size, 10000)
+                blob_hash, content = list(large.items())[0]
+                self.assertIn(blob_hash, cache.cache)
+                self.assertEqual(
+                    bytes(cache.get_cached(blob_hash, 10, 5990)),
+                    content[5990:])
+                # larger than max_cache_size
+                self.assertNotIn(list(large.keys())[1], cache.cache)
+                self.assertEqual(
+                    cache.actual_cache_size,
+                    sum(entry[2] for entry in cache.cache.values()))
+
+    def test_cache_admission(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks the admission of py_fuse_git_bare_fs.simple_file_cache
+        by py_fuse_git_bare_fs.frequency_sketch.
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_cache_admission
+        """
+        from py_fuse_git_bare_fs.frequency_sketch import FrequencySketch
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        # frequency sketch
+        sketch = FrequencySketch(10, max_count=5)
+        self.assertEqual(sketch.sample_size, 640)
+        for _ in range(3):
+            sketch.increment('a')
+        self.assertEqual(sketch.frequency('a'), 3)
+        for _ in range(10):
+            sketch.increment('b')
+        self.assertEqual(sketch.frequency('b'), 5)
+        # aging halves the counters
+        sketch.sample_size = 14
+        sketch.increment('c')
+        self.assertEqual([sketch.frequency(key) for key in 'abc'],
+                         [1, 2, 0])
+        self.assertEqual(sketch.additions, 7)
+        sketch.clear()
+        self.assertEqual(sketch.frequency('b'), 0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            blob_hashes = {}
+            for size in [100, 1000]:
+                blob_hashes[size] = [
+                    _git(['git', 'hash-object', '-w', '--stdin'], src_dir,
+                         stdin=(str(i) * size).encode()).strip()
+                    for i in range(8)]
+            hot = blob_hashes[1000][:2]
+            scan = blob_hashes[1000][2:]
+            for admission in [False, True]:
+                # space for about 4 blobs (each with a header)
+                cache = SimpleFileCache(
+                    min_file_size=0, max_cache_size=4300, shards=1,
+                    admission=admission)
+                for _ in range(3):
+                    for blob_hash in hot:
+                        cache.get(src_dir, blob_hash, 1000, None, 0)
+                for blob_hash in scan:
+                    cache.get(src_dir, blob_hash, 1000, None, 0)
+                if admission:
+                    # the scan does not remove the blobs read repeatedly
+                    self.assertEqual(set(cache.cache.keys()),
+                                     set(hot + scan[:2]))
+                    self.assertEqual(cache.rejected_admissions(), 4)
+                else:
+                    self.assertEqual(set(cache.cache.keys()),
+                                     set(scan[2:]))
+                    self.assertEqual(cache.rejected_admissions(), 0)
+            # a blob read more often than the victim is stored
+            for _ in range(3):
+                cache.get(src_dir, scan[-1], 1000, None, 0)
+            self.assertEqual(set(cache.cache.keys()),
+                             {hot[1], scan[0], scan[1], scan[-1]})
+            self.assertEqual(cache.rejected_admissions(), 6)
+            # the tier for small blobs
+            hot = blob_hashes[100][:2]
+            scan = blob_hashes[100][2:]
+            cache = SimpleFileCache(
+                min_file_size=1000, small_cache_entries=2, admission=True)
+            for _ in range(3):
+                for blob_hash in hot:
+                    cache.get(src_dir, blob_hash, 100, None, 0)
+            for blob_hash in scan:
+                cache.get(src_dir, blob_hash, 100, None, 0)
+            self.assertEqual(list(cache.small.entries.keys()), hot)
+            self.assertEqual(cache.rejected_admissions(), len(scan))
+            self.assertEqual(cache.hit_ratio(), 4 / 12)
+            cache.clear()
+            self.assertEqual(cache.shards[0].sketch.frequency(hot[0]), 0)
+
+    def test_read_buffer(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test checks, that cached content is read without copying it
+        (py_fuse_git_bare_fs.simple_file_cache and
+        py_fuse_git_bare_fs.read_buffer).
+
+        env python3 py_fuse_git_bare_fs_simple_file_cache.py \
+          PyFuseGitBareFsSimpleFileCache.test_read_buffer
+        """
+        from py_fuse_git_bare_fs.read_buffer import read_buffer
+        from py_fuse_git_bare_fs.simple_file_cache import SimpleFileCache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repo.git')
+            _git(['git', 'init', '-q', '--bare', src_dir], tmpdir)
+            content = bytes(range(256)) * 1024
+            blob_hash = _git(
+                ['git', 'hash-object', '-w', '--stdin'], src_dir,
+                stdin=content).strip()
+            # not cached (too small)
+            cache = SimpleFileCache(min_file_size=len(content) + 1)
+            for size, offset in [(None, 0), (None, 1000), (10, 1000),
+                                 (10, len(content) - 5)]:
+                stop = len(content) if size is None else offset + size
+                self.assertEqual(
+                    cache.get(src_dir, blob_hash, len(content), size,
+                              offset),
+                    content[offset:stop])
+            self.assertEqual(len(cache.cache), 0)
+            # cached
+            cache = SimpleFileCache(min_file_size=0)
+            for size, offset in [(None, 0), (None, 1000), (10, 1000),
+                                 (10, len(content) - 5),
+                                 (10, len(content) + 5)]:
+                stop = len(content) if size is None else offset + size
+                data = cache.get(src_dir, blob_hash, len(content), size,
+                                 offset)
+                self.assertIsInstance(data, memoryview)
+                # the memory of the cache is used
+                self.assertIs(data.obj, cache.cache[blob_hash][1])
+                self.assertEqual(data, content[offset:stop])
+                buf = read_buffer(data)
+                self.assertEqual(bytes(buf), content[offset:stop])
+                if len(data) > 0:
+                    target = ctypes.create_string_buffer(len(data))
+                    ctypes.memmove(target, buf, len(data))
+                    self.assertEqual(target.raw, content[offset:stop])
+            self.assertEqual(read_buffer(b'abc'), b'abc')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
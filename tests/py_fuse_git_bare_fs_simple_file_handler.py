@@ -0,0 +1,185 @@
+"""
+:Author: Daniel Mohr
+:Email: daniel.mohr@dlr.de
+:Date: 2026-10-18
+:License: GNU GENERAL PUBLIC LICENSE, Version 2, June 1991.
+
+tests the module py_fuse_git_bare_fs.simple_file_handler and the lookup
+of repositories in py_fuse_git_bare_fs.git_bare_repo_tree
+
+You can run this file directly:
+
+  env python3 py_fuse_git_bare_fs_simple_file_handler.py
+
+Or you can run only one test, e. g.:
+
+  env python3 py_fuse_git_bare_fs_simple_file_handler.py \
+    PyFuseGitBareFsSimpleFileHandler.test_simple_file_handler
+"""
+
+import errno
+import os
+import subprocess
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+
+def _git(cmd, cwd, stdin=None):
+    return subprocess.run(
+        cmd, input=stdin,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=cwd, timeout=30, check=True).stdout
+
+
+def _create_repo(src_dir, content):
+    """
+    creates the bare repository src_dir with the file "f" in master
+    """
+    _git(['git', 'init', '-q', '--bare', src_dir], '.')
+    blob_hash = _git(['git', 'hash-object', '-w', '--stdin'], src_dir,
+                     stdin=content).strip()
+    tree_hash = _git(['git', 'mktree'], src_dir,
+                     stdin=b'100644 blob ' + blob_hash + b'\tf\n').strip()
+    commit_hash = _git(['git', 'commit-tree', '-m', 'init', tree_hash],
+                       src_dir).strip()
+    _git(['git', 'update-ref', 'refs/heads/master', commit_hash], src_dir)
+
+
+class PyFuseGitBareFsSimpleFileHandler(unittest.TestCase):
+    """
+    :Author: Daniel Mohr
+    :Date: 2026-10-18
+    """
+    # pylint: disable = bad-option-value, import-outside-toplevel
+
+    def test_simple_file_handler(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test gets, checks and removes file handlers of several
+        repositories by many threads.
+
+        env python3 py_fuse_git_bare_fs_simple_file_handler.py \
+          PyFuseGitBareFsSimpleFileHandler.test_simple_file_handler
+        """
+        from py_fuse_git_bare_fs.simple_file_handler import \
+            SimpleFileHandlerClass, fusepy
+        file_handlers = SimpleFileHandlerClass(max_file_handlers=3)
+        handlers = [file_handlers.get('a'), file_handlers.get('b'),
+                    file_handlers.get('a')]
+        self.assertEqual(handlers, [0, 1, 2])
+        with self.assertRaises(fusepy.FuseOSError):
+            file_handlers.get('a')
+        self.assertTrue(file_handlers.is_file_handler('a', 0))
+        self.assertFalse(file_handlers.is_file_handler('b', 0))
+        file_handlers.remove('a', 0)
+        self.assertFalse(file_handlers.is_file_handler('a', 0))
+        with self.assertRaises(fusepy.FuseOSError):
+            file_handlers.remove('a', 0)
+        # the numbers are not reused at once
+        self.assertEqual(file_handlers.get('c'), 3)
+        file_handlers.remove_repo('a')
+        self.assertFalse(file_handlers.is_file_handler('a', 2))
+        self.assertTrue(file_handlers.is_file_handler('b', 1))
+        self.assertEqual(file_handlers.file_handler, {1, 3})
+        # many threads
+        file_handlers = SimpleFileHandlerClass()
+        errors = []
+
+        def work(repo):
+            for _ in range(1000):
+                i = file_handlers.get(repo)
+                if not file_handlers.is_file_handler(repo, i):
+                    errors.append((repo, i))
+                file_handlers.remove(repo, i)
+        workers = [threading.Thread(target=work, args=(f'repo{i % 4}',))
+                   for i in range(16)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(file_handlers.file_handler, set())
+        for shard in file_handlers.shards:
+            self.assertEqual(shard.file_handler_repo, {})
+
+    def test_git_bare_repo_tree_lookup(self):
+        """
+        :Author: Daniel Mohr
+        :Date: 2026-10-18
+
+        This test looks up repositories in
+        py_fuse_git_bare_fs.git_bare_repo_tree by many threads.
+
+        env python3 py_fuse_git_bare_fs_simple_file_handler.py \
+          PyFuseGitBareFsSimpleFileHandler.test_git_bare_repo_tree_lookup
+        """
+        from py_fuse_git_bare_fs.git_bare_repo_tree import \
+            GitBareRepoTree, fusepy
+        from py_fuse_git_bare_fs.repo_class import RepoClass
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src_dir = os.path.join(tmpdir, 'repos')
+            reponames = ['a.b', 'axb', 'group/c']
+            for reponame in reponames:
+                _create_repo(os.path.join(src_dir, reponame + '.git'),
+                             reponame.encode())
+            operations = GitBareRepoTree(src_dir, b'master', 1048576)
+            self.assertEqual(set(operations.readdir('/', None)),
+                             {'.', '..', 'a.b', 'axb', 'group'})
+            self.assertEqual(set(operations.readdir('/group', None)),
+                             {'.', '..', 'c'})
+            self.assertIsNone(operations._extract_repo_from_path('/group'))
+            self.assertIsNone(operations._extract_repo_from_path('/a'))
+            self.assertEqual(
+                operations._extract_repo_from_path('/group/c/f'), 'group/c')
+            created = []
+
+            class CountingRepoClass(RepoClass):
+                """
+                counts the created instances
+                """
+
+                def __init__(self, *args, **kwargs):
+                    created.append(args[0])
+                    super().__init__(*args, **kwargs)
+            errors = []
+
+            def work():
+                try:
+                    for reponame in reponames * 20:
+                        path = f'/{reponame}/f'
+                        file_handler = operations.open(path, 'r')
+                        data = operations.read(path, 100, 0, file_handler)
+                        if bytes(data) != reponame.encode():
+                            errors.append(reponame)
+                        operations.release(path, file_handler)
+                except Exception as err:  # pylint: disable=broad-except
+                    errors.append(err)
+            with unittest.mock.patch(
+                    'py_fuse_git_bare_fs.git_bare_repo_tree.RepoClass',
+                    CountingRepoClass):
+                workers = [threading.Thread(target=work) for _ in range(8)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            self.assertEqual(errors, [])
+            # every repository is opened only once
+            self.assertEqual(len(created), len(reponames))
+            self.assertEqual(operations.getattr('/axb/f')['st_size'], 3)
+            # a repository removed after the lookup of the path
+            actual_repo = operations._extract_repo_from_path('/axb/f')
+            with operations._lock:
+                operations.repos = {
+                    reponame: repo for reponame, repo in
+                    operations.repos.items() if reponame != 'axb'}
+            with self.assertRaises(fusepy.FuseOSError) as context:
+                operations._get_repo(actual_repo)
+            self.assertEqual(context.exception.errno, errno.ENOENT)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)